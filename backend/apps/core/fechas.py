@@ -0,0 +1,102 @@
+"""
+Rangos de fechas para filtrar columnas DateTimeField sin anular sus índices.
+
+Un filtro como `fecha_creacion__date=...` convierte la columna de cada fila a
+la zona horaria local antes de compararla, y así la base no puede usar el
+índice. Acá los días se traducen a rangos semiabiertos [inicio, fin) de
+instantes (en UTC) calculados con la zona horaria local (TIME_ZONE,
+America/Argentina/Buenos_Aires), y la columna se compara directamente.
+"""
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+
+class RangoFechasInvalidoError(ValueError):
+    """Excepción cuando una fecha o un rango de fechas no es válido."""
+
+
+def parse_fecha(valor, nombre='fecha'):
+    """
+    Convierte un string YYYY-MM-DD en date.
+
+    Raises:
+        RangoFechasInvalidoError: si el formato no es válido
+    """
+    try:
+        return date.fromisoformat(valor)
+    except (TypeError, ValueError):
+        raise RangoFechasInvalidoError(f'{nombre}: fecha inválida, el formato es YYYY-MM-DD.')
+
+
+def inicio_dia(fecha):
+    """Primer instante (en UTC) del día local `fecha`."""
+    local = timezone.make_aware(datetime.combine(fecha, time.min), timezone.get_default_timezone())
+    return local.astimezone(dt_timezone.utc)
+
+
+def hoy():
+    """Fecha actual en la zona horaria local."""
+    return timezone.localdate()
+
+
+def rango_dias(desde=None, hasta=None):
+    """
+    Rango semiabierto [inicio, fin) que cubre los días locales de `desde` a
+    `hasta`, ambos inclusive. Cualquiera de los dos puede ser None (sin límite).
+
+    Raises:
+        RangoFechasInvalidoError: si `hasta` es anterior a `desde`
+    """
+    if desde and hasta and hasta < desde:
+        raise RangoFechasInvalidoError('hasta: no puede ser anterior a desde.')
+    inicio = inicio_dia(desde) if desde else None
+    fin = inicio_dia(hasta + timedelta(days=1)) if hasta else None
+    return inicio, fin
+
+
+def rango_mes(fecha=None):
+    """Rango [inicio, fin) del mes local de `fecha` (por defecto el actual)."""
+    fecha = fecha or hoy()
+    primero = fecha.replace(day=1)
+    siguiente = (primero + timedelta(days=32)).replace(day=1)
+    return inicio_dia(primero), inicio_dia(siguiente)
+
+
+def filtro_rango(campo, inicio=None, fin=None):
+    """Kwargs de filtro `campo__gte=inicio`, `campo__lt=fin` (omite los límites None)."""
+    filtro = {}
+    if inicio is not None:
+        filtro[f'{campo}__gte'] = inicio
+    if fin is not None:
+        filtro[f'{campo}__lt'] = fin
+    return filtro
+
+
+def rango_desde_params(params, param_fecha='fecha', param_desde='desde', param_hasta='hasta'):
+    """
+    Rango [inicio, fin) a partir de los query params de un request:
+    - `fecha`: un solo día
+    - `desde` / `hasta`: días inclusive, cualquiera de los dos opcional
+
+    Retorna (None, None) si no hay ninguno.
+
+    Raises:
+        RangoFechasInvalidoError: si alguna fecha no es válida o se combina
+        `fecha` con `desde`/`hasta`
+    """
+    valor_fecha = params.get(param_fecha)
+    valor_desde = params.get(param_desde)
+    valor_hasta = params.get(param_hasta)
+
+    if valor_fecha:
+        if valor_desde or valor_hasta:
+            raise RangoFechasInvalidoError(
+                f'{param_fecha}: no se puede combinar con {param_desde}/{param_hasta}.'
+            )
+        fecha = parse_fecha(valor_fecha, param_fecha)
+        return rango_dias(fecha, fecha)
+
+    desde = parse_fecha(valor_desde, param_desde) if valor_desde else None
+    hasta = parse_fecha(valor_hasta, param_hasta) if valor_hasta else None
+    return rango_dias(desde, hasta)
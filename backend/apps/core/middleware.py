@@ -0,0 +1,113 @@
+"""
+Middleware de instrumentación de consultas a la base de datos.
+"""
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('eltetu')
+
+
+class ContadorConsultas:
+    """
+    Wrapper de ejecución (connection.execute_wrapper) que cuenta las consultas
+    y acumula su duración. Funciona con DEBUG=False, a diferencia de
+    connection.queries.
+    """
+
+    def __init__(self):
+        self.cantidad = 0
+        self.tiempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.cantidad += 1
+            self.tiempo += time.perf_counter() - inicio
+
+
+def get_presupuesto_consultas(view_func, method=None):
+    """
+    Retorna el presupuesto de consultas de la vista, o None si no tiene.
+
+    Se configura con el atributo `presupuesto_consultas` en la clase de la
+    vista (o con el decorador presupuesto_consultas en vistas @api_view).
+    Puede ser un número o un dict por método HTTP ({'GET': 5, 'DELETE': 20});
+    los métodos que no están en el dict usan el mayor de sus valores.
+    Si la vista no define uno se usa PRESUPUESTO_CONSULTAS_DEFECTO.
+    """
+    view_class = getattr(view_func, 'view_class', None)
+    presupuesto = getattr(view_class, 'presupuesto_consultas', None)
+    if isinstance(presupuesto, dict):
+        presupuesto = presupuesto.get(method, max(presupuesto.values()))
+    if presupuesto is None:
+        presupuesto = getattr(settings, 'PRESUPUESTO_CONSULTAS_DEFECTO', None)
+    return presupuesto
+
+
+def presupuesto_consultas(maximo):
+    """
+    Decorador para definir el presupuesto de consultas de una vista @api_view.
+    Debe ir por encima de @api_view:
+
+        @presupuesto_consultas(5)
+        @api_view(['GET'])
+        def mi_vista(request): ...
+    """
+    def decorador(view_func):
+        view_func.view_class.presupuesto_consultas = maximo
+        return view_func
+    return decorador
+
+
+class PresupuestoConsultasMiddleware:
+    """
+    Cuenta las consultas y el tiempo de base de datos de cada request.
+
+    - Agrega los headers `X-DB-Queries` y `X-DB-Time` (milisegundos) si
+      DEBUG está activo o el usuario es admin.
+    - Registra un warning si la vista excede su presupuesto de consultas.
+
+    En respuestas en streaming solo se cuentan las consultas hechas antes de
+    empezar a enviar el contenido, así que no se controla el presupuesto.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contador = ContadorConsultas()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(contador))
+            response = self.get_response(request)
+
+        response.consultas_db = contador.cantidad
+        response.tiempo_db = contador.tiempo
+
+        if response.streaming:
+            return response
+
+        presupuesto = getattr(request, '_presupuesto_consultas', None)
+        response.presupuesto_consultas = presupuesto
+        if presupuesto is not None and contador.cantidad > presupuesto:
+            logger.warning(
+                f'Presupuesto de consultas excedido en {request.method} {request.path}: '
+                f'{contador.cantidad} consultas (máximo {presupuesto}), '
+                f'{contador.tiempo * 1000:.1f} ms'
+            )
+
+        user = getattr(request, 'user', None)
+        if settings.DEBUG or (user is not None and user.is_authenticated and user.is_admin()):
+            response['X-DB-Queries'] = str(contador.cantidad)
+            response['X-DB-Time'] = f'{contador.tiempo * 1000:.1f}'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._presupuesto_consultas = get_presupuesto_consultas(view_func, request.method)
+        return None
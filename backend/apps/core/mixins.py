@@ -4,8 +4,11 @@ Mixins reutilizables para vistas y funcionalidad común.
 
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import StreamingHttpResponse
 import logging
 
+from .streaming import iterar_json_array, STREAM_CHUNK_SIZE
+
 logger = logging.getLogger('eltetu')
 
 
@@ -92,3 +95,35 @@ class SoftDeleteMixin:
         else:
             return Response(status=status.HTTP_204_NO_CONTENT)
 
+
+
+class StreamingListMixin:
+    """
+    Mixin para listar en streaming con `?stream=true`.
+    
+    En modo streaming la respuesta es un array JSON sin paginar que se genera
+    lote por lote (queryset.iterator), con memoria acotada por worker.
+    """
+    stream_chunk_size = STREAM_CHUNK_SIZE
+    
+    def quiere_stream(self):
+        """Indica si el request pidió la respuesta en streaming."""
+        return self.request.query_params.get('stream', '').lower() == 'true'
+    
+    def stream_response(self, queryset):
+        """Retorna el queryset como array JSON en streaming."""
+        return StreamingHttpResponse(
+            iterar_json_array(
+                queryset,
+                self.get_serializer_class(),
+                context=self.get_serializer_context(),
+                chunk_size=self.stream_chunk_size,
+            ),
+            content_type='application/json'
+        )
+    
+    def list(self, request, *args, **kwargs):
+        """Usa streaming si se pidió; si no, el listado estándar."""
+        if self.quiere_stream():
+            return self.stream_response(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
@@ -0,0 +1,169 @@
+"""
+Paginación por keyset (cursor) para listados grandes.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _serializar_valor(valor):
+    """Serializa fechas con microsegundos (DjangoJSONEncoder los trunca)."""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f'Tipo no soportado en cursor: {type(valor).__name__}')
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Paginación por número de página (por defecto) o por keyset (opt-in).
+
+    Con `?paginacion=cursor` cada página se obtiene con un predicado sobre las
+    columnas de orden del último registro (WHERE (a, b, id) > (...)) en lugar de
+    OFFSET, y sin COUNT(*). Pedir la página 100 cuesta lo mismo que la primera.
+
+    La vista define el orden con `keyset_ordering` (ej: ['-activo', 'nombre', 'id']);
+    el último campo debe ser único para que el orden sea total. En modo cursor
+    ese orden reemplaza cualquier `ordering` pedido por parámetro.
+
+    Respuesta en modo cursor:
+    {
+        "next": "...?paginacion=cursor&cursor=...",  # null en la última página
+        "previous": null,
+        "results": [...]
+    }
+    """
+    modo_query_param = 'paginacion'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def usa_keyset(self, request):
+        """Indica si el request pidió paginación por cursor."""
+        return request.query_params.get(self.modo_query_param) == 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.usa_keyset(request):
+            self.keyset = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset = True
+        self.request = request
+        self.campos = self._parse_ordering(queryset.model, view.keyset_ordering)
+        queryset = self._ordenar(queryset)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            try:
+                queryset = queryset.filter(self._filtro_posterior(self._decodificar_cursor(cursor)))
+            except (TypeError, ValueError, ValidationError):
+                # Valores del cursor que no corresponden al tipo de la columna
+                raise NotFound(self.invalid_cursor_message)
+
+        page_size = self.get_page_size(request)
+        resultados = list(queryset[:page_size + 1])
+        self.hay_siguiente = len(resultados) > page_size
+        self.page = resultados[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.hay_siguiente or not self.page:
+            return None
+        ultimo = self.page[-1]
+        valores = [getattr(ultimo, campo) for campo, _, _ in self.campos]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self._codificar_cursor(valores))
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        return None
+
+    # ========== Keyset ==========
+
+    def _parse_ordering(self, model, ordering):
+        """Convierte ['-a', 'b'] en [(campo, descendente, admite_null)]."""
+        campos = []
+        for item in ordering:
+            descendente = item.startswith('-')
+            campo = item.lstrip('-')
+            try:
+                admite_null = model._meta.get_field(campo).null
+            except FieldDoesNotExist:
+                # Anotaciones (ej: rango_busqueda)
+                admite_null = False
+            campos.append((campo, descendente, admite_null))
+        return campos
+
+    def _ordenar(self, queryset):
+        """
+        Ordena fijando dónde van los NULL (último en ASC, primero en DESC, como
+        PostgreSQL por defecto), para que el orden sea el mismo en PostgreSQL y
+        SQLite. Solo se explicita en columnas que admiten NULL: en las demás el
+        ORDER BY coincide con el de los índices y el motor puede usarlos.
+        """
+        orden = []
+        for campo, descendente, admite_null in self.campos:
+            if descendente:
+                orden.append(F(campo).desc(nulls_first=True) if admite_null else F(campo).desc())
+            else:
+                orden.append(F(campo).asc(nulls_last=True) if admite_null else F(campo).asc())
+        return queryset.order_by(*orden)
+
+    def _despues(self, campo, descendente, admite_null, valor):
+        """Condición "este campo viene después de `valor`" (o None si nada viene después)."""
+        if valor is None:
+            # NULL va último en ASC y primero en DESC
+            return Q(**{f'{campo}__isnull': False}) if descendente else None
+        condicion = Q(**{f'{campo}__lt' if descendente else f'{campo}__gt': valor})
+        if admite_null and not descendente:
+            condicion |= Q(**{f'{campo}__isnull': True})
+        return condicion
+
+    def _filtro_posterior(self, valores):
+        """
+        Predicado de keyset para (c1, c2, ..., cn) > (v1, v2, ..., vn):
+        (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ...
+        """
+        if len(valores) != len(self.campos):
+            raise NotFound(self.invalid_cursor_message)
+
+        filtro = Q(pk__in=[])
+        iguales = Q()
+        for (campo, descendente, admite_null), valor in zip(self.campos, valores):
+            despues = self._despues(campo, descendente, admite_null, valor)
+            if despues is not None:
+                filtro |= iguales & despues
+            iguales &= Q(**{f'{campo}__isnull': True}) if valor is None else Q(**{campo: valor})
+        return filtro
+
+    def _codificar_cursor(self, valores):
+        contenido = json.dumps(valores, default=_serializar_valor, separators=(',', ':'))
+        return base64.urlsafe_b64encode(contenido.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def _decodificar_cursor(self, cursor):
+        try:
+            relleno = '=' * (-len(cursor) % 4)
+            valores = json.loads(base64.urlsafe_b64decode(cursor + relleno).decode('utf-8'))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(valores, list):
+            raise NotFound(self.invalid_cursor_message)
+        return valores
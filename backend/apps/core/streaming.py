@@ -0,0 +1,35 @@
+"""
+Respuestas JSON en streaming para listados grandes.
+Serializa el queryset por lotes para no materializar todo el listado en memoria.
+"""
+from rest_framework.renderers import JSONRenderer
+
+# Cantidad de registros leídos de la base y serializados por lote
+STREAM_CHUNK_SIZE = 500
+
+
+def iterar_json_array(queryset, serializer_class, context=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Genera un array JSON (en bytes) a partir del queryset, lote por lote.
+    
+    El resultado concatenado es idéntico a renderizar
+    serializer_class(queryset, many=True).data con JSONRenderer.
+    """
+    renderer = JSONRenderer()
+    primero = True
+    
+    def renderizar(lote):
+        # Quitar los corchetes del array de cada lote para unirlos con comas
+        return renderer.render(serializer_class(lote, many=True, context=context or {}).data)[1:-1]
+    
+    yield b'['
+    lote = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        lote.append(obj)
+        if len(lote) >= chunk_size:
+            yield (b'' if primero else b',') + renderizar(lote)
+            primero = False
+            lote = []
+    if lote:
+        yield (b'' if primero else b',') + renderizar(lote)
+    yield b']'
@@ -0,0 +1,81 @@
+"""
+Utilidades para tests de la API.
+"""
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .middleware import PresupuestoConsultasMiddleware
+
+# Apps cuyas vistas deben declarar su presupuesto de consultas
+APPS_CON_PRESUPUESTO = ('productos', 'pedidos', 'users')
+
+
+def _recorrer_patrones(patrones, prefijo=''):
+    """Genera (ruta, callback) para todas las URLs, incluyendo las anidadas."""
+    for patron in patrones:
+        if isinstance(patron, URLResolver):
+            yield from _recorrer_patrones(patron.url_patterns, prefijo + str(patron.pattern))
+        elif isinstance(patron, URLPattern):
+            yield prefijo + str(patron.pattern), patron.callback
+
+
+def vistas_sin_presupuesto(apps=APPS_CON_PRESUPUESTO):
+    """
+    Retorna las rutas de las vistas de las apps dadas que no declaran
+    `presupuesto_consultas` (ni en la clase ni con el decorador).
+    """
+    modulos = tuple(f'apps.{app}.' for app in apps)
+    faltantes = []
+    for ruta, callback in _recorrer_patrones(get_resolver().url_patterns):
+        view_class = getattr(callback, 'view_class', None)
+        if view_class is None or not view_class.__module__.startswith(modulos):
+            continue
+        if getattr(view_class, 'presupuesto_consultas', None) is None:
+            faltantes.append(ruta)
+    return faltantes
+
+
+class PresupuestoConsultasMixin:
+    """
+    Mixin para TestCase que verifica el presupuesto de consultas.
+
+    El middleware PresupuestoConsultasMiddleware deja en cada respuesta la
+    cantidad de consultas (`consultas_db`) y el presupuesto de la vista
+    (`presupuesto_consultas`). Ejemplo:
+
+        class PedidoListTests(PresupuestoConsultasMixin, APITestCase):
+            def test_listado(self):
+                self.autenticar(self.cliente)
+                response = self.client.get('/api/pedidos/')
+                self.assertDentroDelPresupuesto(response)
+    """
+
+    def autenticar(self, user):
+        """
+        Autentica el cliente de test con un JWT, como la app. Con
+        force_authenticate no se contaría la consulta del usuario.
+        """
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def assertDentroDelPresupuesto(self, response):
+        """Falla si la respuesta usó más consultas que el presupuesto de su vista."""
+        self.assertFalse(
+            response.streaming,
+            'Las respuestas en streaming no registran el total de consultas.'
+        )
+        self.assertTrue(
+            hasattr(response, 'consultas_db'),
+            f'La respuesta no pasó por {PresupuestoConsultasMiddleware.__name__}.'
+        )
+        presupuesto = response.presupuesto_consultas
+        self.assertIsNotNone(presupuesto, 'La vista no tiene presupuesto de consultas.')
+        self.assertLessEqual(
+            response.consultas_db, presupuesto,
+            f'{response.consultas_db} consultas, el presupuesto es {presupuesto}.'
+        )
+
+    def assertTodasLasVistasConPresupuesto(self, apps=APPS_CON_PRESUPUESTO):
+        """Falla si alguna vista de las apps no declara su presupuesto."""
+        faltantes = vistas_sin_presupuesto(apps)
+        self.assertEqual(faltantes, [], f'Vistas sin presupuesto de consultas: {faltantes}')
@@ -0,0 +1,10 @@
+from django.test import SimpleTestCase
+
+from .testing import PresupuestoConsultasMixin
+
+
+class PresupuestoVistasTests(PresupuestoConsultasMixin, SimpleTestCase):
+    """Todas las vistas de la API declaran su presupuesto de consultas."""
+
+    def test_todas_las_vistas_con_presupuesto(self):
+        self.assertTodasLasVistasConPresupuesto()
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PedidosConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.pedidos'
+
+    def ready(self):
+        """Registra las señales de pedidos."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,61 @@
+"""
+Caché de "Mis pedidos": la primera página del listado de cada cliente.
+
+La clave incluye la versión de los pedidos del cliente, calculada en la base
+(cantidad y última fecha de actualización, con el índice pedido_cliente_sync_idx),
+como la versión del catálogo. Así, aunque cada worker tenga su propia caché en
+memoria, nunca se sirve una página desactualizada: al cambiar un pedido cambia
+la clave y las páginas anteriores dejan de usarse (expiran solas).
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+
+MIS_PEDIDOS_CACHE_TIMEOUT = 60 * 10  # 10 minutos
+
+
+def get_version_mis_pedidos(cliente_id):
+    """
+    Retorna una cadena que cambia cada vez que cambia algún pedido del cliente.
+
+    Todos los cambios de un pedido (incluidos los cambios de estado con UPDATE)
+    actualizan fecha_actualizacion; la cantidad detecta los borrados.
+    """
+    from .models import Pedido
+
+    datos = Pedido.objects.filter(cliente_id=cliente_id).aggregate(
+        cantidad=Count('id'),
+        actualizacion=Max('fecha_actualizacion'),
+    )
+    return f"{datos['cantidad']}:{datos['actualizacion'] and datos['actualizacion'].isoformat()}"
+
+
+def get_clave_mis_pedidos(request):
+    """
+    Clave de la página para el cliente del request.
+
+    Incluye la versión de sus pedidos, los parámetros (filtros, vista, formato)
+    y el host, que aparece en los links `next`/`previous` de la respuesta
+    paginada. Se calcula una sola vez, antes de consultar: si un pedido cambia
+    mientras se arma la página, la página queda guardada con la versión
+    anterior y no se usa.
+    """
+    cliente_id = request.user.id
+    partes = (
+        f'{get_version_mis_pedidos(cliente_id)}|'
+        f'{request.get_host()}|{sorted(request.query_params.lists())}'
+    )
+    digest = hashlib.sha256(partes.encode('utf-8')).hexdigest()[:32]
+    return f'mis_pedidos:{cliente_id}:{digest}'
+
+
+def get_mis_pedidos_cacheado(clave):
+    """Retorna el JSON (bytes) de la página cacheada, o None."""
+    return cache.get(clave)
+
+
+def set_mis_pedidos_cacheado(clave, contenido):
+    """Guarda el JSON renderizado de la página."""
+    cache.set(clave, contenido, timeout=MIS_PEDIDOS_CACHE_TIMEOUT)
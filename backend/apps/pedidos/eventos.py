@@ -0,0 +1,198 @@
+"""
+Eventos de cambios de pedidos para el endpoint SSE (/api/pedidos/eventos/).
+
+Al confirmar la transacción en la que se crea un pedido o cambia su estado se
+publica un evento compacto en el broker. El broker guarda los últimos eventos
+(para reanudar con Last-Event-ID) y despierta a las conexiones que esperan.
+
+- BrokerMemoria: dentro del proceso. Para desarrollo, tests o un solo worker.
+- BrokerRedis: con REDIS_URL, un stream de Redis compartido entre workers
+  (requiere el paquete `redis`).
+"""
+import asyncio
+import json
+import logging
+import re
+import threading
+import uuid
+import weakref
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger('eltetu')
+
+EVENTOS_MAXIMO = 1000  # Eventos guardados para reanudar conexiones
+EVENTOS_CLAVE_REDIS = 'pedidos:eventos'
+
+# Campos que se envían al cliente (el cliente del pedido solo se usa para filtrar)
+CAMPOS_EVENTO = ('tipo', 'id', 'estado', 'transportador', 'total')
+
+
+class BrokerMemoria:
+    """
+    Broker en memoria del proceso.
+
+    Los IDs llevan un prefijo distinto en cada arranque: un Last-Event-ID de un
+    proceso anterior no es válido y la conexión empieza desde el último evento.
+    """
+
+    def __init__(self, maximo=EVENTOS_MAXIMO):
+        self._epoca = uuid.uuid4().hex[:8]
+        self._eventos = deque(maxlen=maximo)
+        self._ultimo = 0
+        self._lock = threading.Lock()
+        self._suscriptores = set()
+
+    def publicar(self, evento):
+        """Guarda el evento y despierta a las conexiones (desde cualquier hilo)."""
+        with self._lock:
+            self._ultimo += 1
+            self._eventos.append((self._ultimo, evento))
+            suscriptores = list(self._suscriptores)
+        for loop, aviso in suscriptores:
+            try:
+                loop.call_soon_threadsafe(aviso.set)
+            except RuntimeError:
+                # El event loop de la conexión ya se cerró
+                pass
+
+    def id_valido(self, valor):
+        epoca, _, numero = (valor or '').partition('-')
+        return epoca == self._epoca and numero.isdigit()
+
+    async def ultimo_id(self):
+        return f'{self._epoca}-{self._ultimo}'
+
+    def _posteriores(self, desde):
+        with self._lock:
+            return [
+                (f'{self._epoca}-{numero}', evento)
+                for numero, evento in self._eventos if numero > desde
+            ]
+
+    async def leer(self, desde_id, espera):
+        """
+        Eventos posteriores a `desde_id` como [(id, evento)]. Si no hay, espera
+        hasta `espera` segundos a que se publique alguno.
+        """
+        desde = int(desde_id.partition('-')[2])
+        suscriptor = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._suscriptores.add(suscriptor)
+        try:
+            eventos = self._posteriores(desde)
+            if not eventos:
+                try:
+                    await asyncio.wait_for(suscriptor[1].wait(), espera)
+                except asyncio.TimeoutError:
+                    pass
+                eventos = self._posteriores(desde)
+            return eventos
+        finally:
+            with self._lock:
+                self._suscriptores.discard(suscriptor)
+
+
+class BrokerRedis:
+    """Broker sobre un stream de Redis (XADD / XREAD), compartido entre workers."""
+
+    PATRON_ID = re.compile(r'^\d+-\d+$')
+
+    def __init__(self, url, maximo=EVENTOS_MAXIMO):
+        import redis
+
+        self._url = url
+        self._maximo = maximo
+        self._redis = redis.Redis.from_url(url)
+        # Los clientes asyncio de redis no se comparten entre event loops
+        self._clientes_async = weakref.WeakKeyDictionary()
+
+    def publicar(self, evento):
+        self._redis.xadd(
+            EVENTOS_CLAVE_REDIS,
+            {'datos': json.dumps(evento)},
+            maxlen=self._maximo,
+            approximate=True,
+        )
+
+    def _cliente_async(self):
+        import redis.asyncio
+
+        loop = asyncio.get_running_loop()
+        if loop not in self._clientes_async:
+            self._clientes_async[loop] = redis.asyncio.Redis.from_url(self._url)
+        return self._clientes_async[loop]
+
+    def id_valido(self, valor):
+        return bool(valor and self.PATRON_ID.match(valor))
+
+    async def ultimo_id(self):
+        ultimos = await self._cliente_async().xrevrange(EVENTOS_CLAVE_REDIS, count=1)
+        return ultimos[0][0].decode() if ultimos else '0-0'
+
+    async def leer(self, desde_id, espera):
+        respuesta = await self._cliente_async().xread(
+            {EVENTOS_CLAVE_REDIS: desde_id}, block=int(espera * 1000), count=100
+        )
+        return [
+            (id_evento.decode(), json.loads(campos[b'datos']))
+            for _, entradas in respuesta or []
+            for id_evento, campos in entradas
+        ]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Broker del proceso: Redis si hay REDIS_URL, si no en memoria."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            redis_url = getattr(settings, 'REDIS_URL', '')
+            _broker = BrokerRedis(redis_url) if redis_url else BrokerMemoria()
+        return _broker
+
+
+def _publicar(evento):
+    try:
+        get_broker().publicar(evento)
+    except Exception as e:
+        # Los eventos son un aviso: si el broker falla, el cambio ya está guardado
+        logger.warning(f'No se pudo publicar el evento del pedido #{evento["id"]}: {e}')
+
+
+def publicar_evento_pedido(tipo, pedido_id, estado, cliente_id, transportador_id, total):
+    """
+    Publica el evento de un pedido al confirmar la transacción actual.
+
+    Args:
+        tipo: 'creado', 'estado' (cambio de estado) o 'actualizado'
+    """
+    evento = {
+        'tipo': tipo,
+        'id': pedido_id,
+        'estado': estado,
+        'cliente': cliente_id,
+        'transportador': transportador_id,
+        'total': str(total),
+    }
+    transaction.on_commit(lambda: _publicar(evento))
+
+
+def puede_ver_evento(user, evento):
+    """Admin y vendedor ven todos los pedidos; transportador y cliente solo los suyos."""
+    if user.is_admin() or user.is_vendedor():
+        return True
+    if user.is_transportador():
+        return evento['transportador'] == user.id
+    return evento['cliente'] == user.id
+
+
+def formatear_evento(id_evento, evento):
+    """Evento en formato SSE, solo con los campos públicos."""
+    datos = json.dumps({campo: evento[campo] for campo in CAMPOS_EVENTO})
+    return f'id: {id_evento}\nevent: pedido\ndata: {datos}\n\n'
@@ -0,0 +1,155 @@
+"""
+Idempotencia de los POST de pedidos (header Idempotency-Key).
+
+El cliente móvil corta los requests a los 15 s y el usuario vuelve a tocar
+"Confirmar". Si el request original llegó a crear el pedido, el reintento con
+la misma clave devuelve la respuesta guardada en vez de crear un duplicado.
+
+Las claves se guardan en la base (no en la caché local) para que el reintento
+se reconozca aunque lo atienda otro worker.
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .models import ClaveIdempotencia
+
+logger = logging.getLogger('eltetu')
+
+IDEMPOTENCIA_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+IDEMPOTENCIA_TTL = timedelta(hours=24)
+MAX_LONGITUD_CLAVE = 255
+
+
+def get_hash_request(request):
+    """Huella del request: método, ruta y cuerpo (JSON canónico)."""
+    cuerpo = json.dumps(request.data, sort_keys=True, separators=(',', ':'), default=str)
+    contenido = f'{request.method}|{request.path}|{cuerpo}'
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def con_idempotencia(request, procesar):
+    """
+    Ejecuta `procesar()` (que retorna un Response) respetando el header Idempotency-Key.
+    
+    - Sin header: ejecuta procesar() normalmente.
+    - Clave nueva: ejecuta procesar() y, si la respuesta es 2xx, la guarda.
+      Si falla (4xx/5xx) la clave se libera para poder reintentar.
+    - Clave ya usada con el mismo request: devuelve la respuesta guardada
+      (header `Idempotent-Replayed: true`), o 409 si todavía se está procesando.
+      Si lleva en proceso más de IDEMPOTENCIA_PENDIENTE_SEGUNDOS el worker que
+      la tomó murió (timeout, OOM, redeploy): se descarta y se procesa de nuevo.
+    - Clave ya usada con otro request: 422.
+    """
+    clave = request.META.get(IDEMPOTENCIA_HEADER)
+    if not clave:
+        return procesar()
+    
+    if len(clave) > MAX_LONGITUD_CLAVE:
+        return Response(
+            {'error': f'Idempotency-Key no puede superar los {MAX_LONGITUD_CLAVE} caracteres.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    hash_request = get_hash_request(request)
+    
+    # Descartar claves vencidas (índice sobre fecha_creacion)
+    ClaveIdempotencia.objects.filter(fecha_creacion__lt=timezone.now() - IDEMPOTENCIA_TTL).delete()
+    
+    registro = _tomar_clave(request, clave, hash_request)
+    if registro is None:
+        return _respuesta_guardada(request, clave, hash_request)
+    
+    try:
+        response = procesar()
+    except Exception:
+        registro.delete()
+        raise
+    
+    if status.is_success(response.status_code):
+        registro.status_code = response.status_code
+        # Se guarda tal como la recibió el cliente (ej: Decimal renderizado por DRF)
+        registro.respuesta = json.loads(JSONRenderer().render(response.data))
+        registro.save(update_fields=['status_code', 'respuesta'])
+    else:
+        registro.delete()
+    
+    return response
+
+
+def _crear_registro(request, clave, hash_request):
+    """Registra la clave como "en proceso"; None si ya existe."""
+    try:
+        with transaction.atomic():
+            return ClaveIdempotencia.objects.create(
+                usuario=request.user,
+                clave=clave,
+                hash_request=hash_request
+            )
+    except IntegrityError:
+        return None
+
+
+def _tomar_clave(request, clave, hash_request):
+    """
+    Toma la clave para procesar el request; None si la tiene otro request.
+
+    Una clave sin respuesta más vieja que IDEMPOTENCIA_PENDIENTE_SEGUNDOS quedó
+    abandonada. El borrado es condicional: si llegan dos reintentos a la vez
+    solo uno la borra, y el otro recibe 409 al intentar crearla.
+    """
+    registro = _crear_registro(request, clave, hash_request)
+    if registro is not None:
+        return registro
+    
+    limite = timezone.now() - timedelta(seconds=settings.IDEMPOTENCIA_PENDIENTE_SEGUNDOS)
+    borrados, _ = ClaveIdempotencia.objects.filter(
+        usuario=request.user,
+        clave=clave,
+        status_code__isnull=True,
+        fecha_creacion__lt=limite
+    ).delete()
+    if not borrados:
+        return None
+    
+    logger.warning(
+        f'Idempotency-Key de usuario {request.user.email} en proceso hace más de '
+        f'{settings.IDEMPOTENCIA_PENDIENTE_SEGUNDOS} s: se descarta y se procesa de nuevo'
+    )
+    return _crear_registro(request, clave, hash_request)
+
+
+def _respuesta_guardada(request, clave, hash_request):
+    """Respuesta para una clave que ya existe."""
+    registro = ClaveIdempotencia.objects.filter(usuario=request.user, clave=clave).first()
+    
+    if registro is None or registro.status_code is None:
+        # El request original sigue en proceso (o acaba de fallar)
+        return Response(
+            {'error': 'Hay un request en proceso con esta Idempotency-Key. Reintente en unos segundos.'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    if registro.hash_request != hash_request:
+        return Response(
+            {'error': 'La Idempotency-Key ya se usó con un request distinto.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    
+    logger.info(
+        f'Reintento con Idempotency-Key de usuario {request.user.email}: '
+        f'se devuelve la respuesta guardada'
+    )
+    return Response(
+        registro.respuesta,
+        status=registro.status_code,
+        headers={'Idempotent-Replayed': 'true'}
+    )
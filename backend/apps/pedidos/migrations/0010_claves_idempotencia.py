@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0009_add_promocion_to_pedidoitem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClaveIdempotencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=255, verbose_name='Clave')),
+                ('hash_request', models.CharField(help_text='SHA-256 del método, ruta y cuerpo del request original', max_length=64, verbose_name='Hash del Request')),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Código HTTP')),
+                ('respuesta', models.JSONField(blank=True, null=True, verbose_name='Respuesta')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Fecha de Creación')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='claves_idempotencia', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Clave de Idempotencia',
+                'verbose_name_plural': 'Claves de Idempotencia',
+                'unique_together': {('usuario', 'clave')},
+            },
+        ),
+    ]
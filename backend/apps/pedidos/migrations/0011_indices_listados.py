@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0010_claves_idempotencia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pedido',
+            name='estado_orden',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(estado='PENDIENTE', then=models.Value(0)), models.When(estado='EN_PREPARACION', then=models.Value(1)), models.When(estado='FACTURADO', then=models.Value(2)), models.When(estado='ENTREGADO', then=models.Value(3)), models.When(estado='RECHAZADO', then=models.Value(4)), default=models.Value(5)), output_field=models.PositiveSmallIntegerField(), verbose_name='Orden de Estado'),
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['estado_orden', '-fecha_creacion', '-id'], name='pedido_lista_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['cliente', 'estado_orden', '-fecha_creacion', '-id'], name='pedido_cliente_lista_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(condition=models.Q(('estado', 'FACTURADO')), fields=['transportador', 'fecha_creacion'], name='pedido_transp_facturado_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0012_indice_fecha_creacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PedidoBaja',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pedido_id', models.BigIntegerField(verbose_name='ID de Pedido')),
+                ('cliente_id', models.BigIntegerField(verbose_name='ID de Cliente')),
+                ('transportador_id', models.BigIntegerField(blank=True, help_text='Transportador que tenía el pedido asignado', null=True, verbose_name='ID de Transportador')),
+                ('motivo', models.CharField(choices=[('ELIMINADO', 'Eliminado'), ('REASIGNADO', 'Reasignado a otro transportador')], max_length=20, verbose_name='Motivo')),
+                ('fecha', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Fecha')),
+            ],
+            options={
+                'verbose_name': 'Baja de Pedido',
+                'verbose_name_plural': 'Bajas de Pedidos',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='pedido_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['cliente', 'fecha_actualizacion', 'id'], name='pedido_cliente_sync_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0013_sync_incremental'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['estado', 'estado_orden', '-fecha_creacion', '-id'], name='pedido_estado_lista_idx'),
+        ),
+    ]
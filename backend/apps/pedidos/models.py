@@ -1,6 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from apps.productos.models import Producto, Promocion
+from .eventos import publicar_evento_pedido
+
+
+class PedidoNoDisponibleError(ValueError):
+    """El pedido tiene productos o promociones no disponibles (se informan todos)."""
+    
+    def __init__(self, problemas):
+        self.problemas = problemas
+        super().__init__('\n'.join(problemas))
 
 
 class Pedido(models.Model):
@@ -14,6 +23,31 @@ class Pedido(models.Model):
         ('RECHAZADO', 'Rechazado'),
     )
     
+    # Transiciones permitidas:
+    # PENDIENTE -> EN_PREPARACION (aprobar) o RECHAZADO
+    # EN_PREPARACION -> FACTURADO o RECHAZADO
+    # FACTURADO -> ENTREGADO o RECHAZADO
+    # ENTREGADO y RECHAZADO son estados finales
+    TRANSICIONES = {
+        'PENDIENTE': ['EN_PREPARACION', 'RECHAZADO'],
+        'EN_PREPARACION': ['FACTURADO', 'RECHAZADO'],
+        'FACTURADO': ['ENTREGADO', 'RECHAZADO'],
+        'ENTREGADO': [],
+        'RECHAZADO': [],
+    }
+    
+    # Orden de los estados en los listados: activos primero, finales al final
+    ORDEN_ESTADOS = {estado: orden for orden, (estado, _) in enumerate(ESTADO_CHOICES)}
+    
+    # Fecha que se registra al llegar a cada estado
+    FECHAS_TRANSICION = {
+        'EN_PREPARACION': 'fecha_confirmacion',
+        'ENTREGADO': 'fecha_entrega',
+    }
+    
+    # Campos que se informan en los eventos; si ninguno cambia, save() no publica
+    CAMPOS_EVENTO = ('estado', 'transportador_id', 'total')
+    
     cliente = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -39,6 +73,19 @@ class Pedido(models.Model):
         verbose_name='Estado'
     )
     
+    # Clave de orden de los listados, calculada por la base a partir de `estado`
+    # (columna generada): siempre coincide, incluso con UPDATEs directos, y se
+    # puede indexar junto con la fecha de creación.
+    estado_orden = models.GeneratedField(
+        expression=models.Case(
+            *[models.When(estado=estado, then=models.Value(orden)) for estado, orden in ORDEN_ESTADOS.items()],
+            default=models.Value(len(ORDEN_ESTADOS)),
+        ),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+        verbose_name='Orden de Estado'
+    )
+    
     # Lista de precios utilizada en este pedido
     lista_precio = models.ForeignKey(
         'productos.ListaPrecio',
@@ -103,117 +150,320 @@ class Pedido(models.Model):
         verbose_name = 'Pedido'
         verbose_name_plural = 'Pedidos'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Listado de pedidos (PedidoListCreateView): orden por estado y fecha
+            models.Index(fields=['estado_orden', '-fecha_creacion', '-id'], name='pedido_lista_idx'),
+            # Listado filtrado por `estado` y ventas por estado de las estadísticas.
+            # estado_orden va segundo: con un solo estado el índice ya está en el
+            # orden del listado (el motor no sabe que estado_orden queda fijo)
+            models.Index(fields=['estado', 'estado_orden', '-fecha_creacion', '-id'], name='pedido_estado_lista_idx'),
+            # Listado de un cliente ("Mis pedidos" y filtro `cliente`)
+            models.Index(fields=['cliente', 'estado_orden', '-fecha_creacion', '-id'], name='pedido_cliente_lista_idx'),
+            # Pedidos a entregar de cada transportador (PedidoTransportadorListView)
+            models.Index(
+                fields=['transportador', 'fecha_creacion'],
+                condition=models.Q(estado='FACTURADO'),
+                name='pedido_transp_facturado_idx'
+            ),
+            # Rangos de fechas (filtros desde/hasta y estadísticas del mes)
+            models.Index(fields=['fecha_creacion'], name='pedido_fecha_creacion_idx'),
+            # Sincronización incremental (PedidoSyncView): cambios desde el cursor
+            models.Index(fields=['fecha_actualizacion', 'id'], name='pedido_sync_idx'),
+            models.Index(fields=['cliente', 'fecha_actualizacion', 'id'], name='pedido_cliente_sync_idx'),
+        ]
     
     def __str__(self):
         return f"Pedido #{self.id} - {self.cliente.full_name} - {self.get_estado_display()}"
     
-    def calcular_totales(self):
-        """Calcula subtotal, descuentos y total del pedido."""
-        items = self.items.all()
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._guardar_valores_originales()
+        return instance
+    
+    def _guardar_valores_originales(self):
+        """Valores guardados en la base, para detectar en save() reasignaciones y cambios."""
+        self._valores_originales = {
+            campo: self.__dict__[campo]
+            for campo in self.CAMPOS_EVENTO if campo in self.__dict__
+        }
+    
+    def _cambio_campos_evento(self):
+        """Indica si cambió algún campo de CAMPOS_EVENTO desde que se cargó el pedido."""
+        originales = getattr(self, '_valores_originales', None)
+        if originales is None:
+            return True
+        return any(
+            originales.get(campo) != self.__dict__.get(campo)
+            for campo in self.CAMPOS_EVENTO
+            if campo in originales or campo in self.__dict__
+        )
+    
+    def save(self, *args, **kwargs):
+        """
+        Guarda el pedido y, si se creó o cambió su estado, transportador o
+        total, publica el evento para /api/pedidos/eventos/.
+        
+        Si se le quitó el pedido a un transportador lo registra en PedidoBaja
+        (en la misma transacción) para que la sincronización se lo informe.
+        """
+        creado = self._state.adding
+        originales = getattr(self, '_valores_originales', {})
+        anterior = originales.get('transportador_id')
+        publicar = creado or self._cambio_campos_evento()
+        
+        if anterior and anterior != self.transportador_id:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                PedidoBaja.objects.create(
+                    pedido_id=self.pk,
+                    cliente_id=self.cliente_id,
+                    transportador_id=anterior,
+                    motivo='REASIGNADO'
+                )
+        else:
+            super().save(*args, **kwargs)
+        
+        self._guardar_valores_originales()
+        if publicar:
+            publicar_evento_pedido(
+                'creado' if creado else 'actualizado',
+                self.pk, self.estado, self.cliente_id, self.transportador_id, self.total
+            )
+    
+    def calcular_totales(self, items=None, guardar=True):
+        """
+        Calcula subtotal, descuentos y total del pedido.
+        
+        Args:
+            items: items ya en memoria (ej: al crear el pedido). Si es None se leen de la base.
+            guardar: si es False solo asigna los totales, sin guardar el pedido.
+        """
+        if items is None:
+            items = self.items.all()
         
         self.subtotal = sum(item.subtotal for item in items if item.subtotal)
         self.descuento_total = sum(item.descuento for item in items if item.descuento)
         self.total = self.subtotal - self.descuento_total
         
-        self.save()
+        if guardar:
+            self.save()
     
     def aprobar(self):
         """
         Aprueba el pedido pasándolo a EN_PREPARACION.
         
-        Verifica que los productos y promociones estén activos y disponibles.
+        Verifica que los productos y promociones (y los productos de cada
+        promoción) estén activos y disponibles. Si hay problemas los informa
+        todos juntos en un PedidoNoDisponibleError.
         """
-        from django.utils import timezone
-        from apps.productos.models import Promocion
-        
         if self.estado != 'PENDIENTE':
             raise ValueError('Solo se pueden aprobar pedidos pendientes.')
         
-        # Obtener IDs de productos y promociones
-        producto_ids = list(self.items.filter(producto_id__isnull=False).values_list('producto_id', flat=True).distinct())
-        promocion_ids = list(self.items.filter(promocion_id__isnull=False).values_list('promocion_id', flat=True).distinct())
-        
-        # Verificar que el pedido tenga al menos un producto o promoción
-        if not producto_ids and not promocion_ids:
-            raise ValueError('El pedido no tiene productos ni promociones válidas.')
+        problemas = Pedido.get_problemas_disponibilidad([self.pk]).get(self.pk)
+        if problemas:
+            raise PedidoNoDisponibleError(problemas)
         
-        # Verificar disponibilidad de productos
-        if producto_ids:
-            productos = Producto.objects.filter(id__in=producto_ids)
-            productos_dict = {p.id: p for p in productos}
-            
-            for item in self.items.filter(producto_id__isnull=False):
-                producto = productos_dict.get(item.producto_id)
-                if not producto:
-                    raise ValueError(f'El producto del item {item.id} no existe o fue eliminado.')
-                
-                if not producto.activo:
-                    raise ValueError(f'El producto "{producto.nombre}" no está disponible.')
-                
-                if not producto.tiene_stock:
-                    raise ValueError(f'El producto "{producto.nombre}" no tiene stock disponible.')
-        
-        # Verificar disponibilidad de promociones
-        if promocion_ids:
-            promociones = Promocion.objects.filter(id__in=promocion_ids)
-            promociones_dict = {p.id: p for p in promociones}
-            
-            for item in self.items.filter(promocion_id__isnull=False):
-                promocion = promociones_dict.get(item.promocion_id)
-                if not promocion:
-                    raise ValueError(f'La promoción del item {item.id} no existe o fue eliminada.')
-                
-                if not promocion.activo:
-                    raise ValueError(f'La promoción "{promocion.nombre}" no está disponible.')
-                
-                if not promocion.esta_vigente:
-                    raise ValueError(f'La promoción "{promocion.nombre}" ya no está vigente.')
-                
-                # Verificar productos dentro de la promoción
-                for promo_item in promocion.items.all():
-                    if not promo_item.producto.activo or not promo_item.producto.tiene_stock:
-                        raise ValueError(f'El producto "{promo_item.producto.nombre}" de la promoción "{promocion.nombre}" no está disponible.')
-        
-        # Actualizar estado del pedido
-        self.estado = 'EN_PREPARACION'
-        self.fecha_confirmacion = timezone.now()
-        self.save()
+        # Actualizar estado del pedido (solo si sigue pendiente)
+        self._cambiar_estado('EN_PREPARACION', 'Solo se pueden aprobar pedidos pendientes.')
     
     def facturar(self):
         """
         Marca el pedido como facturado.
         """
-        if self.estado != 'EN_PREPARACION':
-            raise ValueError('Solo se pueden facturar pedidos en preparación.')
-        
-        self.estado = 'FACTURADO'
-        self.save()
+        self._cambiar_estado('FACTURADO', 'Solo se pueden facturar pedidos en preparación.')
     
-    def entregar(self):
+    def entregar(self, transportador=None):
         """
         Marca el pedido como entregado.
+        
+        Args:
+            transportador: si se indica, solo entrega si el pedido sigue asignado a él
+        """
+        filtros = {'transportador': transportador} if transportador else {}
+        try:
+            self._cambiar_estado('ENTREGADO', 'Solo se pueden entregar pedidos facturados.', filtros)
+        except ValueError:
+            if self.estado == 'FACTURADO' and transportador:
+                raise ValueError('El pedido ya no está asignado a este transportador.')
+            raise
+    
+    def rechazar(self):
+        """
+        Rechaza el pedido.
         """
+        try:
+            self._cambiar_estado('RECHAZADO', 'No se puede rechazar el pedido en su estado actual.')
+        except ValueError:
+            if self.estado == 'RECHAZADO':
+                raise ValueError('El pedido ya está rechazado.')
+            if self.estado == 'ENTREGADO':
+                raise ValueError('No se puede rechazar un pedido ya entregado.')
+            raise
+    
+    @classmethod
+    def get_problemas_disponibilidad(cls, pedido_ids):
+        """
+        Problemas de disponibilidad de varios pedidos, con una consulta para
+        todos los items no disponibles (productos, promociones y productos de
+        cada promoción) y otra para los pedidos sin items válidos.
+        
+        Returns:
+            dict: {pedido_id: [mensajes]} solo para los pedidos con problemas
+        """
+        from django.db.models import Q
+        from django.utils import timezone
+        
+        ahora = timezone.now()
+        no_disponibles = (
+            Q(producto__activo=False) |
+            Q(producto__tiene_stock=False) |
+            Q(promocion__activo=False) |
+            Q(promocion__fecha_inicio__gt=ahora) |
+            Q(promocion__fecha_fin__lt=ahora) |
+            Q(promocion__items__producto__activo=False) |
+            Q(promocion__items__producto__tiene_stock=False)
+        )
+        filas = PedidoItem.objects.filter(no_disponibles, pedido_id__in=pedido_ids).values(
+            'pedido_id',
+            'producto__nombre', 'producto__activo', 'producto__tiene_stock',
+            'promocion__nombre', 'promocion__activo', 'promocion__fecha_inicio', 'promocion__fecha_fin',
+            'promocion__items__producto__nombre',
+            'promocion__items__producto__activo',
+            'promocion__items__producto__tiene_stock',
+        ).order_by('pedido_id', 'id')
+        
+        problemas = {}
+        
+        # Pedidos sin ningún producto ni promoción (ej: todos fueron eliminados)
+        con_items = set(
+            PedidoItem.objects.filter(pedido_id__in=pedido_ids).filter(
+                Q(producto__isnull=False) | Q(promocion__isnull=False)
+            ).values_list('pedido_id', flat=True).distinct()
+        )
+        for pedido_id in pedido_ids:
+            if pedido_id not in con_items:
+                problemas[pedido_id] = ['El pedido no tiene productos ni promociones válidas.']
+        
+        for fila in filas:
+            mensajes = problemas.setdefault(fila['pedido_id'], [])
+            producto = fila['producto__nombre']
+            promocion = fila['promocion__nombre']
+            componente = fila['promocion__items__producto__nombre']
+            
+            if producto is not None:
+                if not fila['producto__activo']:
+                    mensaje = f'El producto "{producto}" no está disponible.'
+                else:
+                    mensaje = f'El producto "{producto}" no tiene stock disponible.'
+            elif not fila['promocion__activo']:
+                mensaje = f'La promoción "{promocion}" no está disponible.'
+            elif (
+                (fila['promocion__fecha_inicio'] and fila['promocion__fecha_inicio'] > ahora) or
+                (fila['promocion__fecha_fin'] and fila['promocion__fecha_fin'] < ahora)
+            ):
+                mensaje = f'La promoción "{promocion}" ya no está vigente.'
+            else:
+                mensaje = f'El producto "{componente}" de la promoción "{promocion}" no está disponible.'
+            
+            if mensaje not in mensajes:
+                mensajes.append(mensaje)
+        
+        return problemas
+    
+    @classmethod
+    def estados_origen(cls, nuevo_estado):
+        """Estados desde los que se puede pasar a `nuevo_estado`."""
+        return [origen for origen, destinos in cls.TRANSICIONES.items() if nuevo_estado in destinos]
+    
+    @classmethod
+    def valores_transicion(cls, nuevo_estado):
+        """Columnas a escribir al pasar a `nuevo_estado` (estado, fecha de actualización y fecha propia)."""
         from django.utils import timezone
         
-        if self.estado != 'FACTURADO':
-            raise ValueError('Solo se pueden entregar pedidos facturados.')
+        ahora = timezone.now()
+        valores = {'estado': nuevo_estado, 'fecha_actualizacion': ahora}
+        if nuevo_estado in cls.FECHAS_TRANSICION:
+            valores[cls.FECHAS_TRANSICION[nuevo_estado]] = ahora
+        return valores
+    
+    def _cambiar_estado(self, nuevo_estado, mensaje_error, filtros=None):
+        """
+        Cambia el estado con un único UPDATE condicional:
+        UPDATE ... SET estado=..., fecha_x=... WHERE id=... AND estado IN (<estados de origen>)
+        
+        Si otro usuario cambió el estado mientras tanto no se actualiza ninguna
+        fila: se recarga el estado actual y se lanza ValueError(mensaje_error).
+        Solo escribe las columnas que cambian (no reescribe todo el pedido).
+        """
+        valores = self.valores_transicion(nuevo_estado)
+        filas = Pedido.objects.filter(
+            pk=self.pk, estado__in=self.estados_origen(nuevo_estado), **(filtros or {})
+        ).update(**valores)
+        
+        if filas == 0:
+            self.refresh_from_db(fields=['estado', 'transportador'])
+            self._guardar_valores_originales()
+            raise ValueError(mensaje_error)
         
-        self.estado = 'ENTREGADO'
-        self.fecha_entrega = timezone.now()
-        self.save()
+        for campo, valor in valores.items():
+            setattr(self, campo, valor)
+        self.estado_orden = self.ORDEN_ESTADOS[nuevo_estado]
+        self._guardar_valores_originales()
+        publicar_evento_pedido(
+            'estado', self.pk, nuevo_estado, self.cliente_id, self.transportador_id, self.total
+        )
     
-    def rechazar(self):
+    @classmethod
+    def cambiar_estado_en_bloque(cls, ids, nuevo_estado):
         """
-        Rechaza el pedido.
+        Cambia el estado de varios pedidos.
+        
+        Bloquea las filas, valida todas las transiciones con una consulta y
+        aplica las válidas con un único UPDATE. Para aprobar (EN_PREPARACION)
+        verifica además la disponibilidad de todos los pedidos juntos.
+        
+        Returns:
+            dict: {id: None si se actualizó, o el mensaje de error}
         """
-        if self.estado == 'RECHAZADO':
-            raise ValueError('El pedido ya está rechazado.')
+        origenes = cls.estados_origen(nuevo_estado)
+        resultados = {}
         
-        if self.estado == 'ENTREGADO':
-            raise ValueError('No se puede rechazar un pedido ya entregado.')
+        with transaction.atomic():
+            actuales = {
+                fila['id']: fila
+                for fila in cls.objects.select_for_update().filter(id__in=ids).values(
+                    'id', 'estado', 'cliente_id', 'transportador_id', 'total'
+                )
+            }
+            validos = []
+            for pedido_id in ids:
+                estado = actuales.get(pedido_id, {}).get('estado')
+                if estado is None:
+                    resultados[pedido_id] = 'El pedido no existe.'
+                elif estado not in origenes:
+                    resultados[pedido_id] = f'No se puede cambiar de {estado} a {nuevo_estado}.'
+                else:
+                    validos.append(pedido_id)
+            
+            if nuevo_estado == 'EN_PREPARACION':
+                # Disponibilidad de todos los pedidos a aprobar en una sola pasada
+                problemas = cls.get_problemas_disponibilidad(validos)
+                for pedido_id, mensajes in problemas.items():
+                    resultados[pedido_id] = '\n'.join(mensajes)
+                validos = [pedido_id for pedido_id in validos if pedido_id not in problemas]
+            
+            if validos:
+                cls.objects.filter(id__in=validos).update(**cls.valores_transicion(nuevo_estado))
+                resultados.update({pedido_id: None for pedido_id in validos})
+                for pedido_id in validos:
+                    fila = actuales[pedido_id]
+                    publicar_evento_pedido(
+                        'estado', pedido_id, nuevo_estado,
+                        fila['cliente_id'], fila['transportador_id'], fila['total']
+                    )
         
-        self.estado = 'RECHAZADO'
-        self.save()
+        return resultados
 
 
 class PedidoItem(models.Model):
@@ -307,11 +557,15 @@ class PedidoItem(models.Model):
             nombre = "Item eliminado"
         return f"{nombre} x{self.cantidad}"
     
+    def calcular_subtotal(self):
+        """Calcula el subtotal (precio unitario por cantidad) sin guardar."""
+        self.subtotal = self.precio_unitario * self.cantidad
+    
     def save(self, *args, **kwargs):
         """Calcula subtotal y guarda snapshots antes de guardar."""
         # Calcular subtotal
         if self.precio_unitario and self.cantidad:
-            self.subtotal = self.precio_unitario * self.cantidad
+            self.calcular_subtotal()
         
         # Guardar snapshots del producto o promoción si no están guardados
         if not self.producto_nombre_snapshot:
@@ -323,3 +577,73 @@ class PedidoItem(models.Model):
                 self.producto_codigo_snapshot = None
         
         super().save(*args, **kwargs)
+
+
+class ClaveIdempotencia(models.Model):
+    """
+    Respuesta guardada de un POST enviado con el header Idempotency-Key.
+    
+    Un reintento con la misma clave devuelve la respuesta guardada en lugar de
+    crear otro pedido (ver apps/pedidos/idempotencia.py).
+    """
+    
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='claves_idempotencia',
+        verbose_name='Usuario'
+    )
+    clave = models.CharField(max_length=255, verbose_name='Clave')
+    hash_request = models.CharField(
+        max_length=64,
+        verbose_name='Hash del Request',
+        help_text='SHA-256 del método, ruta y cuerpo del request original'
+    )
+    
+    # Null mientras el request original se está procesando
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name='Código HTTP')
+    respuesta = models.JSONField(null=True, blank=True, verbose_name='Respuesta')
+    
+    fecha_creacion = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Fecha de Creación')
+    
+    class Meta:
+        verbose_name = 'Clave de Idempotencia'
+        verbose_name_plural = 'Claves de Idempotencia'
+        unique_together = [['usuario', 'clave']]
+    
+    def __str__(self):
+        return f"{self.clave} ({self.usuario_id})"
+
+
+class PedidoBaja(models.Model):
+    """
+    Registro de pedidos que salieron del alcance de un usuario.
+    
+    La sincronización incremental (PedidoSyncView) solo ve los pedidos que
+    siguen existiendo y asignados a quien sincroniza: un borrado físico o una
+    reasignación a otro transportador no dejan rastro en el pedido, así que se
+    guardan aquí.
+    """
+    
+    MOTIVO_CHOICES = (
+        ('ELIMINADO', 'Eliminado'),
+        ('REASIGNADO', 'Reasignado a otro transportador'),
+    )
+    
+    pedido_id = models.BigIntegerField(verbose_name='ID de Pedido')
+    cliente_id = models.BigIntegerField(verbose_name='ID de Cliente')
+    transportador_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='ID de Transportador',
+        help_text='Transportador que tenía el pedido asignado'
+    )
+    motivo = models.CharField(max_length=20, choices=MOTIVO_CHOICES, verbose_name='Motivo')
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Fecha')
+    
+    class Meta:
+        verbose_name = 'Baja de Pedido'
+        verbose_name_plural = 'Bajas de Pedidos'
+    
+    def __str__(self):
+        return f"Pedido #{self.pedido_id} - {self.get_motivo_display()}"
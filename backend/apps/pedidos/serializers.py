@@ -1,8 +1,11 @@
 from rest_framework import serializers
+from django.db import transaction
 import logging
 
 from apps.productos.serializers import ProductoListSerializer
-from apps.productos.models import Producto, Promocion
+from apps.productos.models import Producto, Promocion, ListaPrecio
+from apps.productos.precios import get_precios_lista, get_precios_listas, get_precio_producto
+from apps.users.models import CustomUser
 from apps.users.serializers import HorarioClienteSerializer
 from .models import Pedido, PedidoItem
 
@@ -64,10 +67,13 @@ class PedidoItemCreateSerializer(serializers.ModelSerializer):
         return value
     
     def validate(self, data):
-        """Valida stock/disponibilidad del producto o promoción."""
+        """
+        Valida que el item tenga exactamente un producto o una promoción.
+        La existencia y disponibilidad se validan para todos los items juntos
+        en PedidoCreateSerializer.validate_items (consultas por conjunto).
+        """
         producto_value = data.get('producto')
         promocion_value = data.get('promocion')
-        # cantidad se valida en validate_cantidad, aquí no se necesita
         
         # Debe haber exactamente uno de los dos
         if not producto_value and not promocion_value:
@@ -80,75 +86,6 @@ class PedidoItemCreateSerializer(serializers.ModelSerializer):
                 'non_field_errors': 'No puede especificar producto y promoción a la vez.'
             })
         
-        # Validar PRODUCTO
-        if producto_value:
-            if isinstance(producto_value, Producto):
-                producto = producto_value
-            else:
-                try:
-                    producto = Producto.objects.get(pk=producto_value)
-                except Producto.DoesNotExist:
-                    raise serializers.ValidationError({
-                        'producto': 'El producto especificado no existe.'
-                    })
-            
-            data['producto'] = producto.id
-            data['_producto_obj'] = producto  # Para uso interno
-            
-            if not producto.activo:
-                logger.warning(
-                    f'Intento de agregar producto inactivo al pedido: {producto.nombre} (ID: {producto.id})'
-                )
-                raise serializers.ValidationError({
-                    'producto': f'El producto "{producto.nombre}" no está disponible actualmente.'
-                })
-            
-            if hasattr(producto, 'is_deleted') and producto.is_deleted:
-                raise serializers.ValidationError({
-                    'producto': f'El producto "{producto.nombre}" ya no está disponible.'
-                })
-            
-            if not producto.tiene_stock:
-                logger.warning(f'Producto sin stock: {producto.nombre} (ID: {producto.id})')
-                raise serializers.ValidationError({
-                    'producto': f'El producto "{producto.nombre}" no tiene stock disponible.'
-                })
-        
-        # Validar PROMOCIÓN
-        if promocion_value:
-            if isinstance(promocion_value, Promocion):
-                promocion = promocion_value
-            else:
-                try:
-                    promocion = Promocion.objects.get(pk=promocion_value)
-                except Promocion.DoesNotExist:
-                    raise serializers.ValidationError({
-                        'promocion': 'La promoción especificada no existe.'
-                    })
-            
-            data['promocion'] = promocion.id
-            data['_promocion_obj'] = promocion  # Para uso interno
-            
-            if not promocion.activo:
-                logger.warning(
-                    f'Intento de agregar promoción inactiva al pedido: {promocion.nombre} (ID: {promocion.id})'
-                )
-                raise serializers.ValidationError({
-                    'promocion': f'La promoción "{promocion.nombre}" no está disponible actualmente.'
-                })
-            
-            if not promocion.esta_vigente:
-                raise serializers.ValidationError({
-                    'promocion': f'La promoción "{promocion.nombre}" no está vigente.'
-                })
-            
-            # Verificar que los productos de la promoción estén disponibles
-            for item in promocion.items.all():
-                if not item.producto.activo or not item.producto.tiene_stock:
-                    raise serializers.ValidationError({
-                        'promocion': f'El producto "{item.producto.nombre}" de la promoción no está disponible.'
-                    })
-        
         return data
 
 
@@ -189,9 +126,131 @@ class PedidoSerializer(serializers.ModelSerializer):
         return obj.lista_precio.descuento_porcentaje if obj.lista_precio else 0
 
 
+class PedidoResumenSerializer(PedidoSerializer):
+    """
+    Serializer para pedido en listados (lectura), sin el detalle de items.
+    
+    Requiere las anotaciones `items_count`, `cliente_nombre` y
+    `transportador_nombre` (ver PedidoListCreateView).
+    """
+    
+    items_count = serializers.IntegerField(read_only=True)
+    cliente_nombre = serializers.CharField(read_only=True)
+    transportador_nombre = serializers.CharField(read_only=True, allow_null=True)
+    
+    class Meta(PedidoSerializer.Meta):
+        fields = [
+            'id', 'cliente', 'cliente_nombre', 'estado',
+            'transportador', 'transportador_nombre',
+            'lista_precio', 'lista_precio_nombre', 'lista_precio_descuento',
+            'subtotal', 'descuento_total', 'total',
+            'items_count', 'notas',
+            'fecha_creacion', 'fecha_actualizacion',
+            'fecha_confirmacion', 'fecha_entrega'
+        ]
+
+
+class PrecargadoPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField que, si el contexto trae objetos precargados
+    (carga masiva de pedidos), los usa en lugar de consultar uno por uno.
+    """
+    
+    def __init__(self, clave_contexto, **kwargs):
+        self.clave_contexto = clave_contexto
+        super().__init__(**kwargs)
+    
+    def to_internal_value(self, data):
+        precargados = self.context.get(self.clave_contexto)
+        if precargados is None:
+            return super().to_internal_value(data)
+        
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        
+        obj = precargados.get(pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
+def _ids_validos(valores):
+    """IDs enteros de una lista de valores sin validar (los inválidos los reporta el serializer)."""
+    ids = set()
+    for valor in valores:
+        if isinstance(valor, bool):
+            continue
+        try:
+            ids.add(int(valor))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def get_contexto_precargado(pedidos_data):
+    """
+    Precarga en pocas consultas los clientes, listas, productos, promociones y
+    precios de lista referenciados por varios pedidos sin validar (carga masiva).
+    
+    Retorna el contexto para PedidoCreateSerializer: con él, validar y crear N
+    pedidos no consulta la base por cada pedido ni por cada item.
+    """
+    pedidos_data = [pedido for pedido in pedidos_data if isinstance(pedido, dict)]
+    items = [
+        item
+        for pedido in pedidos_data if isinstance(pedido.get('items'), list)
+        for item in pedido['items'] if isinstance(item, dict)
+    ]
+    
+    clientes = CustomUser.objects.select_related('lista_precio').in_bulk(
+        _ids_validos(pedido.get('cliente') for pedido in pedidos_data)
+    )
+    listas = ListaPrecio.objects.in_bulk(
+        _ids_validos(pedido.get('lista_precio') for pedido in pedidos_data)
+    )
+    productos = Producto.objects.in_bulk(
+        _ids_validos(item.get('producto') for item in items)
+    )
+    
+    # Precios de todas las listas que pueden aplicarse: las indicadas y las de los clientes
+    listas_aplicables = {lista.id: lista for lista in listas.values()}
+    for cliente in clientes.values():
+        if cliente.lista_precio:
+            listas_aplicables[cliente.lista_precio.id] = cliente.lista_precio
+    
+    return {
+        'clientes_precargados': clientes,
+        'listas_precargadas': listas,
+        'productos_precargados': productos,
+        'promociones_precargadas': Promocion.objects.prefetch_related('items__producto').in_bulk(
+            _ids_validos(item.get('promocion') for item in items)
+        ),
+        'precios_precargados': get_precios_listas(listas_aplicables.values(), list(productos)),
+    }
+
+
 class PedidoCreateSerializer(serializers.ModelSerializer):
-    """Serializer para crear pedido."""
+    """
+    Serializer para crear pedido.
+    
+    Acepta en el contexto los objetos precargados por get_contexto_precargado()
+    para validar muchos pedidos sin consultas por pedido.
+    """
     
+    cliente = PrecargadoPrimaryKeyRelatedField(
+        'clientes_precargados',
+        queryset=CustomUser.objects.all()
+    )
+    lista_precio = PrecargadoPrimaryKeyRelatedField(
+        'listas_precargadas',
+        queryset=ListaPrecio.objects.all(),
+        required=False,
+        allow_null=True
+    )
     items = PedidoItemCreateSerializer(many=True)
     
     class Meta:
@@ -199,13 +258,120 @@ class PedidoCreateSerializer(serializers.ModelSerializer):
         fields = ['cliente', 'lista_precio', 'items', 'notas']
     
     def validate_items(self, value):
-        """Valida que haya al menos un item."""
+        """
+        Valida que haya al menos un item y la disponibilidad de todos los items.
+        
+        Carga todos los productos en una consulta y todas las promociones (con
+        sus productos) en otra, en lugar de consultar item por item. Reporta
+        juntos los errores de todos los items, en la posición de cada uno.
+        """
         if not value:
             raise serializers.ValidationError('El pedido debe tener al menos un item.')
+        
+        productos = self.context.get('productos_precargados')
+        if productos is None:
+            productos = Producto.objects.in_bulk(
+                {item['producto'] for item in value if item.get('producto')}
+            )
+        promociones = self.context.get('promociones_precargadas')
+        if promociones is None:
+            promociones = Promocion.objects.prefetch_related('items__producto').in_bulk(
+                {item['promocion'] for item in value if item.get('promocion')}
+            )
+        
+        errores = []
+        for item in value:
+            if item.get('producto'):
+                error = self._validar_producto(item, productos.get(item['producto']))
+            else:
+                error = self._validar_promocion(item, promociones.get(item['promocion']))
+            # Mismo formato que los errores de un serializer hijo: {campo: [mensaje]}
+            errores.append({campo: [mensaje] for campo, mensaje in error.items()} if error else {})
+        
+        if any(errores):
+            raise serializers.ValidationError(errores)
         return value
     
+    def _validar_producto(self, item, producto):
+        """Retorna el error del item de producto, o None si está disponible."""
+        if producto is None:
+            return {'producto': 'El producto especificado no existe.'}
+        
+        item['_producto_obj'] = producto  # Para uso interno
+        
+        if not producto.activo:
+            logger.warning(
+                f'Intento de agregar producto inactivo al pedido: {producto.nombre} (ID: {producto.id})'
+            )
+            return {'producto': f'El producto "{producto.nombre}" no está disponible actualmente.'}
+        
+        if producto.is_deleted:
+            return {'producto': f'El producto "{producto.nombre}" ya no está disponible.'}
+        
+        if not producto.tiene_stock:
+            logger.warning(f'Producto sin stock: {producto.nombre} (ID: {producto.id})')
+            return {'producto': f'El producto "{producto.nombre}" no tiene stock disponible.'}
+        
+        return None
+    
+    def _validar_promocion(self, item, promocion):
+        """Retorna el error del item de promoción, o None si está disponible."""
+        if promocion is None:
+            return {'promocion': 'La promoción especificada no existe.'}
+        
+        item['_promocion_obj'] = promocion  # Para uso interno
+        
+        if not promocion.activo:
+            logger.warning(
+                f'Intento de agregar promoción inactiva al pedido: {promocion.nombre} (ID: {promocion.id})'
+            )
+            return {'promocion': f'La promoción "{promocion.nombre}" no está disponible actualmente.'}
+        
+        if not promocion.esta_vigente:
+            return {'promocion': f'La promoción "{promocion.nombre}" no está vigente.'}
+        
+        # Verificar que los productos de la promoción estén disponibles (prefetch)
+        for promo_item in promocion.items.all():
+            if not promo_item.producto.activo or not promo_item.producto.tiene_stock:
+                return {
+                    'promocion': f'El producto "{promo_item.producto.nombre}" de la promoción no está disponible.'
+                }
+        
+        return None
+    
     def create(self, validated_data):
-        """Crea pedido con items (productos o promociones), validando stock antes de crear."""
+        """Crea pedido con items (productos o promociones) ya validados."""
+        pedido, items = self.armar_pedido(validated_data)
+        
+        # Pedido con los totales finales (un solo INSERT) e items en bloque. Sin
+        # savepoint propio: dentro de la carga masiva ya hay uno por pedido
+        with transaction.atomic(savepoint=False):
+            pedido.save()
+            PedidoItem.objects.bulk_create(items)
+        
+        logger.info(
+            f'Pedido #{pedido.id} creado por cliente {pedido.cliente.email} '
+            f'con {len(items)} items'
+        )
+        
+        return pedido
+    
+    def cotizar(self, **kwargs):
+        """
+        Arma el pedido y sus items en memoria, con precios y totales, sin guardar nada.
+        Recibe los mismos kwargs que save() (ej: cliente=request.user).
+        
+        Returns:
+            tuple: (pedido, items) sin guardar
+        """
+        return self.armar_pedido({**self.validated_data, **kwargs})
+    
+    def armar_pedido(self, validated_data):
+        """
+        Arma el Pedido y sus PedidoItem en memoria (sin guardar) a partir de los
+        datos validados: lista de precios, snapshots, precios, subtotales y totales.
+        """
+        validated_data = dict(validated_data)
         items_data = validated_data.pop('items')
         cliente = validated_data.get('cliente')
         
@@ -219,128 +385,128 @@ class PedidoCreateSerializer(serializers.ModelSerializer):
             validated_data['lista_precio_nombre_snapshot'] = lista_precio.nombre
             validated_data['lista_precio_descuento_snapshot'] = lista_precio.descuento_porcentaje
         
-        # Validar y preparar items ANTES de crear el pedido
-        items_preparados = []
-        for item_data in items_data:
-            producto_value = item_data.get('producto')
-            promocion_value = item_data.get('promocion')
-            cantidad = item_data.get('cantidad')
-            
-            # Usar objetos cacheados del serializer si existen
-            producto_obj = item_data.get('_producto_obj')
-            promocion_obj = item_data.get('_promocion_obj')
-            
-            if producto_value and not producto_obj:
-                # Es un item de producto
-                if isinstance(producto_value, Producto):
-                    producto_obj = producto_value
-                else:
-                    try:
-                        producto_obj = Producto.objects.get(pk=producto_value)
-                    except Producto.DoesNotExist:
-                        raise serializers.ValidationError({
-                            'items': f'El producto con ID {producto_value} no existe.'
-                        })
-                
-                if not producto_obj.activo:
-                    raise serializers.ValidationError({
-                        'items': f'El producto "{producto_obj.nombre}" no está disponible.'
-                    })
-                
-                if not producto_obj.tiene_stock:
-                    raise serializers.ValidationError({
-                        'items': f'El producto "{producto_obj.nombre}" no tiene stock disponible.'
-                    })
-                
-                items_preparados.append({
-                    'tipo': 'producto',
-                    'objeto': producto_obj,
-                    'cantidad': cantidad
-                })
-            
-            elif promocion_value and not promocion_obj:
-                # Es un item de promoción
-                if isinstance(promocion_value, Promocion):
-                    promocion_obj = promocion_value
-                else:
-                    try:
-                        promocion_obj = Promocion.objects.get(pk=promocion_value)
-                    except Promocion.DoesNotExist:
-                        raise serializers.ValidationError({
-                            'items': f'La promoción con ID {promocion_value} no existe.'
-                        })
-                
-                if not promocion_obj.activo or not promocion_obj.esta_vigente:
-                    raise serializers.ValidationError({
-                        'items': f'La promoción "{promocion_obj.nombre}" no está disponible.'
-                    })
-                
-                items_preparados.append({
-                    'tipo': 'promocion',
-                    'objeto': promocion_obj,
-                    'cantidad': cantidad
-                })
-            
-            elif producto_obj:
-                items_preparados.append({
-                    'tipo': 'producto',
-                    'objeto': producto_obj,
-                    'cantidad': cantidad
-                })
-            
-            elif promocion_obj:
-                items_preparados.append({
-                    'tipo': 'promocion',
-                    'objeto': promocion_obj,
-                    'cantidad': cantidad
-                })
-            
-            else:
-                raise serializers.ValidationError({
-                    'items': 'Cada item debe tener un producto o una promoción.'
-                })
+        pedido = Pedido(**validated_data)
         
-        # Crear pedido
-        pedido = Pedido.objects.create(**validated_data)
-        logger.info(
-            f'Pedido #{pedido.id} creado por cliente {cliente.email} '
-            f'con {len(items_preparados)} items'
-        )
+        # Precios de la lista precalculados (una sola consulta para todos los items,
+        # o ninguna si la carga masiva ya los precargó)
+        precios_precargados = self.context.get('precios_precargados')
+        if precios_precargados is not None:
+            precios = precios_precargados.get(lista_precio.id, {}) if lista_precio else {}
+        else:
+            precios = get_precios_lista(
+                lista_precio,
+                [item_data['_producto_obj'].id for item_data in items_data if item_data.get('_producto_obj')]
+            )
         
-        # Crear items con snapshots
-        for item_prep in items_preparados:
-            tipo = item_prep['tipo']
-            obj = item_prep['objeto']
-            cantidad = item_prep['cantidad']
+        # Items con snapshots, armados en memoria con los objetos cargados en validate_items
+        items = []
+        for item_data in items_data:
+            producto = item_data.get('_producto_obj')
+            promocion = item_data.get('_promocion_obj')
             
-            if tipo == 'producto':
+            if producto:
                 # Item de producto individual
-                precio_unitario = obj.get_precio_lista(pedido.lista_precio)
-                PedidoItem.objects.create(
+                item = PedidoItem(
                     pedido=pedido,
-                    producto=obj,
+                    producto=producto,
                     promocion=None,
-                    cantidad=cantidad,
-                    precio_unitario=precio_unitario,
-                    producto_nombre_snapshot=obj.nombre,
-                    producto_codigo_snapshot=obj.codigo_barra
+                    cantidad=item_data['cantidad'],
+                    precio_unitario=get_precio_producto(producto, lista_precio, precios),
+                    producto_nombre_snapshot=producto.nombre,
+                    producto_codigo_snapshot=producto.codigo_barra
                 )
             else:
                 # Item de promoción (precio fijo, sin descuento de lista)
-                PedidoItem.objects.create(
+                item = PedidoItem(
                     pedido=pedido,
                     producto=None,
-                    promocion=obj,
-                    cantidad=cantidad,
-                    precio_unitario=obj.precio,
-                    producto_nombre_snapshot=f"[PROMO] {obj.nombre}",
+                    promocion=promocion,
+                    cantidad=item_data['cantidad'],
+                    precio_unitario=promocion.precio,
+                    producto_nombre_snapshot=f"[PROMO] {promocion.nombre}",
                     producto_codigo_snapshot=None
                 )
+            item.calcular_subtotal()
+            items.append(item)
         
-        # Calcular totales
-        pedido.calcular_totales()
-        
-        return pedido
+        pedido.calcular_totales(items, guardar=False)
+        return pedido, items
+
+
+class CotizacionItemSerializer(serializers.ModelSerializer):
+    """Serializer para una línea de la cotización (item sin guardar)."""
+    
+    producto_nombre = serializers.CharField(source='producto_nombre_snapshot', read_only=True)
+    producto_codigo = serializers.CharField(source='producto_codigo_snapshot', read_only=True, allow_null=True)
+    es_promocion = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = PedidoItem
+        fields = [
+            'producto', 'promocion', 'producto_nombre', 'producto_codigo', 'es_promocion',
+            'cantidad', 'precio_unitario', 'subtotal', 'descuento'
+        ]
+        read_only_fields = fields
+
+
+class CotizacionSerializer(serializers.ModelSerializer):
+    """
+    Serializer para la cotización de un pedido (sin guardar).
+    Espera los items en el contexto (`items`), ya que el pedido no existe en la base.
+    """
+    
+    lista_precio_nombre = serializers.SerializerMethodField()
+    lista_precio_descuento = serializers.SerializerMethodField()
+    items = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Pedido
+        fields = [
+            'cliente', 'lista_precio', 'lista_precio_nombre', 'lista_precio_descuento',
+            'items', 'subtotal', 'descuento_total', 'total'
+        ]
+        read_only_fields = fields
+    
+    def get_lista_precio_nombre(self, obj):
+        return obj.lista_precio_nombre_snapshot or "Lista Base"
+    
+    def get_lista_precio_descuento(self, obj):
+        if obj.lista_precio_descuento_snapshot is not None:
+            return obj.lista_precio_descuento_snapshot
+        return 0
+    
+    def get_items(self, obj):
+        return CotizacionItemSerializer(self.context['items'], many=True).data
+
+
+class PedidoBulkCreateSerializer(serializers.Serializer):
+    """Sobre de la carga masiva de pedidos (cada pedido se valida con PedidoCreateSerializer)."""
+    
+    MAX_PEDIDOS = 50
+    
+    # Cualquier valor: los que no son objetos se informan como error de ese pedido
+    pedidos = serializers.ListField(
+        child=serializers.JSONField(),
+        allow_empty=False,
+        max_length=MAX_PEDIDOS
+    )
+
+
+class PedidoBulkEstadoSerializer(serializers.Serializer):
+    """Cambio de estado de varios pedidos a la vez."""
+    
+    MAX_PEDIDOS = 200
+    
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_PEDIDOS
+    )
+    estado = serializers.ChoiceField(choices=['EN_PREPARACION', 'FACTURADO', 'ENTREGADO', 'RECHAZADO'])
+    
+    def validate_ids(self, value):
+        """Descarta IDs repetidos conservando el orden."""
+        return list(dict.fromkeys(value))
 
 
 class PedidoUpdateEstadoSerializer(serializers.ModelSerializer):
@@ -351,27 +517,13 @@ class PedidoUpdateEstadoSerializer(serializers.ModelSerializer):
         fields = ['estado']
     
     def validate_estado(self, value):
-        """Valida transiciones de estado permitidas."""
+        """Valida transiciones de estado permitidas (Pedido.TRANSICIONES)."""
         instance = self.instance
         
         if not instance:
             return value
         
-        # Definir transiciones permitidas
-        # PENDIENTE -> EN_PREPARACION (aprobar) o RECHAZADO
-        # EN_PREPARACION -> FACTURADO o RECHAZADO
-        # FACTURADO -> ENTREGADO o RECHAZADO
-        # ENTREGADO -> (estado final)
-        # RECHAZADO -> (estado final)
-        transiciones_permitidas = {
-            'PENDIENTE': ['EN_PREPARACION', 'RECHAZADO'],
-            'EN_PREPARACION': ['FACTURADO', 'RECHAZADO'],
-            'FACTURADO': ['ENTREGADO', 'RECHAZADO'],
-            'ENTREGADO': [],
-            'RECHAZADO': [],
-        }
-        
-        if value not in transiciones_permitidas.get(instance.estado, []):
+        if value not in Pedido.TRANSICIONES.get(instance.estado, []):
             raise serializers.ValidationError(
                 f'No se puede cambiar de {instance.estado} a {value}.'
             )
@@ -0,0 +1,18 @@
+"""
+Señales de pedidos.
+"""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Pedido, PedidoBaja
+
+
+@receiver(post_delete, sender=Pedido)
+def registrar_pedido_eliminado(sender, instance, **kwargs):
+    """Guarda el ID del pedido borrado físicamente para la sincronización."""
+    PedidoBaja.objects.create(
+        pedido_id=instance.id,
+        cliente_id=instance.cliente_id,
+        transportador_id=instance.transportador_id,
+        motivo='ELIMINADO'
+    )
@@ -0,0 +1,50 @@
+"""
+Cursor de la sincronización incremental de pedidos (GET /api/pedidos/sync/).
+
+El cursor guarda la fecha desde la que hay que buscar cambios y, mientras la
+respuesta se pagina, el último pedido enviado (fecha de actualización e ID).
+"""
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from apps.productos.catalogo import CursorInvalidoError
+
+# Pedidos por respuesta; si hay más, la respuesta indica `hay_mas`
+SYNC_LIMITE = 500
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def codificar_cursor(fecha, ultimo_id=0, inicial=False):
+    """
+    Genera el cursor opaco de sincronización.
+
+    Args:
+        fecha: fecha de corte, o fecha de actualización del último pedido enviado
+        ultimo_id: ID del último pedido enviado si la respuesta se paginó (0 si no)
+        inicial: si la paginación pertenece a la sincronización inicial (sin `since`)
+    """
+    micros = (fecha - _EPOCH) // timedelta(microseconds=1)
+    valor = f'{micros}:{ultimo_id}:{int(inicial)}'.encode('ascii')
+    return base64.urlsafe_b64encode(valor).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Decodifica un cursor generado por codificar_cursor().
+
+    Returns:
+        tuple: (fecha, ultimo_id, inicial)
+
+    Raises:
+        CursorInvalidoError: si el cursor no se puede interpretar
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valor = base64.urlsafe_b64decode(cursor + relleno).decode('ascii')
+        micros, ultimo_id, inicial = valor.split(':')
+        fecha = _EPOCH + timedelta(microseconds=int(micros))
+        return fecha, int(ultimo_id), inicial == '1'
+    except (binascii.Error, UnicodeDecodeError, ValueError, OverflowError, OSError):
+        raise CursorInvalidoError('Cursor de sincronización inválido.')
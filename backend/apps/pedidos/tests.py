@@ -0,0 +1,583 @@
+import asyncio
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.core.pagination import KeysetPagination
+from apps.core.testing import PresupuestoConsultasMixin
+from apps.productos.models import ListaPrecio, Marca, Categoria, Producto, Promocion, PromocionItem
+from apps.users.models import CustomUser
+from .eventos import BrokerMemoria
+from .models import ClaveIdempotencia, Pedido, PedidoBaja, PedidoItem, PedidoNoDisponibleError
+from .serializers import PedidoBulkCreateSerializer, PedidoBulkEstadoSerializer
+from .views import PedidoSyncView
+
+
+class DatosPedidosMixin:
+    """Usuarios, productos y promociones de prueba, y pedidos con items."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lista = ListaPrecio.objects.create(
+            nombre='Mayorista', codigo='MAY', descuento_porcentaje=Decimal('10')
+        )
+        cls.admin = CustomUser.objects.create_user(
+            'admin@test.com', 'clave', nombre='Ana', apellido='Admin', rol='admin'
+        )
+        cls.vendedor = CustomUser.objects.create_user(
+            'vendedor@test.com', 'clave', nombre='Victor', apellido='Vendedor', rol='vendedor'
+        )
+        cls.transportador = CustomUser.objects.create_user(
+            'transportador@test.com', 'clave', nombre='Tomás', apellido='Transportador',
+            rol='transportador'
+        )
+        cls.clientes = [
+            CustomUser.objects.create_user(
+                f'cliente{i}@test.com', 'clave', nombre=f'Cliente {i}', apellido='Test',
+                rol='cliente', lista_precio=cls.lista
+            )
+            for i in range(2)
+        ]
+        cls.cliente = cls.clientes[0]
+
+        marca = Marca.objects.create(nombre='Marca')
+        categoria = Categoria.objects.create(nombre='Categoría')
+        cls.productos = [
+            Producto.objects.create(
+                codigo_barra=f'77900{i:03d}', nombre=f'Producto {i}', marca=marca,
+                categoria=categoria, precio_base=Decimal('100.00') + i
+            )
+            for i in range(6)
+        ]
+        cls.promociones = []
+        for i in range(2):
+            promocion = Promocion.objects.create(nombre=f'Combo {i}', precio=Decimal('250'))
+            for producto in cls.productos[i * 2:i * 2 + 2]:
+                PromocionItem.objects.create(promocion=promocion, producto=producto, cantidad=2)
+            cls.promociones.append(promocion)
+
+    @classmethod
+    def crear_pedido(cls, cliente, estado='PENDIENTE', transportador=None, productos=None):
+        """Pedido con un item por producto (por defecto los tres primeros) y uno por promoción."""
+        pedido = Pedido.objects.create(
+            cliente=cliente, lista_precio=cls.lista, estado=estado, transportador=transportador
+        )
+        for producto in productos or cls.productos[:3]:
+            PedidoItem.objects.create(
+                pedido=pedido, producto=producto, cantidad=2, precio_unitario=producto.precio_base
+            )
+        for promocion in cls.promociones:
+            PedidoItem.objects.create(
+                pedido=pedido, promocion=promocion, cantidad=1, precio_unitario=promocion.precio
+            )
+        pedido.calcular_totales()
+        return pedido
+
+
+class PedidosPresupuestoTests(DatosPedidosMixin, PresupuestoConsultasMixin, APITestCase):
+    """
+    Presupuesto de consultas de los listados y detalles de pedidos.
+
+    Cada pedido tiene varios items de productos y de promociones, y hay más
+    pedidos que el presupuesto de cada listado: una consulta por pedido o por
+    item (N+1) lo excede. Los endpoints masivos se prueban con el máximo de
+    pedidos por request.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(30):
+            cls.pedido = cls.crear_pedido(
+                cls.clientes[i % 2], estado='FACTURADO', transportador=cls.transportador,
+                productos=cls.productos[i % 3:i % 3 + 3]
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_listado_pedidos(self):
+        for vista in ('summary', 'full'):
+            for user in (self.vendedor, self.cliente):
+                with self.subTest(vista=vista, rol=user.rol):
+                    self.autenticar(user)
+                    response = self.client.get('/api/pedidos/', {'view': vista})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertGreater(len(response.json()['results']), 1)
+                    self.assertDentroDelPresupuesto(response)
+
+    def test_detalle_pedido(self):
+        for user in (self.vendedor, self.pedido.cliente):
+            with self.subTest(rol=user.rol):
+                self.autenticar(user)
+                response = self.client.get(f'/api/pedidos/{self.pedido.id}/')
+                self.assertEqual(response.status_code, 200)
+                self.assertDentroDelPresupuesto(response)
+
+    def test_sync_pedidos(self):
+        for user in (self.vendedor, self.cliente, self.transportador):
+            with self.subTest(rol=user.rol):
+                self.autenticar(user)
+                response = self.client.get('/api/pedidos/sync/')
+                self.assertEqual(response.status_code, 200)
+                self.assertGreater(len(response.json()['pedidos']), 1)
+                self.assertDentroDelPresupuesto(response)
+
+    def test_pedidos_transportador(self):
+        self.autenticar(self.transportador)
+        response = self.client.get('/api/pedidos/transportador/')
+        self.assertEqual(response.status_code, 200)
+        self.assertDentroDelPresupuesto(response)
+
+        response = self.client.get(f'/api/pedidos/transportador/{self.pedido.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertDentroDelPresupuesto(response)
+
+    def test_estadisticas(self):
+        for user, url in (
+            (self.admin, '/api/pedidos/estadisticas/admin/'),
+            (self.vendedor, '/api/pedidos/estadisticas/vendedor/'),
+        ):
+            with self.subTest(url=url):
+                self.autenticar(user)
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertDentroDelPresupuesto(response)
+
+    def test_carga_masiva_maxima(self):
+        """50 pedidos (el máximo) con productos y una promoción cada uno."""
+        pedidos = [
+            {
+                'cliente': self.clientes[i % 2].id,
+                'items': [
+                    {'producto': producto.id, 'cantidad': 2}
+                    for producto in self.productos[i % 3:i % 3 + 3]
+                ] + [{'promocion': self.promociones[i % 2].id, 'cantidad': 1}],
+            }
+            for i in range(PedidoBulkCreateSerializer.MAX_PEDIDOS)
+        ]
+        self.autenticar(self.vendedor)
+        response = self.client.post(
+            '/api/pedidos/bulk/', {'pedidos': pedidos}, format='json',
+            HTTP_IDEMPOTENCY_KEY='carga-masiva-maxima'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['creados'], PedidoBulkCreateSerializer.MAX_PEDIDOS)
+        self.assertDentroDelPresupuesto(response)
+
+
+    def test_cambio_estado_masivo_maximo(self):
+        """200 pedidos (el máximo) aprobados a la vez, con su disponibilidad."""
+        pedidos = Pedido.objects.bulk_create([
+            Pedido(cliente=self.clientes[i % 2], lista_precio=self.lista, total=Decimal('100'))
+            for i in range(PedidoBulkEstadoSerializer.MAX_PEDIDOS)
+        ])
+        PedidoItem.objects.bulk_create([
+            PedidoItem(
+                pedido=pedido, producto=self.productos[0], cantidad=1,
+                precio_unitario=Decimal('100'), subtotal=Decimal('100')
+            )
+            for pedido in pedidos
+        ] + [
+            PedidoItem(
+                pedido=pedido, promocion=self.promociones[0], cantidad=1,
+                precio_unitario=Decimal('250'), subtotal=Decimal('250')
+            )
+            for pedido in pedidos
+        ])
+        self.autenticar(self.vendedor)
+        response = self.client.post(
+            '/api/pedidos/bulk-estado/',
+            {'ids': [pedido.id for pedido in pedidos], 'estado': 'EN_PREPARACION'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['actualizados'], PedidoBulkEstadoSerializer.MAX_PEDIDOS)
+        self.assertDentroDelPresupuesto(response)
+
+
+class CargaMasivaTests(DatosPedidosMixin, APITestCase):
+    """Carga masiva de pedidos (POST /api/pedidos/bulk/)."""
+
+    def setUp(self):
+        self.client.force_authenticate(self.vendedor)
+
+    def test_errores_por_pedido(self):
+        pedidos = [
+            {'cliente': self.cliente.id, 'items': [{'producto': self.productos[0].id, 'cantidad': 1}]},
+            'no es un pedido',
+            {'cliente': self.cliente.id, 'items': []},
+        ]
+        response = self.client.post('/api/pedidos/bulk/', {'pedidos': pedidos}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['creados'], 1)
+        self.assertEqual(response.data['con_errores'], 2)
+        resultados = response.data['resultados']
+        self.assertEqual([r['indice'] for r in resultados], [0, 1, 2])
+        self.assertEqual([r['creado'] for r in resultados], [True, False, False])
+        self.assertIn('non_field_errors', resultados[1]['errores'])
+        self.assertIn('items', resultados[2]['errores'])
+        self.assertEqual(Pedido.objects.count(), 1)
+
+    def test_precios_de_la_lista_del_cliente(self):
+        producto = self.productos[0]
+        pedidos = [{'cliente': self.cliente.id, 'items': [{'producto': producto.id, 'cantidad': 1}]}]
+        response = self.client.post('/api/pedidos/bulk/', {'pedidos': pedidos}, format='json')
+        pedido = Pedido.objects.get(id=response.data['resultados'][0]['pedido']['id'])
+        self.assertEqual(pedido.items.get().precio_unitario, self.lista.calcular_precio(producto.precio_base))
+
+
+class IdempotenciaTests(DatosPedidosMixin, APITestCase):
+    """POST de pedidos con el header Idempotency-Key."""
+
+    def setUp(self):
+        self.client.force_authenticate(self.cliente)
+        self.body = {
+            'cliente': self.cliente.id,
+            'items': [{'producto': self.productos[0].id, 'cantidad': 1}],
+        }
+
+    def crear(self, clave, body=None):
+        return self.client.post(
+            '/api/pedidos/', body or self.body, format='json', HTTP_IDEMPOTENCY_KEY=clave
+        )
+
+    def test_reintento_devuelve_la_respuesta_guardada(self):
+        primera = self.crear('clave-1')
+        self.assertEqual(primera.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', primera)
+
+        reintento = self.crear('clave-1')
+        self.assertEqual(reintento.status_code, 201)
+        self.assertEqual(reintento['Idempotent-Replayed'], 'true')
+        self.assertEqual(reintento.data['id'], primera.data['id'])
+        self.assertEqual(Pedido.objects.count(), 1)
+
+    def test_misma_clave_con_otro_request(self):
+        self.assertEqual(self.crear('clave-1').status_code, 201)
+        otro = dict(self.body, items=[{'producto': self.productos[1].id, 'cantidad': 3}])
+        response = self.crear('clave-1', otro)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Pedido.objects.count(), 1)
+
+    def test_error_libera_la_clave(self):
+        response = self.crear('clave-1', dict(self.body, items=[]))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ClaveIdempotencia.objects.filter(clave='clave-1').exists())
+
+        self.assertEqual(self.crear('clave-1').status_code, 201)
+        self.assertEqual(Pedido.objects.count(), 1)
+
+    def test_clave_en_proceso(self):
+        ClaveIdempotencia.objects.create(usuario=self.cliente, clave='clave-1', hash_request='x')
+        response = self.crear('clave-1')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Pedido.objects.count(), 0)
+
+    def test_clave_abandonada_se_vuelve_a_procesar(self):
+        """El worker que tomó la clave murió: pasado el límite, se procesa de nuevo."""
+        registro = ClaveIdempotencia.objects.create(
+            usuario=self.cliente, clave='clave-1', hash_request='x'
+        )
+        ClaveIdempotencia.objects.filter(pk=registro.pk).update(
+            fecha_creacion=timezone.now() - timedelta(seconds=settings.IDEMPOTENCIA_PENDIENTE_SEGUNDOS + 1)
+        )
+        response = self.crear('clave-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Pedido.objects.count(), 1)
+
+        reintento = self.crear('clave-1')
+        self.assertEqual(reintento['Idempotent-Replayed'], 'true')
+        self.assertEqual(Pedido.objects.count(), 1)
+
+
+class CambioEstadoTests(DatosPedidosMixin, TestCase):
+    """Transiciones de estado con UPDATE condicional (Pedido._cambiar_estado)."""
+
+    def test_instancia_desactualizada_no_pisa_el_estado(self):
+        pedido = self.crear_pedido(self.cliente)
+        actual = Pedido.objects.get(pk=pedido.pk)
+        obsoleta = Pedido.objects.get(pk=pedido.pk)
+        actual.aprobar()
+        actual.facturar()
+
+        # La instancia obsoleta cree que el pedido sigue PENDIENTE
+        self.assertEqual(obsoleta.estado, 'PENDIENTE')
+        with self.assertRaisesMessage(ValueError, 'Solo se pueden aprobar pedidos pendientes.'):
+            obsoleta.aprobar()
+        self.assertEqual(obsoleta.estado, 'FACTURADO')
+        self.assertEqual(Pedido.objects.get(pk=pedido.pk).estado, 'FACTURADO')
+
+    def test_no_rechaza_un_pedido_entregado_por_otro(self):
+        pedido = self.crear_pedido(self.cliente)
+        obsoleta = Pedido.objects.get(pk=pedido.pk)
+        pedido.aprobar()
+        pedido.facturar()
+        pedido.entregar()
+
+        with self.assertRaisesMessage(ValueError, 'No se puede rechazar un pedido ya entregado.'):
+            obsoleta.rechazar()
+        self.assertEqual(Pedido.objects.get(pk=pedido.pk).estado, 'ENTREGADO')
+
+    def test_aprobar_informa_todos_los_problemas(self):
+        pedido = self.crear_pedido(self.cliente)
+        Producto.objects.filter(pk=self.productos[0].pk).update(activo=False)
+        Producto.objects.filter(pk=self.productos[2].pk).update(tiene_stock=False)
+        Promocion.objects.filter(pk=self.promociones[1].pk).update(activo=False)
+
+        with self.assertRaises(PedidoNoDisponibleError) as contexto:
+            pedido.aprobar()
+        self.assertCountEqual(contexto.exception.problemas, [
+            'El producto "Producto 0" no está disponible.',
+            'El producto "Producto 2" no tiene stock disponible.',
+            'El producto "Producto 0" de la promoción "Combo 0" no está disponible.',
+            'La promoción "Combo 1" no está disponible.',
+        ])
+        self.assertEqual(Pedido.objects.get(pk=pedido.pk).estado, 'PENDIENTE')
+
+
+class CambioEstadoMasivoTests(DatosPedidosMixin, APITestCase):
+    """Cambio de estado de varios pedidos (POST /api/pedidos/bulk-estado/)."""
+
+    def setUp(self):
+        self.client.force_authenticate(self.vendedor)
+
+    def test_resultado_por_pedido(self):
+        en_preparacion = self.crear_pedido(self.cliente, estado='EN_PREPARACION')
+        pendiente = self.crear_pedido(self.cliente)
+        entregado = self.crear_pedido(self.cliente, estado='ENTREGADO')
+        inexistente = entregado.id + 1000
+
+        response = self.client.post('/api/pedidos/bulk-estado/', {
+            'ids': [en_preparacion.id, pendiente.id, inexistente, entregado.id, en_preparacion.id],
+            'estado': 'FACTURADO',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['actualizados'], 1)
+        # En el orden recibido y sin repetidos
+        self.assertEqual(response.data['resultados'], [
+            {'id': en_preparacion.id, 'ok': True},
+            {'id': pendiente.id, 'ok': False, 'error': 'No se puede cambiar de PENDIENTE a FACTURADO.'},
+            {'id': inexistente, 'ok': False, 'error': 'El pedido no existe.'},
+            {'id': entregado.id, 'ok': False, 'error': 'No se puede cambiar de ENTREGADO a FACTURADO.'},
+        ])
+        estados = dict(Pedido.objects.values_list('id', 'estado'))
+        self.assertEqual(estados[en_preparacion.id], 'FACTURADO')
+        self.assertEqual(estados[pendiente.id], 'PENDIENTE')
+        self.assertEqual(estados[entregado.id], 'ENTREGADO')
+
+    def test_aprobar_verifica_disponibilidad(self):
+        disponible = self.crear_pedido(self.cliente, productos=self.productos[3:5])
+        no_disponible = self.crear_pedido(self.cliente, productos=self.productos[4:6])
+        Producto.objects.filter(pk=self.productos[5].pk).update(activo=False)
+
+        response = self.client.post('/api/pedidos/bulk-estado/', {
+            'ids': [disponible.id, no_disponible.id], 'estado': 'EN_PREPARACION',
+        }, format='json')
+        self.assertEqual(response.data['actualizados'], 1)
+        self.assertEqual(response.data['resultados'], [
+            {'id': disponible.id, 'ok': True},
+            {'id': no_disponible.id, 'ok': False, 'error': 'El producto "Producto 5" no está disponible.'},
+        ])
+
+    def test_maximo_de_pedidos(self):
+        maximo = PedidoBulkEstadoSerializer.MAX_PEDIDOS
+        response = self.client.post('/api/pedidos/bulk-estado/', {
+            'ids': list(range(1, maximo + 2)), 'estado': 'FACTURADO',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ids', response.data)
+
+        response = self.client.post('/api/pedidos/bulk-estado/', {
+            'ids': list(range(1, maximo + 1)), 'estado': 'FACTURADO',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['resultados']), maximo)
+
+
+class SincronizacionTests(DatosPedidosMixin, APITestCase):
+    """Sincronización incremental de pedidos (GET /api/pedidos/sync/)."""
+
+    def sincronizar(self, user, cursor=None):
+        """Recorre todas las páginas; retorna (ids de pedidos, eliminados, cursor final)."""
+        self.client.force_authenticate(user)
+        ids, eliminados = [], []
+        while True:
+            params = {'since': cursor} if cursor else {}
+            response = self.client.get('/api/pedidos/sync/', params)
+            self.assertEqual(response.status_code, 200)
+            ids += [pedido['id'] for pedido in response.data['pedidos']]
+            eliminados += response.data['eliminados']
+            cursor = response.data['cursor']
+            if not response.data['hay_mas']:
+                return ids, eliminados, cursor
+
+    def test_paginas_sin_repetidos_ni_faltantes(self):
+        pedidos = [self.crear_pedido(self.clientes[i % 2]) for i in range(10)]
+        # Todos fuera del margen del cursor; varios con la misma fecha (empate por ID)
+        antes = timezone.now() - timedelta(hours=1)
+        Pedido.objects.update(fecha_actualizacion=antes)
+        Pedido.objects.filter(pk__in=[p.pk for p in pedidos[2:7]]).update(
+            fecha_actualizacion=antes + timedelta(seconds=1)
+        )
+
+        with mock.patch.object(PedidoSyncView, 'sync_limite', 3):
+            ids, _, cursor = self.sincronizar(self.vendedor)
+            self.assertEqual(sorted(ids), sorted(p.id for p in pedidos))
+            self.assertEqual(len(ids), len(set(ids)))
+
+            # Cambios posteriores: solo esos, también paginados y con empates
+            cambiados = pedidos[1:8]
+            ahora = timezone.now()
+            Pedido.objects.filter(pk__in=[p.pk for p in cambiados]).update(fecha_actualizacion=ahora)
+            ids, eliminados, _ = self.sincronizar(self.vendedor, cursor)
+            self.assertEqual(sorted(ids), sorted(p.id for p in cambiados))
+            self.assertEqual(len(ids), len(set(ids)))
+            self.assertEqual(eliminados, [])
+
+    def test_reasignacion_genera_baja_para_el_transportador_anterior(self):
+        otro = CustomUser.objects.create_user(
+            'otro@test.com', 'clave', nombre='Otro', apellido='Transportador', rol='transportador'
+        )
+        pedido = self.crear_pedido(self.cliente, estado='FACTURADO', transportador=self.transportador)
+        ids, _, cursor = self.sincronizar(self.transportador)
+        self.assertEqual(ids, [pedido.id])
+
+        pedido = Pedido.objects.get(pk=pedido.pk)
+        pedido.transportador = otro
+        pedido.save()
+
+        baja = PedidoBaja.objects.get(pedido_id=pedido.id)
+        self.assertEqual(baja.motivo, 'REASIGNADO')
+        self.assertEqual(baja.transportador_id, self.transportador.id)
+
+        ids, eliminados, _ = self.sincronizar(self.transportador, cursor)
+        self.assertEqual(ids, [])
+        self.assertEqual(eliminados, [pedido.id])
+        self.assertEqual(self.sincronizar(otro)[0], [pedido.id])
+
+    def test_borrado_genera_baja(self):
+        pedido = self.crear_pedido(self.cliente)
+        ajeno = self.crear_pedido(self.clientes[1])
+        _, _, cursor_cliente = self.sincronizar(self.cliente)
+        _, _, cursor_otro = self.sincronizar(self.clientes[1])
+        _, _, cursor_vendedor = self.sincronizar(self.vendedor)
+
+        pedido_id = pedido.id
+        pedido.delete()
+        self.assertEqual(PedidoBaja.objects.get(pedido_id=pedido_id).motivo, 'ELIMINADO')
+
+        self.assertEqual(self.sincronizar(self.cliente, cursor_cliente)[1], [pedido_id])
+        self.assertEqual(self.sincronizar(self.vendedor, cursor_vendedor)[1], [pedido_id])
+        # Otro cliente no recibe IDs de pedidos ajenos
+        self.assertEqual(self.sincronizar(self.clientes[1], cursor_otro)[1], [])
+        self.assertTrue(Pedido.objects.filter(pk=ajeno.pk).exists())
+
+
+@mock.patch('apps.pedidos.views_eventos.EVENTOS_HEARTBEAT', 1)
+class EventosTests(DatosPedidosMixin, APITestCase):
+    """Endpoint SSE de eventos de pedidos (GET /api/pedidos/eventos/)."""
+
+    def setUp(self):
+        # Broker propio por test: no se mezclan eventos de otros tests
+        patcher = mock.patch('apps.pedidos.eventos._broker', BrokerMemoria())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def conectar(self, user):
+        # El header va en cada request: los headers del constructor de
+        # AsyncClient se envían con el nombre WSGI (HTTP_...) y se pierden
+        token = AccessToken.for_user(user)
+        return await AsyncClient().get(
+            '/api/pedidos/eventos/', headers={'authorization': f'Bearer {token}'}
+        )
+
+    def crear_pedido_confirmado(self, cliente):
+        """Crea el pedido y ejecuta los on_commit (publicación del evento)."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return Pedido.objects.create(cliente=cliente, lista_precio=self.lista).id
+
+    async def primer_evento(self, response):
+        """Datos del primer evento `pedido` del stream (ignora retry y pings)."""
+        async def leer():
+            async for bloque in response.streaming_content:
+                texto = bloque.decode() if isinstance(bloque, bytes) else bloque
+                if 'event: pedido' in texto:
+                    return json.loads(texto.split('data: ', 1)[1])
+        return await asyncio.wait_for(leer(), timeout=10)
+
+    def test_wsgi_responde_501(self):
+        self.client.force_authenticate(self.cliente)
+        response = self.client.get('/api/pedidos/eventos/')
+        self.assertEqual(response.status_code, 501)
+
+    async def test_sin_token_responde_401(self):
+        response = await AsyncClient().get('/api/pedidos/eventos/')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_evento_creado(self):
+        response = await self.conectar(self.vendedor)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        pedido_id = await sync_to_async(self.crear_pedido_confirmado)(self.cliente)
+
+        evento = await self.primer_evento(response)
+        self.assertEqual(evento['tipo'], 'creado')
+        self.assertEqual(evento['id'], pedido_id)
+        self.assertEqual(evento['estado'], 'PENDIENTE')
+        self.assertNotIn('cliente', evento)
+
+    async def test_cliente_no_recibe_pedidos_ajenos(self):
+        otro = self.clientes[1]
+        response = await self.conectar(otro)
+        self.assertEqual(response.status_code, 200)
+
+        await sync_to_async(self.crear_pedido_confirmado)(self.cliente)
+        propio_id = await sync_to_async(self.crear_pedido_confirmado)(otro)
+
+        # El evento del pedido ajeno se publicó antes, pero no se envía
+        evento = await self.primer_evento(response)
+        self.assertEqual(evento['id'], propio_id)
+
+
+@mock.patch.object(KeysetPagination, 'page_size', 4)
+class PaginacionCursorTests(DatosPedidosMixin, APITestCase):
+    """`?paginacion=cursor` recorre el listado en el mismo orden que las páginas numeradas."""
+
+    def recorrer(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [pedido['id'] for pedido in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_mismo_orden_que_paginas_numeradas(self):
+        estados = ['PENDIENTE', 'FACTURADO', 'ENTREGADO', 'PENDIENTE', 'EN_PREPARACION']
+        pedidos = [self.crear_pedido(self.cliente, estado=estados[i % len(estados)]) for i in range(14)]
+        # Fechas repetidas: el id desempata
+        fecha = timezone.now() - timedelta(days=1)
+        Pedido.objects.filter(pk__in=[p.pk for p in pedidos[::2]]).update(fecha_creacion=fecha)
+
+        self.client.force_authenticate(self.admin)
+        por_pagina = self.recorrer('/api/pedidos/')
+        por_cursor = self.recorrer('/api/pedidos/?paginacion=cursor')
+        self.assertEqual(len(por_pagina), len(pedidos))
+        self.assertEqual(por_cursor, por_pagina)
+
+        # Con filtro de estado
+        por_pagina = self.recorrer('/api/pedidos/?estado=PENDIENTE')
+        por_cursor = self.recorrer('/api/pedidos/?estado=PENDIENTE&paginacion=cursor')
+        self.assertGreater(len(por_pagina), 4)
+        self.assertEqual(por_cursor, por_pagina)
@@ -1,8 +1,13 @@
 from django.urls import path
 from .views import (
     PedidoListCreateView,
+    PedidoExportarView,
+    PedidoSyncView,
+    pedidos_bulk_view,
+    cotizar_pedido_view,
     PedidoDetailView,
     update_estado_view,
+    bulk_estado_view,
     rechazar_pedido_view,
     # Vistas de transportador
     PedidoTransportadorListView,
@@ -16,9 +21,16 @@ from .views import (
     estadisticas_admin_view,
     estadisticas_vendedor_view,
 )
+from .views_eventos import eventos_view
 
 urlpatterns = [
     path('', PedidoListCreateView.as_view(), name='pedido_list_create'),
+    path('exportar/', PedidoExportarView.as_view(), name='pedido_exportar'),
+    path('sync/', PedidoSyncView.as_view(), name='pedido_sync'),
+    path('bulk/', pedidos_bulk_view, name='pedido_bulk'),
+    path('cotizar/', cotizar_pedido_view, name='pedido_cotizar'),
+    path('bulk-estado/', bulk_estado_view, name='pedido_bulk_estado'),
+    path('eventos/', eventos_view, name='pedido_eventos'),
     path('estadisticas/admin/', estadisticas_admin_view, name='estadisticas_admin'),
     path('estadisticas/vendedor/', estadisticas_vendedor_view, name='estadisticas_vendedor'),
     path('<int:pk>/', PedidoDetailView.as_view(), name='pedido_detail'),
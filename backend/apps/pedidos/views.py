@@ -2,26 +2,99 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
 from django.shortcuts import get_object_or_404
+from django.db import transaction, DatabaseError
 from django.http import HttpResponse
-from django.db.models import Case, When, IntegerField, Sum
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.db.models import Case, When, CharField, Value, Count, Sum, Prefetch, OuterRef, Subquery, Q
+from django.db.models.functions import Coalesce, Concat
 from django.utils import timezone
 import logging
 
 from apps.users.permissions import IsAdminOrVendedor, IsTransportador
-from .models import Pedido
+from apps.core.mixins import StreamingListMixin
+from apps.core.pagination import KeysetPagination
+from apps.core.middleware import presupuesto_consultas
+from apps.core.fechas import RangoFechasInvalidoError, filtro_rango, rango_desde_params, rango_mes
+from apps.productos.catalogo import CursorInvalidoError, SYNC_MARGEN
+from .models import Pedido, PedidoItem, PedidoBaja, PedidoNoDisponibleError
 from .serializers import (
     PedidoSerializer,
+    PedidoResumenSerializer,
     PedidoCreateSerializer,
+    PedidoBulkCreateSerializer,
+    CotizacionSerializer,
+    get_contexto_precargado,
     PedidoUpdateEstadoSerializer,
+    PedidoBulkEstadoSerializer,
     PedidoTransportadorSerializer,
     PedidoAsignarTransportadorSerializer,
 )
 from .pdf_generator import generar_remito_pdf
+from .idempotencia import con_idempotencia
+from .cache import get_clave_mis_pedidos, get_mis_pedidos_cacheado, set_mis_pedidos_cacheado
+from .sync import SYNC_LIMITE, codificar_cursor, decodificar_cursor
 
 logger = logging.getLogger('eltetu')
 
 
+def _prefetch_items_detalle():
+    """Prefetch de items con todo lo que serializa PedidoSerializer (consultas fijas)."""
+    return Prefetch('items', queryset=PedidoItem.objects.select_related(
+        'producto__marca', 'producto__categoria', 'producto__subcategoria', 'promocion'
+    ))
+
+
+def _queryset_detalle():
+    """Pedidos con todo lo que serializa PedidoSerializer precargado."""
+    return Pedido.objects.select_related(
+        'cliente', 'transportador', 'lista_precio'
+    ).prefetch_related(_prefetch_items_detalle())
+
+
+def _queryset_transportador():
+    """Pedidos con todo lo que serializa PedidoTransportadorSerializer precargado."""
+    return Pedido.objects.select_related(
+        'cliente', 'cliente__zona', 'lista_precio'
+    ).prefetch_related(
+        _prefetch_items_detalle(),
+        'cliente__horarios'
+    )
+
+
+def _cantidad_items():
+    """
+    Cantidad de items de cada pedido como subconsulta correlacionada.
+    Con Count('items') el listado necesitaría GROUP BY y no podría leer el
+    orden desde el índice pedido_lista_idx.
+    """
+    cantidad = PedidoItem.objects.filter(pedido=OuterRef('pk')).order_by().values('pedido').annotate(
+        cantidad=Count('id')
+    ).values('cantidad')
+    return Coalesce(Subquery(cantidad), 0)
+
+
+def _nombre_completo(usuario):
+    """Expresión con el nombre completo del usuario relacionado (NULL si no hay)."""
+    return Case(
+        When(**{f'{usuario}__isnull': True}, then=Value(None)),
+        default=Concat(f'{usuario}__nombre', Value(' '), f'{usuario}__apellido'),
+        output_field=CharField(),
+    )
+
+
+def _queryset_resumen():
+    """Pedidos con lo que serializa PedidoResumenSerializer anotado (sin items)."""
+    return Pedido.objects.select_related('lista_precio').annotate(
+        items_count=_cantidad_items(),
+        cliente_nombre=_nombre_completo('cliente'),
+        transportador_nombre=_nombre_completo('transportador'),
+    )
+
+
+@presupuesto_consultas(8)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminOrVendedor])
 def estadisticas_admin_view(request):
@@ -35,23 +108,30 @@ def estadisticas_admin_view(request):
     - productos_activos: Cantidad de productos activos
     - productos_sin_stock: Cantidad de productos sin stock
     - total_usuarios: Total de usuarios activos
+    
+    Query params opcionales `desde` / `hasta` (YYYY-MM-DD, inclusive) para
+    calcular ventas_mes y pedidos_mes sobre otro período. Por defecto, el mes
+    en curso en la hora de Argentina.
     """
     from apps.productos.models import Producto
     from apps.users.models import CustomUser
     
-    hoy = timezone.now().date()
-    inicio_mes = hoy.replace(day=1)
+    try:
+        inicio, fin = rango_desde_params(request.query_params)
+    except RangoFechasInvalidoError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if inicio is None and fin is None:
+        inicio, fin = rango_mes()
+    # Rango sobre la columna (no sobre su fecha local) para usar el índice
+    pedidos_periodo = Pedido.objects.filter(**filtro_rango('fecha_creacion', inicio, fin))
     
     # Ventas del mes (solo ENTREGADO)
-    ventas_mes = Pedido.objects.filter(
-        estado='ENTREGADO',
-        fecha_creacion__date__gte=inicio_mes
+    ventas_mes = pedidos_periodo.filter(
+        estado='ENTREGADO'
     ).aggregate(total=Sum('total'))['total'] or 0
     
     # Pedidos del mes (todos los estados)
-    pedidos_mes = Pedido.objects.filter(
-        fecha_creacion__date__gte=inicio_mes
-    ).count()
+    pedidos_mes = pedidos_periodo.count()
     
     # Productos
     productos_activos = Producto.objects.filter(activo=True).count()
@@ -75,6 +155,7 @@ def estadisticas_admin_view(request):
     }, status=status.HTTP_200_OK)
 
 
+@presupuesto_consultas(5)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminOrVendedor])
 def estadisticas_vendedor_view(request):
@@ -114,16 +195,37 @@ class PedidoListCreateView(generics.ListCreateAPIView):
     - mine=true: solo pedidos del usuario autenticado
     - estado: filtrar por estado
     - cliente: ID del cliente (solo admin/vendedor)
+    - fecha_creacion: pedidos de un día (YYYY-MM-DD, hora de Argentina)
+    - desde / hasta: pedidos creados entre esos días (inclusive, YYYY-MM-DD)
+    
+    Vistas (`view`):
+    - summary (por defecto): sin items, con `items_count` y los nombres de
+      cliente/transportador anotados en la misma consulta
+    - full: cada pedido con el detalle de sus items (como PedidoDetailView)
+    
+    Paginación por número de página o por cursor con `paginacion=cursor`.
+    
+    Para clientes, la primera página se sirve desde la caché de "Mis pedidos"
+    (ver cache.py), cuya clave cambia al crear o modificar uno de sus pedidos.
     """
-    serializer_class = PedidoSerializer
+    serializer_class = PedidoResumenSerializer
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 15
+    pagination_class = KeysetPagination
+    keyset_ordering = ['estado_orden', '-fecha_creacion', '-id']
+    vista_por_defecto = 'summary'
+    
+    def usa_vista_completa(self):
+        """Indica si se pidió el detalle de items (`view=full`)."""
+        return self.request.query_params.get('view', self.vista_por_defecto) == 'full'
     
     def get_queryset(self):
         """Filtra pedidos según rol y parámetros."""
         user = self.request.user
-        queryset = Pedido.objects.select_related('cliente').prefetch_related(
-            'items__producto',
-        )
+        if self.usa_vista_completa():
+            queryset = _queryset_detalle()
+        else:
+            queryset = _queryset_resumen()
         
         # Filtrar según rol
         if user.is_cliente():
@@ -136,7 +238,7 @@ class PedidoListCreateView(generics.ListCreateAPIView):
         if mine and mine.lower() == 'true':
             queryset = queryset.filter(cliente=user)
         
-        # Filtro por estado
+        # Filtro por estado (índice pedido_estado_lista_idx)
         estado = self.request.query_params.get('estado', None)
         if estado:
             queryset = queryset.filter(estado=estado)
@@ -147,31 +249,52 @@ class PedidoListCreateView(generics.ListCreateAPIView):
             if cliente_id:
                 queryset = queryset.filter(cliente_id=cliente_id)
         
-        # Filtro por fecha de creación
-        fecha_creacion = self.request.query_params.get('fecha_creacion', None)
-        if fecha_creacion:
-            # Formato esperado: YYYY-MM-DD
-            queryset = queryset.filter(fecha_creacion__date=fecha_creacion)
+        # Filtro por fecha de creación: un día (`fecha_creacion`) o un rango
+        # (`desde`/`hasta`), como rango de instantes para usar el índice
+        try:
+            inicio, fin = rango_desde_params(self.request.query_params, param_fecha='fecha_creacion')
+        except RangoFechasInvalidoError as e:
+            raise ParseError(str(e))
+        queryset = queryset.filter(**filtro_rango('fecha_creacion', inicio, fin))
         
-        # Ordenar: primero pedidos activos, luego por fecha de creación (más recientes primero)
-        # Usar Case/When para ordenar: activos primero, entregados después, rechazados al final
-        return queryset.annotate(
-            estado_orden=Case(
-                When(estado='PENDIENTE', then=0),
-                When(estado='EN_PREPARACION', then=1),
-                When(estado='FACTURADO', then=2),
-                When(estado='ENTREGADO', then=3),
-                When(estado='RECHAZADO', then=4),
-                default=5,
-                output_field=IntegerField()
-            )
-        ).order_by('estado_orden', '-fecha_creacion')
+        # Ordenar: primero pedidos activos, luego por fecha de creación (más recientes primero).
+        # estado_orden es una columna persistida e indexada (ver Pedido.Meta.indexes)
+        return queryset.order_by('estado_orden', '-fecha_creacion', '-id')
+    
+    def usa_cache_mis_pedidos(self, request):
+        """Solo se cachea la primera página (en JSON) del listado de un cliente."""
+        return (
+            request.user.is_cliente()
+            and isinstance(request.accepted_renderer, JSONRenderer)
+            and request.query_params.get(self.paginator.page_query_param, '1') == '1'
+            and not request.query_params.get(self.paginator.cursor_query_param)
+        )
+    
+    def list(self, request, *args, **kwargs):
+        """Listado estándar, con la primera página de los clientes desde la caché."""
+        if not self.usa_cache_mis_pedidos(request):
+            return super().list(request, *args, **kwargs)
+        
+        clave = get_clave_mis_pedidos(request)
+        contenido = get_mis_pedidos_cacheado(clave)
+        if contenido is None:
+            data = super().list(request, *args, **kwargs).data
+            contenido = request.accepted_renderer.render(data)
+            set_mis_pedidos_cacheado(clave, contenido)
+        
+        response = HttpResponse(contenido, content_type=request.accepted_renderer.media_type)
+        # La respuesta depende del usuario: no debe quedar en cachés compartidas
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
     
     def get_serializer_class(self):
-        """Usa serializer de creación para POST."""
+        """Usa serializer de creación para POST y el de la vista pedida para GET."""
         if self.request.method == 'POST':
             return PedidoCreateSerializer
-        return PedidoSerializer
+        if self.usa_vista_completa():
+            return PedidoSerializer
+        return PedidoResumenSerializer
     
     def perform_create(self, serializer):
         """Asigna cliente al crear pedido."""
@@ -185,22 +308,285 @@ class PedidoListCreateView(generics.ListCreateAPIView):
             serializer.save()
     
     def create(self, request, *args, **kwargs):
-        """Sobrescribe create para retornar PedidoSerializer en la respuesta."""
+        """
+        Sobrescribe create para retornar PedidoSerializer en la respuesta.
+        
+        Con el header Idempotency-Key, un reintento devuelve la respuesta del
+        pedido ya creado en lugar de crear un duplicado.
+        """
+        return con_idempotencia(request, lambda: self.crear_pedido(request))
+    
+    def crear_pedido(self, request):
+        """Valida y crea el pedido."""
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         
-        # Retornar con PedidoSerializer completo
-        pedido = serializer.instance
+        # Retornar con PedidoSerializer completo (cantidad de consultas fija)
+        pedido = _queryset_detalle().get(pk=serializer.instance.pk)
         logger.info(
             f'Pedido #{pedido.id} creado por usuario {request.user.email} '
-            f'con {pedido.items.count()} items'
+            f'con {len(pedido.items.all())} items'
         )
         output_serializer = PedidoSerializer(pedido)
         headers = self.get_success_headers(output_serializer.data)
         return Response(output_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
+@presupuesto_consultas(7)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def cotizar_pedido_view(request):
+    """
+    Vista para cotizar un pedido sin crearlo.
+    POST /api/pedidos/cotizar/
+    
+    Recibe el mismo body que POST /api/pedidos/ y aplica las mismas
+    validaciones de disponibilidad y los mismos precios (lista de precios del
+    cliente), pero no guarda nada.
+    
+    Respuesta:
+    {
+        "cliente": 1,
+        "lista_precio": 2,
+        "lista_precio_nombre": "...",
+        "lista_precio_descuento": "10.00",
+        "items": [{"producto": 5, "cantidad": 2, "precio_unitario": "90.00", "subtotal": "180.00", ...}],
+        "subtotal": "...",
+        "descuento_total": "...",
+        "total": "..."
+    }
+    """
+    serializer = PedidoCreateSerializer(data=request.data, context={'request': request})
+    serializer.is_valid(raise_exception=True)
+    
+    # Igual que al crear: el cliente cotiza siempre para sí mismo
+    if request.user.is_cliente():
+        pedido, items = serializer.cotizar(cliente=request.user)
+    else:
+        pedido, items = serializer.cotizar()
+    
+    return Response(CotizacionSerializer(pedido, context={'items': items}).data)
+
+
+@presupuesto_consultas(220)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdminOrVendedor])
+def pedidos_bulk_view(request):
+    """
+    Vista para cargar varios pedidos en un solo request (pedidos tomados sin conexión).
+    POST /api/pedidos/bulk/
+    
+    Body:
+    {
+        "pedidos": [                       # máximo 50
+            {"cliente": 1, "items": [...], "notas": "..."},
+            ...
+        ]
+    }
+    
+    Los clientes, listas, productos, promociones y precios de lista de todos
+    los pedidos se cargan en pocas consultas compartidas. Cada pedido se crea
+    en su propio savepoint (4 consultas: savepoint, pedido, items y release):
+    un pedido con errores no impide crear los demás. Un elemento que no es un
+    objeto se informa como error de ese pedido.
+    Acepta el header Idempotency-Key.
+    
+    Respuesta (en el orden recibido):
+    {
+        "creados": 2,
+        "con_errores": 1,
+        "resultados": [
+            {"indice": 0, "creado": true, "pedido": {"id": 10, "estado": "PENDIENTE", "total": "1500.00"}},
+            {"indice": 1, "creado": false, "errores": {"items": [...]}},
+            ...
+        ]
+    }
+    """
+    return con_idempotencia(request, lambda: _crear_pedidos_bulk(request))
+
+
+def _crear_pedidos_bulk(request):
+    entrada = PedidoBulkCreateSerializer(data=request.data)
+    entrada.is_valid(raise_exception=True)
+    pedidos_data = entrada.validated_data['pedidos']
+    
+    context = get_contexto_precargado(pedidos_data)
+    context['request'] = request
+    
+    resultados = []
+    with transaction.atomic():
+        for indice, pedido_data in enumerate(pedidos_data):
+            serializer = PedidoCreateSerializer(data=pedido_data, context=context)
+            if not serializer.is_valid():
+                resultados.append({'indice': indice, 'creado': False, 'errores': serializer.errors})
+                continue
+            
+            try:
+                with transaction.atomic():
+                    pedido = serializer.save()
+            except DatabaseError:
+                logger.exception(f'Error al crear el pedido {indice} de la carga masiva')
+                resultados.append({
+                    'indice': indice,
+                    'creado': False,
+                    'errores': {'error': 'Error al guardar el pedido.'}
+                })
+                continue
+            
+            resultados.append({
+                'indice': indice,
+                'creado': True,
+                'pedido': {
+                    'id': pedido.id,
+                    'estado': pedido.estado,
+                    'total': str(pedido.total),
+                },
+            })
+    
+    creados = sum(1 for resultado in resultados if resultado['creado'])
+    logger.info(
+        f'Carga masiva de {len(resultados)} pedidos por usuario {request.user.email}: '
+        f'{creados} creados, {len(resultados) - creados} con errores'
+    )
+    return Response({
+        'creados': creados,
+        'con_errores': len(resultados) - creados,
+        'resultados': resultados,
+    }, status=status.HTTP_200_OK)
+
+
+class PedidoExportarView(StreamingListMixin, PedidoListCreateView):
+    """
+    Vista para exportar pedidos.
+    GET /api/pedidos/exportar/
+    
+    Acepta los mismos filtros que el listado y devuelve todos los pedidos
+    (sin paginar) como array JSON en streaming. Por defecto con el detalle
+    de items (`view=summary` para exportar solo los totales).
+    Solo admin y vendedor pueden exportar.
+    """
+    permission_classes = [IsAuthenticated, IsAdminOrVendedor]
+    http_method_names = ['get', 'head', 'options']
+    vista_por_defecto = 'full'
+    
+    def quiere_stream(self):
+        """La exportación siempre se genera en streaming."""
+        return True
+
+
+class PedidoSyncView(generics.GenericAPIView):
+    """
+    Vista para sincronización incremental de pedidos.
+    GET /api/pedidos/sync/?since=<cursor>
+    
+    Alcance según el rol: el cliente sus pedidos, admin y vendedor todos, y el
+    transportador los FACTURADO asignados a él.
+    
+    Sin `since` devuelve todos los pedidos del alcance. Con `since` devuelve
+    solo los que cambiaron (fecha_actualizacion) desde el cursor y las bajas:
+    pedidos borrados, reasignados a otro transportador o, para el
+    transportador, que dejaron de estar FACTURADO.
+    
+    Cada respuesta trae a lo sumo 500 pedidos. Si `hay_mas` es true, volver a
+    pedir enseguida con el cursor recibido.
+    
+    Respuesta:
+    {
+        "cursor": "...",        # usar como `since` en la próxima llamada
+        "completo": false,      # true si el cliente debe reemplazar todos sus pedidos
+        "hay_mas": false,       # true si quedan cambios por traer con el cursor
+        "pedidos": [...],       # altas y modificaciones (como el listado summary,
+                                # o PedidoTransportadorSerializer para el transportador)
+        "eliminados": [1, 2]    # IDs a quitar (aplicar antes que `pedidos`)
+    }
+    """
+    permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 8
+    sync_limite = SYNC_LIMITE
+    
+    def get_serializer_class(self):
+        if self.request.user.is_transportador():
+            return PedidoTransportadorSerializer
+        return PedidoResumenSerializer
+    
+    def get_queryset(self):
+        """Pedidos del usuario (al transportador, todos los asignados sin importar el estado)."""
+        user = self.request.user
+        if user.is_transportador():
+            return _queryset_transportador().filter(transportador=user)
+        queryset = _queryset_resumen()
+        if user.is_cliente():
+            queryset = queryset.filter(cliente=user)
+        return queryset
+    
+    def get_bajas(self, desde):
+        """IDs de pedidos que salieron del alcance del usuario desde `desde`."""
+        user = self.request.user
+        bajas = PedidoBaja.objects.filter(fecha__gte=desde)
+        if user.is_transportador():
+            bajas = bajas.filter(transportador_id=user.id)
+        else:
+            bajas = bajas.filter(motivo='ELIMINADO')
+            if user.is_cliente():
+                bajas = bajas.filter(cliente_id=user.id)
+        return list(bajas.values_list('pedido_id', flat=True))
+    
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        # El cursor se toma antes de consultar para no perder cambios concurrentes
+        ahora = timezone.now()
+        
+        since = request.query_params.get('since')
+        desde, ultimo_id, inicial = None, 0, True
+        if since:
+            try:
+                desde, ultimo_id, inicial = decodificar_cursor(since)
+            except CursorInvalidoError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = self.get_queryset()
+        eliminados = []
+        
+        if inicial and user.is_transportador():
+            queryset = queryset.filter(estado='FACTURADO')
+        
+        if ultimo_id:
+            # Siguiente página: después del último pedido enviado
+            queryset = queryset.filter(
+                Q(fecha_actualizacion__gt=desde) | Q(fecha_actualizacion=desde, id__gt=ultimo_id)
+            )
+        elif desde is not None:
+            queryset = queryset.filter(fecha_actualizacion__gte=desde - SYNC_MARGEN)
+        
+        if not inicial:
+            eliminados = self.get_bajas(desde - SYNC_MARGEN)
+        
+        pedidos = list(queryset.order_by('fecha_actualizacion', 'id')[:self.sync_limite + 1])
+        hay_mas = len(pedidos) > self.sync_limite
+        pedidos = pedidos[:self.sync_limite]
+        
+        if hay_mas:
+            ultimo = pedidos[-1]
+            cursor = codificar_cursor(ultimo.fecha_actualizacion, ultimo.id, inicial)
+        else:
+            cursor = codificar_cursor(ahora)
+        
+        if not inicial and user.is_transportador():
+            # Entregados o rechazados: ya no están para entregar
+            eliminados += [pedido.id for pedido in pedidos if pedido.estado != 'FACTURADO']
+            pedidos = [pedido for pedido in pedidos if pedido.estado == 'FACTURADO']
+        
+        serializer = self.get_serializer(pedidos, many=True)
+        return Response({
+            'cursor': cursor,
+            'completo': not since,
+            'hay_mas': hay_mas,
+            'pedidos': serializer.data,
+            'eliminados': sorted(set(eliminados)),
+        })
+
+
 class PedidoDetailView(generics.RetrieveAPIView):
     """
     Vista para obtener detalle de pedido.
@@ -208,13 +594,12 @@ class PedidoDetailView(generics.RetrieveAPIView):
     """
     serializer_class = PedidoSerializer
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 5
     
     def get_queryset(self):
         """Filtra pedidos según permisos."""
         user = self.request.user
-        queryset = Pedido.objects.select_related('cliente').prefetch_related(
-            'items__producto',
-        )
+        queryset = _queryset_detalle()
         
         # Cliente solo ve sus pedidos
         if user.is_cliente():
@@ -223,6 +608,7 @@ class PedidoDetailView(generics.RetrieveAPIView):
         return queryset
 
 
+@presupuesto_consultas(8)
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated, IsAdminOrVendedor])
 def update_estado_view(request, pk):
@@ -239,8 +625,11 @@ def update_estado_view(request, pk):
     - PENDIENTE -> EN_PREPARACION (aprobar) o RECHAZADO
     - EN_PREPARACION -> FACTURADO o RECHAZADO
     - FACTURADO -> ENTREGADO o RECHAZADO
+    
+    Si al aprobar hay productos o promociones no disponibles, responde 400
+    con todos juntos en `problemas`.
     """
-    pedido = get_object_or_404(Pedido, pk=pk)
+    pedido = get_object_or_404(_queryset_detalle(), pk=pk)
     
     serializer = PedidoUpdateEstadoSerializer(pedido, data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -252,6 +641,14 @@ def update_estado_view(request, pk):
             f'por usuario {request.user.email}'
         )
         return Response(PedidoSerializer(pedido).data)
+    except PedidoNoDisponibleError as e:
+        logger.warning(
+            f'Pedido #{pedido.id} no disponible para aprobar: {e.problemas}'
+        )
+        return Response(
+            {'error': str(e), 'problemas': e.problemas},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     except ValueError as e:
         logger.warning(
             f'Error al actualizar estado del pedido #{pedido.id}: {str(e)}'
@@ -262,6 +659,60 @@ def update_estado_view(request, pk):
         )
 
 
+@presupuesto_consultas(8)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdminOrVendedor])
+def bulk_estado_view(request):
+    """
+    Vista para cambiar el estado de varios pedidos a la vez.
+    POST /api/pedidos/bulk-estado/
+    
+    Body:
+    {
+        "ids": [10, 11, 12],               # máximo 200
+        "estado": "EN_PREPARACION" | "FACTURADO" | "ENTREGADO" | "RECHAZADO"
+    }
+    
+    Valida todas las transiciones juntas y aplica las válidas en pocas
+    sentencias. Los pedidos que no pueden cambiar no impiden el resto.
+    
+    Respuesta:
+    {
+        "estado": "FACTURADO",
+        "actualizados": 2,
+        "resultados": [
+            {"id": 10, "ok": true},
+            {"id": 11, "ok": false, "error": "No se puede cambiar de PENDIENTE a FACTURADO."},
+            ...
+        ]
+    }
+    """
+    serializer = PedidoBulkEstadoSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    ids = serializer.validated_data['ids']
+    nuevo_estado = serializer.validated_data['estado']
+    
+    errores = Pedido.cambiar_estado_en_bloque(ids, nuevo_estado)
+    
+    resultados = [
+        {'id': pedido_id, 'ok': True} if errores[pedido_id] is None
+        else {'id': pedido_id, 'ok': False, 'error': errores[pedido_id]}
+        for pedido_id in ids
+    ]
+    actualizados = sum(1 for resultado in resultados if resultado['ok'])
+    logger.info(
+        f'Cambio de estado en bloque a {nuevo_estado} por usuario {request.user.email}: '
+        f'{actualizados} de {len(ids)} pedidos actualizados'
+    )
+    
+    return Response({
+        'estado': nuevo_estado,
+        'actualizados': actualizados,
+        'resultados': resultados,
+    }, status=status.HTTP_200_OK)
+
+
+@presupuesto_consultas(6)
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated, IsAdminOrVendedor])
 def rechazar_pedido_view(request, pk):
@@ -272,7 +723,7 @@ def rechazar_pedido_view(request, pk):
     Solo admin y vendedor pueden rechazar pedidos.
     No se pueden rechazar pedidos ya rechazados o entregados.
     """
-    pedido = get_object_or_404(Pedido, pk=pk)
+    pedido = get_object_or_404(_queryset_detalle(), pk=pk)
     
     if pedido.estado == 'RECHAZADO':
         return Response(
@@ -316,16 +767,12 @@ class PedidoTransportadorListView(generics.ListAPIView):
     """
     serializer_class = PedidoTransportadorSerializer
     permission_classes = [IsAuthenticated, IsTransportador]
+    presupuesto_consultas = 7
     
     def get_queryset(self):
         """Filtra pedidos asignados al transportador actual."""
         user = self.request.user
-        queryset = Pedido.objects.select_related(
-            'cliente', 'cliente__zona'
-        ).prefetch_related(
-            'items__producto',
-            'cliente__horarios'
-        ).filter(
+        queryset = _queryset_transportador().filter(
             transportador=user,
             estado='FACTURADO'  # Solo pedidos listos para entregar
         )
@@ -341,18 +788,15 @@ class PedidoTransportadorDetailView(generics.RetrieveAPIView):
     """
     serializer_class = PedidoTransportadorSerializer
     permission_classes = [IsAuthenticated, IsTransportador]
+    presupuesto_consultas = 6
     
     def get_queryset(self):
         """Solo pedidos asignados al transportador actual."""
         user = self.request.user
-        return Pedido.objects.select_related(
-            'cliente', 'cliente__zona'
-        ).prefetch_related(
-            'items__producto',
-            'cliente__horarios'
-        ).filter(transportador=user)
+        return _queryset_transportador().filter(transportador=user)
 
 
+@presupuesto_consultas(7)
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated, IsTransportador])
 def entregar_pedido_transportador_view(request, pk):
@@ -363,7 +807,7 @@ def entregar_pedido_transportador_view(request, pk):
     Solo puede entregar pedidos que le fueron asignados y están facturados.
     """
     user = request.user
-    pedido = get_object_or_404(Pedido, pk=pk, transportador=user)
+    pedido = get_object_or_404(_queryset_transportador(), pk=pk, transportador=user)
     
     if pedido.estado != 'FACTURADO':
         return Response(
@@ -372,7 +816,7 @@ def entregar_pedido_transportador_view(request, pk):
         )
     
     try:
-        pedido.entregar()
+        pedido.entregar(transportador=user)
         logger.info(
             f'Pedido #{pedido.id} entregado por transportador {user.email}'
         )
@@ -390,6 +834,7 @@ def entregar_pedido_transportador_view(request, pk):
         )
 
 
+@presupuesto_consultas(4)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminOrVendedor])
 def listar_transportadores_view(request):
@@ -423,6 +868,7 @@ def listar_transportadores_view(request):
     return Response(result, status=status.HTTP_200_OK)
 
 
+@presupuesto_consultas(7)
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated, IsAdminOrVendedor])
 def asignar_transportador_view(request, pk):
@@ -437,7 +883,7 @@ def asignar_transportador_view(request, pk):
     
     Solo admin y vendedor pueden asignar transportadores.
     """
-    pedido = get_object_or_404(Pedido, pk=pk)
+    pedido = get_object_or_404(_queryset_detalle(), pk=pk)
     
     serializer = PedidoAsignarTransportadorSerializer(pedido, data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -454,6 +900,7 @@ def asignar_transportador_view(request, pk):
     return Response(PedidoSerializer(pedido).data, status=status.HTTP_200_OK)
 
 
+@presupuesto_consultas(6)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminOrVendedor])
 def descargar_pdf_view(request, pk):
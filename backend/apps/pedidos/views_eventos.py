@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse, HttpResponseNotAllowed
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+import logging
+
+from .eventos import get_broker, puede_ver_evento, formatear_evento
+
+logger = logging.getLogger('eltetu')
+
+EVENTOS_HEARTBEAT = 15  # Segundos entre comentarios `: ping` (mantiene vivos los proxies)
+EVENTOS_DURACION_MAXIMA = 5 * 60  # Segundos; el cliente se reconecta con Last-Event-ID
+EVENTOS_REINTENTO_MS = 5000
+
+
+async def _generar_eventos(user, desde_id, fin):
+    """Genera el stream SSE del usuario hasta `fin` (sin consultas a la base)."""
+    broker = get_broker()
+    yield f'retry: {EVENTOS_REINTENTO_MS}\n\n'
+    while True:
+        restante = (fin - timezone.now()).total_seconds()
+        if restante <= 0:
+            return
+        eventos = await broker.leer(desde_id, min(EVENTOS_HEARTBEAT, restante))
+        if not eventos:
+            yield ': ping\n\n'
+            continue
+        for id_evento, evento in eventos:
+            desde_id = id_evento
+            if puede_ver_evento(user, evento):
+                yield formatear_evento(id_evento, evento)
+
+
+async def eventos_view(request):
+    """
+    Vista de eventos de pedidos (Server-Sent Events).
+    GET /api/pedidos/eventos/
+
+    Envía un evento `pedido` cuando se crea un pedido o cambia su estado:
+    {"tipo": "creado" | "estado" | "actualizado", "id", "estado", "transportador", "total"}
+
+    - Admin y vendedor reciben todos los pedidos, transportador los asignados
+      a él y cliente los propios.
+    - Autenticación con el header Authorization (JWT), como el resto de la API.
+    - La conexión se cierra a los 5 minutos o al vencer el token; al reconectar
+      con el header Last-Event-ID se reciben los eventos perdidos.
+    - Requiere el servidor ASGI. Con WSGI responde 501 y el cliente sigue
+      consultando los listados como antes.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'Los eventos en tiempo real requieren el servidor ASGI.'}, status=501
+        )
+
+    try:
+        autenticacion = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except (InvalidToken, AuthenticationFailed) as e:
+        return JsonResponse({'error': str(e)}, status=401)
+    if autenticacion is None:
+        return JsonResponse({'error': 'Se requiere autenticación.'}, status=401)
+    user, token = autenticacion
+
+    broker = get_broker()
+    desde_id = request.headers.get('Last-Event-ID')
+    if not broker.id_valido(desde_id):
+        desde_id = await broker.ultimo_id()
+
+    fin = min(
+        timezone.now() + timedelta(seconds=EVENTOS_DURACION_MAXIMA),
+        datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+    )
+    logger.info(f'Conexión de eventos de pedidos abierta por {user.email}')
+
+    response = StreamingHttpResponse(
+        _generar_eventos(user, desde_id, fin), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Nginx y otros proxies no deben acumular la respuesta
+    response['X-Accel-Buffering'] = 'no'
+    return response
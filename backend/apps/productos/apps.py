@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ProductosConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.productos'
+
+    def ready(self):
+        """Registra las señales del catálogo."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,121 @@
+"""
+Búsqueda de productos con índice de texto completo.
+
+- PostgreSQL: SearchVector con la configuración `spanish_unaccent` (español, sin
+  acentos) sobre un índice GIN, más similitud por trigramas sobre el nombre
+  para tolerar errores de tipeo.
+- SQLite (desarrollo): tabla virtual FTS5 `productos_producto_fts`.
+- Otros motores: búsqueda estándar de DRF (icontains).
+
+Los índices y la tabla FTS5 se crean en la migración 0012_busqueda_productos.
+"""
+import re
+from functools import lru_cache
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+CONFIG_BUSQUEDA = 'spanish_unaccent'
+TABLA_FTS = 'productos_producto_fts'
+
+
+def vector_busqueda():
+    """
+    Vector de búsqueda de productos (PostgreSQL).
+    Debe coincidir con la expresión del índice GIN de la migración 0012.
+    """
+    return (
+        SearchVector('nombre', config=CONFIG_BUSQUEDA, weight='A') +
+        SearchVector('codigo_barra', config=CONFIG_BUSQUEDA, weight='A') +
+        SearchVector('descripcion', config=CONFIG_BUSQUEDA, weight='B')
+    )
+
+
+def tokenizar(termino):
+    """Separa el término en palabras, descartando signos (evita inyectar sintaxis de consulta)."""
+    return re.findall(r'\w+', termino)
+
+
+@lru_cache(maxsize=None)
+def _fts_sqlite_disponible():
+    """La tabla FTS5 y sus triggers existen (se pierden si SQLite recrea la tabla)."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s, %s)",
+            [TABLA_FTS, f'{TABLA_FTS}_au']
+        )
+        return cursor.fetchone()[0] == 2
+
+
+def buscar_productos(queryset, termino):
+    """
+    Filtra el queryset con el índice de texto completo y anota `rango_busqueda`.
+
+    Returns:
+        QuerySet filtrado, el mismo queryset si el término no tiene palabras,
+        o None si el motor no tiene índice de texto completo.
+    """
+    tokens = tokenizar(termino)
+    if not tokens:
+        return queryset
+    if connection.vendor == 'postgresql':
+        return _buscar_postgresql(queryset, termino, tokens)
+    if connection.vendor == 'sqlite' and _fts_sqlite_disponible():
+        return _buscar_sqlite(queryset, tokens)
+    return None
+
+
+def _buscar_postgresql(queryset, termino, tokens):
+    query = SearchQuery(
+        ' & '.join(f'{token}:*' for token in tokens),
+        config=CONFIG_BUSQUEDA,
+        search_type='raw'
+    )
+    vector = vector_busqueda()
+    return queryset.annotate(
+        busqueda=vector,
+        rango_busqueda=SearchRank(vector, query) + TrigramWordSimilarity(termino, 'nombre'),
+    ).filter(
+        Q(busqueda=query) | Q(nombre__trigram_word_similar=termino)
+    )
+
+
+def _buscar_sqlite(queryset, tokens):
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    tabla = queryset.model._meta.db_table
+    return queryset.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s', [match])
+    ).annotate(
+        # bm25 es menor cuanto más relevante: se invierte el signo
+        rango_busqueda=RawSQL(
+            f'SELECT -bm25({TABLA_FTS}, 10.0, 10.0, 1.0) FROM {TABLA_FTS} '
+            f'WHERE {TABLA_FTS} MATCH %s AND rowid = "{tabla}"."id"',
+            [match]
+        )
+    )
+
+
+class ProductoSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter que usa el índice de texto completo del motor.
+
+    Coincide por prefijo de palabra ("galle" encuentra "Galletitas"), sin
+    distinguir acentos, y ordena por relevancia (anotación `rango_busqueda`)
+    salvo que se pida un `ordering` explícito.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        termino = ' '.join(self.get_search_terms(request))
+        if not tokenizar(termino):
+            return queryset
+
+        resultado = buscar_productos(queryset, termino)
+        if resultado is None:
+            return super().filter_queryset(request, queryset, view)
+
+        if request.query_params.get('ordering'):
+            return resultado
+        return resultado.order_by('-activo', 'fecha_eliminacion', '-rango_busqueda', 'nombre', 'id')
@@ -0,0 +1,153 @@
+"""
+Utilidades del catálogo de productos.
+Calcula la versión del catálogo para respuestas condicionales (ETag), guarda en
+caché el JSON ya renderizado y genera los cursores de la sincronización incremental.
+"""
+import base64
+import binascii
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import Producto, Marca, Categoria, Subcategoria
+
+
+# Modelos cuyo contenido se refleja en el listado de productos
+MODELOS_CATALOGO = (Producto, Marca, Categoria, Subcategoria)
+
+
+def get_version_catalogo():
+    """
+    Retorna una cadena que cambia cada vez que cambia el catálogo.
+
+    Combina, por cada modelo del catálogo, la cantidad de registros y las fechas
+    máximas de actualización y eliminación. La cantidad detecta los borrados
+    físicos, que no dejan rastro en las fechas.
+    """
+    partes = []
+    for model in MODELOS_CATALOGO:
+        datos = model.objects.aggregate(
+            cantidad=Count('id'),
+            actualizacion=Max('fecha_actualizacion'),
+            eliminacion=Max('fecha_eliminacion'),
+        )
+        partes.append(
+            f"{model._meta.model_name}:{datos['cantidad']}:"
+            f"{datos['actualizacion'] and datos['actualizacion'].isoformat()}:"
+            f"{datos['eliminacion'] and datos['eliminacion'].isoformat()}"
+        )
+    return '|'.join(partes)
+
+
+def get_etag_catalogo(request):
+    """
+    Calcula el ETag (fuerte) del listado de productos para el usuario del request.
+
+    Además de la versión del catálogo incluye todo lo que cambia la respuesta
+    para el mismo catálogo: la lista de precios del usuario, si ve productos
+    inactivos (admin) y los parámetros de filtrado.
+    """
+    user = request.user
+    lista_precio = getattr(user, 'lista_precio', None)
+    if lista_precio:
+        lista = f'{lista_precio.id}:{lista_precio.descuento_porcentaje}:{lista_precio.activo}'
+    else:
+        lista = 'base'
+
+    partes = [
+        get_version_catalogo(),
+        f'lista={lista}',
+        f'admin={user.is_admin()}',
+        f'params={sorted(request.query_params.lists())}',
+    ]
+    digest = hashlib.sha256('|'.join(partes).encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+# ========== Caché del catálogo renderizado ==========
+
+CATALOGO_CACHE_TIMEOUT = 60 * 60  # 1 hora
+CATALOGO_CACHE_GENERACION = 'catalogo:generacion'
+
+
+def _get_generacion_catalogo():
+    """Número de generación vigente; las señales lo incrementan para invalidar."""
+    return cache.get_or_set(CATALOGO_CACHE_GENERACION, 0, timeout=None)
+
+
+def _get_clave_catalogo(etag):
+    version = etag.strip('"')
+    return f'catalogo:{_get_generacion_catalogo()}:{version}'
+
+
+def get_catalogo_cacheado(etag):
+    """
+    Retorna el JSON (bytes) del catálogo para el ETag dado, o None.
+    
+    La clave incluye el ETag, que ya contempla la versión del catálogo, la lista
+    de precios, la visibilidad del rol y los filtros. Así, aunque cada worker
+    tenga su propia caché en memoria, nunca se sirve un catálogo desactualizado.
+    """
+    return cache.get(_get_clave_catalogo(etag))
+
+
+def set_catalogo_cacheado(etag, contenido):
+    """Guarda el JSON renderizado del catálogo para el ETag dado."""
+    cache.set(_get_clave_catalogo(etag), contenido, timeout=CATALOGO_CACHE_TIMEOUT)
+
+
+def invalidar_cache_catalogo():
+    """Descarta todos los catálogos cacheados (se llama desde las señales)."""
+    try:
+        cache.incr(CATALOGO_CACHE_GENERACION)
+    except ValueError:
+        cache.set(CATALOGO_CACHE_GENERACION, 1, timeout=None)
+
+
+# ========== Sincronización incremental ==========
+
+# Solapamiento aplicado al cursor para no perder cambios de transacciones que
+# guardaron su fecha_actualizacion antes de generar el cursor pero confirmaron
+# después. El cliente aplica los cambios como upsert, así que repetir es inocuo.
+SYNC_MARGEN = timedelta(seconds=5)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class CursorInvalidoError(ValueError):
+    """El cursor de sincronización no tiene un formato válido."""
+
+
+def codificar_cursor(fecha, lista_precio=None):
+    """
+    Genera el cursor opaco de sincronización.
+    
+    Guarda la fecha de corte y la lista de precios con la que se calcularon los
+    precios, para detectar cuándo el cliente debe descargar todo de nuevo.
+    """
+    lista_id = lista_precio.id if lista_precio else 0
+    micros = (fecha - _EPOCH) // timedelta(microseconds=1)
+    valor = f'{micros}:{lista_id}'.encode('ascii')
+    return base64.urlsafe_b64encode(valor).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Decodifica un cursor generado por codificar_cursor().
+    
+    Returns:
+        tuple: (fecha, lista_precio_id) donde lista_precio_id es 0 para la lista base
+    
+    Raises:
+        CursorInvalidoError: si el cursor no se puede interpretar
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valor = base64.urlsafe_b64decode(cursor + relleno).decode('ascii')
+        micros, lista_id = valor.split(':')
+        fecha = _EPOCH + timedelta(microseconds=int(micros))
+        return fecha, int(lista_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, OverflowError, OSError):
+        raise CursorInvalidoError('Cursor de sincronización inválido.')
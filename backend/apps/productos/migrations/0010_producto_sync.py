@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0009_promociones'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductoEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('producto_id', models.BigIntegerField(verbose_name='ID de Producto')),
+                ('fecha_eliminacion', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Fecha de Eliminación')),
+            ],
+            options={
+                'verbose_name': 'Producto Eliminado',
+                'verbose_name_plural': 'Productos Eliminados',
+                'ordering': ['-fecha_eliminacion'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['fecha_actualizacion'], name='producto_fecha_act_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:54
+
+from decimal import Decimal, ROUND_HALF_UP
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def poblar_precios_lista(apps, schema_editor):
+    """
+    Calcula el precio de cada producto en cada lista existente.
+    Replica ListaPrecio.calcular_precio() redondeado a centavos.
+    """
+    ListaPrecio = apps.get_model('productos', 'ListaPrecio')
+    Producto = apps.get_model('productos', 'Producto')
+    PrecioLista = apps.get_model('productos', 'PrecioLista')
+    
+    productos = list(Producto.objects.values_list('id', 'precio_base'))
+    for lista in ListaPrecio.objects.all():
+        factor = Decimal('1')
+        if lista.descuento_porcentaje > 0:
+            factor = Decimal('1') - (lista.descuento_porcentaje / Decimal('100'))
+        PrecioLista.objects.bulk_create(
+            [
+                PrecioLista(
+                    producto_id=producto_id,
+                    lista_precio_id=lista.id,
+                    precio=(precio_base * factor).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+                )
+                for producto_id, precio_base in productos
+            ],
+            batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0010_producto_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrecioLista',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('precio', models.DecimalField(decimal_places=2, help_text='Precio base con el descuento de la lista aplicado', max_digits=12, verbose_name='Precio')),
+                ('lista_precio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='precios', to='productos.listaprecio', verbose_name='Lista de Precio')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='precios_lista', to='productos.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Precio por Lista',
+                'verbose_name_plural': 'Precios por Lista',
+                'unique_together': {('lista_precio', 'producto')},
+            },
+        ),
+        migrations.RunPython(poblar_precios_lista, migrations.RunPython.noop),
+    ]
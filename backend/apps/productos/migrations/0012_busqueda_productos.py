@@ -0,0 +1,105 @@
+# Índices de texto completo para la búsqueda de productos (ver apps/productos/busqueda.py)
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+CONFIG = 'spanish_unaccent'
+TABLA_FTS = 'productos_producto_fts'
+
+
+def _indices_postgresql():
+    """Debe coincidir con vector_busqueda() de busqueda.py."""
+    vector = (
+        SearchVector('nombre', config=CONFIG, weight='A') +
+        SearchVector('codigo_barra', config=CONFIG, weight='A') +
+        SearchVector('descripcion', config=CONFIG, weight='B')
+    )
+    return [
+        GinIndex(vector, name='producto_busqueda_gin'),
+        GinIndex(fields=['nombre'], name='producto_nombre_trgm', opclasses=['gin_trgm_ops']),
+    ]
+
+
+def crear_busqueda(apps, schema_editor):
+    """
+    PostgreSQL: configuración español sin acentos + índices GIN (texto completo y trigramas).
+    SQLite: tabla virtual FTS5 sincronizada con triggers.
+    """
+    vendor = schema_editor.connection.vendor
+    Producto = apps.get_model('productos', 'Producto')
+    
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(f"""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{CONFIG}') THEN
+                    CREATE TEXT SEARCH CONFIGURATION {CONFIG} (COPY = spanish);
+                    ALTER TEXT SEARCH CONFIGURATION {CONFIG}
+                        ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+                END IF;
+            END
+            $$;
+        """)
+        for index in _indices_postgresql():
+            schema_editor.add_index(Producto, index)
+    
+    elif vendor == 'sqlite':
+        tabla = Producto._meta.db_table
+        schema_editor.execute(f"""
+            CREATE VIRTUAL TABLE {TABLA_FTS} USING fts5(
+                nombre, codigo_barra, descripcion,
+                content='{tabla}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {TABLA_FTS}_ai AFTER INSERT ON {tabla} BEGIN
+                INSERT INTO {TABLA_FTS}(rowid, nombre, codigo_barra, descripcion)
+                VALUES (new.id, new.nombre, new.codigo_barra, new.descripcion);
+            END
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {TABLA_FTS}_ad AFTER DELETE ON {tabla} BEGIN
+                INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, nombre, codigo_barra, descripcion)
+                VALUES ('delete', old.id, old.nombre, old.codigo_barra, old.descripcion);
+            END
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {TABLA_FTS}_au AFTER UPDATE ON {tabla} BEGIN
+                INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, nombre, codigo_barra, descripcion)
+                VALUES ('delete', old.id, old.nombre, old.codigo_barra, old.descripcion);
+                INSERT INTO {TABLA_FTS}(rowid, nombre, codigo_barra, descripcion)
+                VALUES (new.id, new.nombre, new.codigo_barra, new.descripcion);
+            END
+        """)
+        schema_editor.execute(f"INSERT INTO {TABLA_FTS}({TABLA_FTS}) VALUES ('rebuild')")
+
+
+def eliminar_busqueda(apps, schema_editor):
+    """Revierte crear_busqueda (las extensiones de PostgreSQL se conservan)."""
+    vendor = schema_editor.connection.vendor
+    Producto = apps.get_model('productos', 'Producto')
+    
+    if vendor == 'postgresql':
+        for index in _indices_postgresql():
+            schema_editor.remove_index(Producto, index)
+        schema_editor.execute(f'DROP TEXT SEARCH CONFIGURATION IF EXISTS {CONFIG}')
+    
+    elif vendor == 'sqlite':
+        for sufijo in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {TABLA_FTS}_{sufijo}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLA_FTS}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0011_precios_lista'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_busqueda, eliminar_busqueda),
+    ]
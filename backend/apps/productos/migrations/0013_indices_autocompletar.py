@@ -0,0 +1,38 @@
+# Índices de prefijo para el autocompletado de productos (ver AutocompletarView)
+
+from django.db import migrations
+
+# istartswith genera UPPER("nombre"::text) LIKE UPPER('x%'). Con una intercalación
+# distinta de C, PostgreSQL solo usa un índice para LIKE por prefijo si tiene la
+# clase de operadores *_pattern_ops. El startswith de codigo_barra ya usa el índice
+# `..._like` (varchar_pattern_ops) que Django crea para los CharField unique.
+INDICES = [
+    ('producto_nombre_prefijo', 'UPPER(nombre::text) text_pattern_ops'),
+]
+
+
+def crear_indices(apps, schema_editor):
+    """Solo PostgreSQL (en SQLite LIKE con ESCAPE no usa índices)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    tabla = apps.get_model('productos', 'Producto')._meta.db_table
+    for nombre, expresion in INDICES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({expresion})')
+
+
+def eliminar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nombre, _ in INDICES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {nombre}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0012_busqueda_productos'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
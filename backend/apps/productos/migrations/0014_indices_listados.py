@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0013_indices_autocompletar'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['-activo', 'fecha_eliminacion', 'nombre', 'id'], name='producto_lista_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(condition=models.Q(('activo', True), ('fecha_eliminacion__isnull', True)), fields=['nombre', 'id'], name='producto_catalogo_idx'),
+        ),
+    ]
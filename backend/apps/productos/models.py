@@ -196,6 +196,18 @@ class Producto(SoftDeleteMixin, TimestampMixin):
         verbose_name = 'Producto'
         verbose_name_plural = 'Productos'
         ordering = ['nombre']
+        indexes = [
+            # Sincronización incremental del catálogo (cambios desde un cursor)
+            models.Index(fields=['fecha_actualizacion'], name='producto_fecha_act_idx'),
+            # Orden del listado (ProductoListCreateView) para admin: activos y no eliminados primero
+            models.Index(fields=['-activo', 'fecha_eliminacion', 'nombre', 'id'], name='producto_lista_idx'),
+            # Catálogo de clientes y vendedores: solo activos y no eliminados, por nombre
+            models.Index(
+                fields=['nombre', 'id'],
+                condition=models.Q(activo=True, fecha_eliminacion__isnull=True),
+                name='producto_catalogo_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.codigo_barra} - {self.nombre}"
@@ -210,6 +222,67 @@ class Producto(SoftDeleteMixin, TimestampMixin):
         return self.precio_base
 
 
+class PrecioLista(models.Model):
+    """
+    Precio final precalculado de un producto en una lista de precios.
+    
+    Se mantiene actualizado al guardar un Producto o una ListaPrecio
+    (ver signals.py), de modo que el catálogo obtiene el precio con un JOIN
+    en lugar de calcularlo fila por fila.
+    """
+    
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name='precios_lista',
+        verbose_name='Producto'
+    )
+    lista_precio = models.ForeignKey(
+        ListaPrecio,
+        on_delete=models.CASCADE,
+        related_name='precios',
+        verbose_name='Lista de Precio'
+    )
+    precio = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name='Precio',
+        help_text='Precio base con el descuento de la lista aplicado'
+    )
+    
+    class Meta:
+        verbose_name = 'Precio por Lista'
+        verbose_name_plural = 'Precios por Lista'
+        unique_together = ['lista_precio', 'producto']
+    
+    def __str__(self):
+        return f"{self.producto_id} en lista {self.lista_precio_id}: {self.precio}"
+
+
+class ProductoEliminado(models.Model):
+    """
+    Registro de productos eliminados físicamente (hard delete).
+    
+    Un borrado físico no deja rastro en el producto, así que se guarda aquí
+    para que la sincronización incremental pueda informarlo a los clientes.
+    """
+    
+    producto_id = models.BigIntegerField(verbose_name='ID de Producto')
+    fecha_eliminacion = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Fecha de Eliminación'
+    )
+    
+    class Meta:
+        verbose_name = 'Producto Eliminado'
+        verbose_name_plural = 'Productos Eliminados'
+        ordering = ['-fecha_eliminacion']
+    
+    def __str__(self):
+        return f"Producto #{self.producto_id} eliminado"
+
+
 class Promocion(SoftDeleteMixin, TimestampMixin):
     """
     Modelo para promociones (combos de productos con precio especial).
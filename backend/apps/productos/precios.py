@@ -0,0 +1,125 @@
+"""
+Tabla de precios precalculados por lista (PrecioLista).
+Centraliza el cálculo, el mantenimiento y la consulta de los precios finales.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import F, Q, FilteredRelation
+
+from .models import Producto, ListaPrecio, PrecioLista
+
+CENTAVO = Decimal('0.01')
+
+# Tamaño de lote para las inserciones masivas
+BATCH_SIZE = 1000
+
+
+def calcular_precio_final(lista_precio, precio_base):
+    """Precio de la lista redondeado a centavos (lo que se cobra en el pedido)."""
+    return lista_precio.calcular_precio(precio_base).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+def _guardar_precios(precios):
+    """Inserta o actualiza (upsert) las filas de PrecioLista."""
+    PrecioLista.objects.bulk_create(
+        precios,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['lista_precio', 'producto'],
+        update_fields=['precio'],
+    )
+
+
+def actualizar_precios_producto(producto):
+    """Recalcula los precios de un producto en todas las listas."""
+    _guardar_precios([
+        PrecioLista(
+            producto=producto,
+            lista_precio=lista,
+            precio=calcular_precio_final(lista, producto.precio_base)
+        )
+        for lista in ListaPrecio.objects.all()
+    ])
+
+
+def actualizar_precios_lista(lista_precio):
+    """Recalcula los precios de todos los productos en una lista."""
+    productos = Producto.objects.values_list('id', 'precio_base')
+    _guardar_precios([
+        PrecioLista(
+            producto_id=producto_id,
+            lista_precio=lista_precio,
+            precio=calcular_precio_final(lista_precio, precio_base)
+        )
+        for producto_id, precio_base in productos.iterator(chunk_size=BATCH_SIZE)
+    ])
+
+
+def recalcular_precios_listas():
+    """
+    Recalcula la tabla completa.
+    Usar después de modificar precios con queryset.update() o bulk_create(),
+    que no disparan las señales.
+    """
+    for lista in ListaPrecio.objects.all():
+        actualizar_precios_lista(lista)
+
+
+def anotar_precio_lista(queryset, lista_precio):
+    """
+    Agrega al queryset de productos el atributo `precio_lista` (JOIN con PrecioLista).
+    Sin lista o con lista inactiva no anota nada: rige el precio base.
+    """
+    if not lista_precio or not lista_precio.activo:
+        return queryset
+    return queryset.annotate(
+        precio_en_lista=FilteredRelation(
+            'precios_lista',
+            condition=Q(precios_lista__lista_precio=lista_precio)
+        ),
+        precio_lista=F('precio_en_lista__precio'),
+    )
+
+
+def get_precios_lista(lista_precio, producto_ids):
+    """Retorna {producto_id: precio} de la lista para los productos indicados."""
+    if not lista_precio or not lista_precio.activo:
+        return {}
+    return dict(
+        PrecioLista.objects.filter(
+            lista_precio=lista_precio,
+            producto_id__in=producto_ids
+        ).values_list('producto_id', 'precio')
+    )
+
+
+def get_precios_listas(listas_precio, producto_ids):
+    """
+    Retorna {lista_id: {producto_id: precio}} de varias listas en una consulta
+    (las listas inactivas no se incluyen). Para cargas de varios pedidos.
+    """
+    precios = {lista.id: {} for lista in listas_precio if lista.activo}
+    if not precios or not producto_ids:
+        return precios
+    filas = PrecioLista.objects.filter(
+        lista_precio_id__in=precios,
+        producto_id__in=producto_ids
+    ).values_list('lista_precio_id', 'producto_id', 'precio')
+    for lista_id, producto_id, precio in filas:
+        precios[lista_id][producto_id] = precio
+    return precios
+
+
+def get_precio_producto(producto, lista_precio, precios=None):
+    """
+    Precio del producto en la lista, usando la tabla precalculada.
+    Si la fila no existe cae al cálculo en Python.
+    """
+    if precios is not None and producto.id in precios:
+        return precios[producto.id]
+    precio_lista = getattr(producto, 'precio_lista', None)
+    if precio_lista is not None:
+        return precio_lista
+    if lista_precio and lista_precio.activo:
+        return calcular_precio_final(lista_precio, producto.precio_base)
+    return producto.precio_base
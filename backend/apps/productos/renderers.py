@@ -0,0 +1,59 @@
+"""
+Renderers del catálogo de productos.
+"""
+from rest_framework.renderers import JSONRenderer
+
+
+class CatalogoColumnarRenderer(JSONRenderer):
+    """
+    Formato columnar para el listado de productos (`?format=columnar`).
+    
+    En lugar de un array de objetos devuelve un array por campo. Los campos de
+    texto que se repiten en muchas filas (marca, categoría, etc.) se codifican
+    con diccionario: la columna guarda el índice dentro de `diccionarios`.
+    
+    {
+        "cantidad": 2,
+        "columnas": {"id": [1, 2], "marca_nombre": [0, 0], ...},
+        "diccionarios": {"marca_nombre": ["Arcor"], ...}
+    }
+    """
+    format = 'columnar'
+    
+    # Campos codificados con diccionario
+    campos_diccionario = (
+        'marca_nombre',
+        'categoria_nombre',
+        'subcategoria_nombre',
+        'unidad_tamaño_display',
+    )
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Errores y respuestas que no son listados se devuelven sin transformar
+        if isinstance(data, list):
+            data = self.a_columnas(data)
+        return super().render(data, accepted_media_type, renderer_context)
+    
+    def a_columnas(self, filas):
+        """Convierte una lista de dicts (filas) al formato columnar."""
+        campos = list(filas[0].keys()) if filas else []
+        columnas = {campo: [] for campo in campos}
+        diccionarios = {campo: [] for campo in self.campos_diccionario if campo in columnas}
+        indices = {campo: {} for campo in diccionarios}
+        
+        for fila in filas:
+            for campo in campos:
+                valor = fila.get(campo)
+                if campo in indices and valor is not None:
+                    indice = indices[campo].get(valor)
+                    if indice is None:
+                        indice = indices[campo][valor] = len(diccionarios[campo])
+                        diccionarios[campo].append(valor)
+                    valor = indice
+                columnas[campo].append(valor)
+        
+        return {
+            'cantidad': len(filas),
+            'columnas': columnas,
+            'diccionarios': diccionarios,
+        }
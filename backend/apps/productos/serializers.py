@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .precios import get_precio_producto
 from .models import Categoria, Subcategoria, Producto, ListaPrecio, Marca, Promocion, PromocionItem
 
 
@@ -65,11 +66,14 @@ class ProductoListSerializer(serializers.ModelSerializer):
         ]
     
     def get_precio(self, obj):
-        """Calcula el precio según la lista del usuario."""
+        """
+        Precio según la lista del usuario.
+        Usa `precio_lista` anotado desde PrecioLista (ver anotar_precio_lista).
+        """
         request = self.context.get('request')
         if request and hasattr(request, 'user') and request.user.is_authenticated:
             lista_precio = getattr(request.user, 'lista_precio', None)
-            return str(obj.get_precio_lista(lista_precio))
+            return str(get_precio_producto(obj, lista_precio))
         return str(obj.precio_base)
 
 
@@ -100,11 +104,14 @@ class ProductoDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'fecha_creacion', 'fecha_actualizacion']
     
     def get_precio(self, obj):
-        """Calcula el precio según la lista del usuario."""
+        """
+        Precio según la lista del usuario.
+        Usa `precio_lista` anotado desde PrecioLista (ver anotar_precio_lista).
+        """
         request = self.context.get('request')
         if request and hasattr(request, 'user') and request.user.is_authenticated:
             lista_precio = getattr(request.user, 'lista_precio', None)
-            return str(obj.get_precio_lista(lista_precio))
+            return str(get_precio_producto(obj, lista_precio))
         return str(obj.precio_base)
 
 
@@ -178,6 +185,22 @@ class ProductoCreateUpdateSerializer(serializers.ModelSerializer):
         return data
 
 
+class ProductoBarcodeBatchSerializer(serializers.Serializer):
+    """Códigos de barra escaneados a resolver en una sola consulta."""
+    
+    MAX_CODIGOS = 500
+    
+    codigos = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        allow_empty=False,
+        max_length=MAX_CODIGOS
+    )
+    
+    def validate_codigos(self, value):
+        """Descarta duplicados conservando el orden de escaneo."""
+        return list(dict.fromkeys(value))
+
+
 # ========== Promociones ==========
 
 class PromocionItemSerializer(serializers.ModelSerializer):
@@ -313,8 +336,9 @@ class PromocionCreateUpdateSerializer(serializers.ModelSerializer):
         items_data = validated_data.pop('items')
         promocion = Promocion.objects.create(**validated_data)
         
-        for item_data in items_data:
-            PromocionItem.objects.create(promocion=promocion, **item_data)
+        PromocionItem.objects.bulk_create(
+            PromocionItem(promocion=promocion, **item_data) for item_data in items_data
+        )
         
         return promocion
     
@@ -333,7 +357,8 @@ class PromocionCreateUpdateSerializer(serializers.ModelSerializer):
             instance.items.all().delete()
             
             # Crear nuevos items
-            for item_data in items_data:
-                PromocionItem.objects.create(promocion=instance, **item_data)
+            PromocionItem.objects.bulk_create(
+                PromocionItem(promocion=instance, **item_data) for item_data in items_data
+            )
         
         return instance
@@ -0,0 +1,41 @@
+"""
+Señales del catálogo de productos.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Producto, ProductoEliminado, ListaPrecio, Marca, Categoria, Subcategoria
+from .precios import actualizar_precios_producto, actualizar_precios_lista
+from .catalogo import invalidar_cache_catalogo
+
+
+@receiver(post_save, sender=Producto)
+def actualizar_precios_al_guardar_producto(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Mantiene PrecioLista al crear un producto o cambiar su precio base."""
+    if raw or (update_fields is not None and 'precio_base' not in update_fields):
+        return
+    actualizar_precios_producto(instance)
+
+
+@receiver(post_save, sender=ListaPrecio)
+def actualizar_precios_al_guardar_lista(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Mantiene PrecioLista al crear una lista o cambiar su descuento."""
+    if raw or (update_fields is not None and 'descuento_porcentaje' not in update_fields):
+        return
+    actualizar_precios_lista(instance)
+
+
+@receiver(post_delete, sender=Producto)
+def registrar_producto_eliminado(sender, instance, **kwargs):
+    """Guarda el ID del producto borrado físicamente para la sincronización."""
+    ProductoEliminado.objects.create(producto_id=instance.id)
+
+
+@receiver([post_save, post_delete], sender=Producto)
+@receiver([post_save, post_delete], sender=Marca)
+@receiver([post_save, post_delete], sender=Categoria)
+@receiver([post_save, post_delete], sender=Subcategoria)
+@receiver([post_save, post_delete], sender=ListaPrecio)
+def invalidar_catalogo(sender, **kwargs):
+    """Cualquier cambio en el catálogo descarta los listados cacheados."""
+    invalidar_cache_catalogo()
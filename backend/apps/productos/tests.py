@@ -0,0 +1,169 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.core.pagination import KeysetPagination
+from apps.core.testing import PresupuestoConsultasMixin
+from apps.users.models import CustomUser
+from .models import ListaPrecio, Marca, Categoria, Subcategoria, Producto, Promocion, PromocionItem
+
+
+class ProductosPresupuestoTests(PresupuestoConsultasMixin, APITestCase):
+    """
+    Presupuesto de consultas de los listados y detalles de productos.
+
+    Cada listado tiene más filas que su presupuesto: una consulta por fila
+    (N+1) lo excede.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(10):
+            ListaPrecio.objects.create(
+                nombre=f'Lista {i}', codigo=f'L{i}', descuento_porcentaje=Decimal(i)
+            )
+        cls.lista = ListaPrecio.objects.create(
+            nombre='Mayorista', codigo='MAY', descuento_porcentaje=Decimal('10')
+        )
+        cls.admin = CustomUser.objects.create_user(
+            'admin@test.com', 'clave', nombre='Ana', apellido='Admin', rol='admin'
+        )
+        cls.cliente = CustomUser.objects.create_user(
+            'cliente@test.com', 'clave', nombre='Carlos', apellido='Cliente',
+            rol='cliente', lista_precio=cls.lista
+        )
+
+        cls.productos = []
+        for i in range(6):
+            marca = Marca.objects.create(nombre=f'Marca {i}')
+            categoria = Categoria.objects.create(nombre=f'Categoría {i}')
+            subcategoria = Subcategoria.objects.create(nombre=f'Subcategoría {i}', categoria=categoria)
+            for j in range(4):
+                cls.productos.append(Producto.objects.create(
+                    codigo_barra=f'7790{i}{j:03d}',
+                    nombre=f'Galletitas {i}-{j}',
+                    marca=marca,
+                    categoria=categoria,
+                    subcategoria=subcategoria,
+                    precio_base=Decimal('100.00') + j,
+                ))
+
+        for i in range(16):
+            promocion = Promocion.objects.create(nombre=f'Combo {i}', precio=Decimal('250'))
+            for producto in cls.productos[i:i + 3]:
+                PromocionItem.objects.create(promocion=promocion, producto=producto, cantidad=2)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_listado_productos(self):
+        for user in (self.admin, self.cliente):
+            with self.subTest(rol=user.rol):
+                self.autenticar(user)
+                response = self.client.get('/api/productos/')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()), len(self.productos))
+                self.assertDentroDelPresupuesto(response)
+
+    def test_detalle_producto(self):
+        self.autenticar(self.cliente)
+        response = self.client.get(f'/api/productos/{self.productos[0].id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertDentroDelPresupuesto(response)
+
+    def test_sync_productos(self):
+        self.autenticar(self.cliente)
+        response = self.client.get('/api/productos/sync/')
+        self.assertEqual(response.status_code, 200)
+        self.assertDentroDelPresupuesto(response)
+
+    def test_autocompletar(self):
+        self.autenticar(self.cliente)
+        response = self.client.get('/api/productos/autocompletar/', {'q': 'gal'})
+        self.assertEqual(response.status_code, 200)
+        self.assertDentroDelPresupuesto(response)
+
+    def test_listado_promociones(self):
+        for url in ('/api/productos/promociones/', '/api/productos/promociones/activas/'):
+            with self.subTest(url=url):
+                self.autenticar(self.cliente)
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertDentroDelPresupuesto(response)
+
+    def test_detalle_promocion(self):
+        promocion = Promocion.objects.first()
+        self.autenticar(self.cliente)
+        response = self.client.get(f'/api/productos/promociones/{promocion.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertDentroDelPresupuesto(response)
+
+    def test_listados_catalogo(self):
+        urls = (
+            '/api/productos/marcas/',
+            '/api/productos/categorias/',
+            '/api/productos/subcategorias/',
+            '/api/productos/listas-precios/',
+        )
+        self.autenticar(self.admin)
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertDentroDelPresupuesto(response)
+
+
+@mock.patch.object(KeysetPagination, 'page_size', 5)
+class PaginacionCursorTests(APITestCase):
+    """`?paginacion=cursor` en el listado de productos de un admin."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user(
+            'admin@test.com', 'clave', nombre='Ana', apellido='Admin', rol='admin'
+        )
+        marca = Marca.objects.create(nombre='Marca')
+        categoria = Categoria.objects.create(nombre='Categoría')
+        ayer = timezone.now() - timedelta(days=1)
+        # (activo, fecha_eliminacion): nombres repetidos en cada grupo para desempatar por id
+        estados = [(True, None), (False, None), (False, ayer), (False, ayer - timedelta(days=1))]
+        cls.productos = [
+            Producto.objects.create(
+                codigo_barra=f'77901{i:03d}', nombre=f'Producto {i % 3}', marca=marca,
+                categoria=categoria, precio_base=Decimal('100'),
+                activo=estados[i % len(estados)][0],
+                fecha_eliminacion=estados[i % len(estados)][1],
+            )
+            for i in range(17)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_recorre_todo_en_orden(self):
+        """
+        Orden `-activo, fecha_eliminacion, nombre, id` con los NULL de
+        fecha_eliminacion al final (como PostgreSQL, también en SQLite).
+        """
+        ahora = timezone.now()
+        esperado = [
+            producto.id for producto in sorted(self.productos, key=lambda p: (
+                not p.activo, p.fecha_eliminacion is None, p.fecha_eliminacion or ahora,
+                p.nombre, p.id
+            ))
+        ]
+
+        self.client.force_authenticate(self.admin)
+        ids, url = [], '/api/productos/?paginacion=cursor'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 5)
+            ids += [producto['id'] for producto in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(ids, esperado)
@@ -7,6 +7,10 @@ from .views import (
     SubcategoriaListCreateView,
     SubcategoriaDetailView,
     ProductoListCreateView,
+    ProductoSyncView,
+    ProductoBarcodeView,
+    ProductoBarcodeBatchView,
+    AutocompletarView,
     ProductoDetailView,
     PromocionListCreateView,
     PromocionDetailView,
@@ -41,5 +45,9 @@ urlpatterns = [
     
     # Productos
     path('', ProductoListCreateView.as_view(), name='producto_list_create'),
+    path('sync/', ProductoSyncView.as_view(), name='producto_sync'),
+    path('barcode/batch/', ProductoBarcodeBatchView.as_view(), name='producto_barcode_batch'),
+    path('autocompletar/', AutocompletarView.as_view(), name='producto_autocompletar'),
+    path('barcode/<str:codigo>/', ProductoBarcodeView.as_view(), name='producto_barcode'),
     path('<int:pk>/', ProductoDetailView.as_view(), name='producto_detail'),
 ]
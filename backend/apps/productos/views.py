@@ -1,18 +1,42 @@
 from rest_framework import generics, filters
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework import status
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
 import logging
 
 from apps.users.permissions import IsAdmin, IsAdminOrVendedor
-from apps.core.mixins import SoftDeleteMixin
-from .models import Categoria, Subcategoria, Producto, Marca, Promocion
+from apps.core.mixins import SoftDeleteMixin, StreamingListMixin
+from apps.core.pagination import KeysetPagination
+from apps.users.models import CustomUser
+from apps.users.serializers import ClienteAutocompletarSerializer
+from .models import Categoria, Subcategoria, Producto, Marca, Promocion, ProductoEliminado
+from .precios import anotar_precio_lista
+from .renderers import CatalogoColumnarRenderer
+from .busqueda import ProductoSearchFilter, buscar_productos, tokenizar
+from .catalogo import (
+    get_etag_catalogo,
+    get_catalogo_cacheado,
+    set_catalogo_cacheado,
+    codificar_cursor,
+    decodificar_cursor,
+    CursorInvalidoError,
+    SYNC_MARGEN,
+)
 from .serializers import (
     CategoriaSerializer,
     SubcategoriaSerializer,
     ProductoListSerializer,
     ProductoDetailSerializer,
     ProductoCreateUpdateSerializer,
+    ProductoBarcodeBatchSerializer,
     MarcaSerializer,
     PromocionListSerializer,
     PromocionDetailSerializer,
@@ -31,6 +55,7 @@ class MarcaListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = MarcaSerializer
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 5
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['activo']
     search_fields = ['nombre']
@@ -57,6 +82,7 @@ class MarcaDetailView(SoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Marca.objects.all()
     serializer_class = MarcaSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    presupuesto_consultas = 8
     
     def get_reference_checks(self, instance):
         """Define las relaciones a verificar para soft delete."""
@@ -74,6 +100,7 @@ class CategoriaListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = CategoriaSerializer
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 5
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['activo']
     
@@ -100,6 +127,7 @@ class CategoriaDetailView(SoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView
     queryset = Categoria.objects.all()
     serializer_class = CategoriaSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    presupuesto_consultas = 8
     
     def get_reference_checks(self, instance):
         """Define las relaciones a verificar para soft delete."""
@@ -118,6 +146,7 @@ class SubcategoriaListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = SubcategoriaSerializer
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 5
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['categoria', 'activo']
     
@@ -144,6 +173,7 @@ class SubcategoriaDetailView(SoftDeleteMixin, generics.RetrieveUpdateDestroyAPIV
     queryset = Subcategoria.objects.all()
     serializer_class = SubcategoriaSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    presupuesto_consultas = 8
     
     def get_reference_checks(self, instance):
         """Define las relaciones a verificar para soft delete."""
@@ -154,7 +184,7 @@ class SubcategoriaDetailView(SoftDeleteMixin, generics.RetrieveUpdateDestroyAPIV
 
 # ========== Productos ==========
 
-class ProductoListCreateView(generics.ListCreateAPIView):
+class ProductoListCreateView(StreamingListMixin, generics.ListCreateAPIView):
     """
     Vista para listar y crear productos.
     GET/POST /api/productos/
@@ -164,28 +194,97 @@ class ProductoListCreateView(generics.ListCreateAPIView):
     - categoria: ID de categoría
     - subcategoria: ID de subcategoría
     - tiene_stock: filtrar por disponibilidad (true/false)
-    - search: búsqueda por nombre o código de barra
+    - search: búsqueda por nombre, código de barra o descripción (índice de texto
+      completo, por prefijo de palabra, sin acentos y ordenada por relevancia)
+    - stream=true: genera la respuesta en streaming (sin usar la caché)
+    - format=columnar: devuelve un array por campo con los nombres repetidos
+      codificados con diccionario (ver CatalogoColumnarRenderer)
+    - paginacion=cursor: pagina por keyset en lugar de devolver todo
+    
+    El listado responde con ETag: si el cliente envía If-None-Match con la
+    versión vigente se retorna 304 sin volver a serializar el catálogo.
     """
     queryset = Producto.objects.select_related('marca', 'categoria', 'subcategoria')
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    presupuesto_consultas = 13
+    # La búsqueda va después de OrderingFilter para poder ordenar por relevancia
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, ProductoSearchFilter]
     filterset_fields = ['marca', 'categoria', 'subcategoria', 'activo', 'tiene_stock']
     search_fields = ['nombre', 'codigo_barra', 'descripcion'] 
     ordering_fields = ['nombre', 'codigo_barra', 'tiene_stock'] 
-    ordering = ['-activo', 'fecha_eliminacion', 'nombre']
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [CatalogoColumnarRenderer]
+    pagination_class = KeysetPagination
+    
+    @property
+    def ordering(self):
+        """
+        Orden por defecto: activos y no eliminados primero (índice producto_lista_idx).
+        Los no admin solo ven productos activos y no eliminados, así que basta
+        ordenar por nombre (índice parcial producto_catalogo_idx).
+        """
+        if self.request.user.is_admin():
+            return ['-activo', 'fecha_eliminacion', 'nombre']
+        return ['nombre']
+    
+    @property
+    def keyset_ordering(self):
+        """Orden de la paginación por cursor (el default más el id para desempatar)."""
+        return [*self.ordering, 'id']
     
     def paginate_queryset(self, queryset):
-        """Desactiva la paginación completamente para este endpoint."""
-        return None
+        """Sin paginación, salvo que se pida paginación por cursor."""
+        if not self.paginator.usa_keyset(self.request):
+            return None
+        return super().paginate_queryset(queryset)
     
     def list(self, request, *args, **kwargs):
         """
         Sobrescribe list() para devolver todos los resultados sin paginar.
         Cuando paginate_queryset retorna None, DRF devuelve un array directo.
+        
+        Si el ETag enviado en If-None-Match coincide con la versión actual del
+        catálogo, retorna 304 sin ejecutar el queryset ni el serializer.
+        Si no, sirve el JSON ya renderizado desde la caché cuando existe.
         """
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        etag = get_etag_catalogo(request)
+        renderer = request.accepted_renderer
+        if self._etag_coincide(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif not isinstance(renderer, JSONRenderer):
+            # API navegable de DRF: render estándar, sin caché
+            queryset = self.filter_queryset(self.get_queryset())
+            response = Response(self.get_serializer(queryset, many=True).data)
+        elif self.paginator.usa_keyset(request):
+            page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        elif self.quiere_stream() and renderer.format == 'json':
+            response = self.stream_response(self.filter_queryset(self.get_queryset()))
+        else:
+            # El ETag incluye los parámetros (también `format`), así que JSON y
+            # columnar se cachean por separado
+            contenido = get_catalogo_cacheado(etag)
+            if contenido is None:
+                queryset = self.filter_queryset(self.get_queryset())
+                serializer = self.get_serializer(queryset, many=True)
+                contenido = renderer.render(serializer.data)
+                set_catalogo_cacheado(etag, contenido)
+            response = HttpResponse(contenido, content_type=renderer.media_type)
+        
+        response['ETag'] = etag
+        # El cliente puede guardar la respuesta pero debe revalidarla siempre
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
+    
+    def _etag_coincide(self, request, etag):
+        """Verifica si If-None-Match contiene el ETag actual (comparación débil)."""
+        if_none_match = request.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        etags = parse_etags(if_none_match)
+        if '*' in etags:
+            return True
+        return any(e.removeprefix('W/') == etag for e in etags)
     
     def get_serializer_class(self):
         """Usa serializer ligero para listado, completo para creación."""
@@ -201,7 +300,10 @@ class ProductoListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         """Filtra productos según parámetros."""
-        queryset = super().get_queryset()
+        queryset = anotar_precio_lista(
+            super().get_queryset(),
+            getattr(self.request.user, 'lista_precio', None)
+        )
         
         # Filtrar solo activos y no eliminados (a menos que sea admin)
         if not self.request.user.is_admin():
@@ -234,6 +336,246 @@ class ProductoListCreateView(generics.ListCreateAPIView):
         return [IsAuthenticated()]
 
 
+class ProductoSyncView(generics.GenericAPIView):
+    """
+    Vista para sincronización incremental del catálogo.
+    GET /api/productos/sync/?since=<cursor>
+    
+    Sin `since` devuelve el catálogo completo. Con `since` devuelve solo los
+    productos creados o modificados desde el cursor (incluye cambios en su
+    marca, categoría o subcategoría) y las bajas ocurridas en ese período.
+    
+    Respuesta:
+    {
+        "cursor": "...",        # usar como `since` en la próxima llamada
+        "completo": false,      # true si el cliente debe reemplazar todo su catálogo
+        "productos": [...],     # altas y modificaciones (ProductoListSerializer)
+        "eliminados": [1, 2]    # IDs a quitar del catálogo local
+    }
+    """
+    serializer_class = ProductoListSerializer
+    permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 5
+    
+    def get_queryset(self):
+        queryset = Producto.objects.select_related('marca', 'categoria', 'subcategoria').order_by('id')
+        return anotar_precio_lista(queryset, getattr(self.request.user, 'lista_precio', None))
+    
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        lista_precio = getattr(user, 'lista_precio', None)
+        # El cursor se toma antes de consultar para no perder cambios concurrentes
+        ahora = timezone.now()
+        
+        since = request.query_params.get('since')
+        desde = None
+        if since:
+            try:
+                desde, lista_id = decodificar_cursor(since)
+            except CursorInvalidoError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Si cambió la lista del usuario (o su descuento) cambian todos los precios
+            lista_actual_id = lista_precio.id if lista_precio else 0
+            if lista_id != lista_actual_id or (
+                lista_precio and lista_precio.fecha_actualizacion >= desde - SYNC_MARGEN
+            ):
+                desde = None
+        
+        queryset = self.get_queryset()
+        eliminados = []
+        
+        if desde is None:
+            if not user.is_admin():
+                queryset = queryset.filter(activo=True, fecha_eliminacion__isnull=True)
+        else:
+            corte = desde - SYNC_MARGEN
+            queryset = queryset.filter(
+                Q(fecha_actualizacion__gte=corte) |
+                Q(marca__fecha_actualizacion__gte=corte) |
+                Q(categoria__fecha_actualizacion__gte=corte) |
+                Q(subcategoria__fecha_actualizacion__gte=corte)
+            )
+            
+            if not user.is_admin():
+                # Productos desactivados o soft-deleted se informan como bajas
+                bajas = Q(activo=False) | Q(fecha_eliminacion__isnull=False)
+                eliminados = list(queryset.filter(bajas).values_list('id', flat=True))
+                queryset = queryset.exclude(bajas)
+            
+            # Borrados físicos
+            eliminados += list(
+                ProductoEliminado.objects.filter(
+                    fecha_eliminacion__gte=corte
+                ).values_list('producto_id', flat=True).distinct()
+            )
+        
+        serializer = self.get_serializer(queryset, many=True)
+        return Response({
+            'cursor': codificar_cursor(ahora, lista_precio),
+            'completo': desde is None,
+            'productos': serializer.data,
+            'eliminados': sorted(set(eliminados)),
+        })
+
+
+class ProductoPrecioListaMixin:
+    """Productos visibles para el usuario, con el precio de su lista anotado."""
+    serializer_class = ProductoListSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = anotar_precio_lista(
+            Producto.objects.select_related('marca', 'categoria', 'subcategoria'),
+            getattr(self.request.user, 'lista_precio', None)
+        )
+        if not self.request.user.is_admin():
+            queryset = queryset.filter(activo=True, fecha_eliminacion__isnull=True)
+        return queryset
+    
+    def get_serializer_context(self):
+        """Pasa el request al serializer para calcular precios."""
+        context = super().get_serializer_context()
+        context['request'] = self.request
+        return context
+
+
+class ProductoBarcodeView(ProductoPrecioListaMixin, generics.RetrieveAPIView):
+    """
+    Vista para buscar un producto por código de barra.
+    GET /api/productos/barcode/{codigo}/
+    
+    Usa el índice único de `codigo_barra`. Retorna 404 si no existe
+    (o si está inactivo, para usuarios que no son admin).
+    """
+    presupuesto_consultas = 5
+    lookup_field = 'codigo_barra'
+    lookup_url_kwarg = 'codigo'
+
+
+class ProductoBarcodeBatchView(ProductoPrecioListaMixin, generics.GenericAPIView):
+    """
+    Vista para resolver varios códigos de barra en una sola consulta.
+    POST /api/productos/barcode/batch/
+    
+    Body:
+    {
+        "codigos": ["7790001", "7790002", ...]   # máximo 500
+    }
+    
+    Respuesta:
+    {
+        "productos": [...],           # en el orden de escaneo (ProductoListSerializer)
+        "no_encontrados": ["..."]     # códigos sin producto
+    }
+    """
+    presupuesto_consultas = 5
+    
+    def post(self, request, *args, **kwargs):
+        entrada = ProductoBarcodeBatchSerializer(data=request.data)
+        entrada.is_valid(raise_exception=True)
+        codigos = entrada.validated_data['codigos']
+        
+        por_codigo = {
+            producto.codigo_barra: producto
+            for producto in self.get_queryset().filter(codigo_barra__in=codigos)
+        }
+        encontrados = [por_codigo[codigo] for codigo in codigos if codigo in por_codigo]
+        
+        serializer = self.get_serializer(encontrados, many=True)
+        return Response({
+            'productos': serializer.data,
+            'no_encontrados': [codigo for codigo in codigos if codigo not in por_codigo],
+        })
+
+
+class AutocompletarView(ProductoPrecioListaMixin, generics.GenericAPIView):
+    """
+    Vista de autocompletado (typeahead) de productos y clientes.
+    GET /api/productos/autocompletar/?q=<texto>
+    
+    Parámetros:
+    - q: texto ingresado
+    - tipo: 'productos' o 'clientes' (por defecto ambos)
+    - limite: cantidad máxima por tipo (por defecto 10, máximo 25)
+    
+    Productos: primero los que empiezan con el texto (nombre o código de barra,
+    por índices de prefijo; el de código es el `_like` del campo unique),
+    completando con coincidencias por prefijo de palabra del índice de texto
+    completo. Clientes (solo admin y vendedor): cada palabra debe ser prefijo
+    del nombre, apellido o CUIT/DNI.
+    
+    Respuesta:
+    {
+        "productos": [...],   # ProductoListSerializer
+        "clientes": [...]     # ClienteAutocompletarSerializer
+    }
+    """
+    presupuesto_consultas = 7
+    LIMITE_DEFECTO = 10
+    LIMITE_MAXIMO = 25
+    
+    def get(self, request, *args, **kwargs):
+        termino = request.query_params.get('q', '').strip()
+        tipo = request.query_params.get('tipo')
+        limite = self.get_limite()
+        
+        productos = []
+        clientes = []
+        if termino:
+            if tipo in (None, 'productos'):
+                productos = self.buscar_productos(termino, limite)
+            if tipo in (None, 'clientes') and (request.user.is_admin() or request.user.is_vendedor()):
+                clientes = self.buscar_clientes(termino, limite)
+        
+        return Response({
+            'productos': self.get_serializer(productos, many=True).data,
+            'clientes': ClienteAutocompletarSerializer(clientes, many=True).data,
+        })
+    
+    def get_limite(self):
+        try:
+            limite = int(self.request.query_params.get('limite', self.LIMITE_DEFECTO))
+        except ValueError:
+            return self.LIMITE_DEFECTO
+        return max(1, min(limite, self.LIMITE_MAXIMO))
+    
+    def buscar_productos(self, termino, limite):
+        """Coincidencias por prefijo del nombre/código y luego por prefijo de palabra."""
+        queryset = self.get_queryset()
+        productos = list(
+            queryset.filter(
+                Q(nombre__istartswith=termino) | Q(codigo_barra__startswith=termino)
+            ).order_by('-activo', 'nombre', 'id')[:limite]
+        )
+        if len(productos) >= limite:
+            return productos
+        
+        if not tokenizar(termino):
+            return productos
+        
+        restantes = queryset.exclude(id__in=[producto.id for producto in productos])
+        por_palabra = buscar_productos(restantes, termino)
+        if por_palabra is None:
+            por_palabra = restantes.filter(nombre__icontains=termino).order_by('-activo', 'nombre', 'id')
+        else:
+            por_palabra = por_palabra.order_by('-activo', '-rango_busqueda', 'nombre', 'id')
+        return productos + list(por_palabra[:limite - len(productos)])
+    
+    def buscar_clientes(self, termino, limite):
+        """Clientes activos donde cada palabra es prefijo de nombre, apellido o CUIT/DNI."""
+        queryset = CustomUser.objects.filter(
+            rol='cliente', is_active=True, fecha_eliminacion__isnull=True
+        ).select_related('zona')
+        for palabra in termino.split():
+            queryset = queryset.filter(
+                Q(nombre__istartswith=palabra) |
+                Q(apellido__istartswith=palabra) |
+                Q(cuit_dni__startswith=palabra)
+            )
+        return list(queryset.order_by('nombre', 'apellido', 'id')[:limite])
+
+
 class ProductoDetailView(SoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Vista para obtener, actualizar y eliminar producto.
@@ -241,6 +583,14 @@ class ProductoDetailView(SoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView)
     """
     queryset = Producto.objects.select_related('marca', 'categoria', 'subcategoria')
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 10
+    
+    def get_queryset(self):
+        """Anota el precio de la lista del usuario para GET."""
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            queryset = anotar_precio_lista(queryset, getattr(self.request.user, 'lista_precio', None))
+        return queryset
     
     def get_serializer_class(self):
         """Usa serializer de detalle para GET, de creación/actualización para PUT."""
@@ -281,6 +631,7 @@ class PromocionListCreateView(generics.ListCreateAPIView):
     Admin y vendedor pueden crear promociones.
     """
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 15
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['activo']
     search_fields = ['nombre', 'descripcion']
@@ -321,7 +672,8 @@ class PromocionListCreateView(generics.ListCreateAPIView):
             f'Promoción "{instance.nombre}" creada por usuario {request.user.email}'
         )
         
-        # Retornar con serializer de detalle
+        # Retornar con serializer de detalle (items precargados)
+        instance = Promocion.objects.prefetch_related('items__producto').get(pk=instance.pk)
         return Response(
             PromocionDetailSerializer(instance).data,
             status=201
@@ -335,6 +687,7 @@ class PromocionDetailView(SoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView
     """
     queryset = Promocion.objects.prefetch_related('items__producto')
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 15
     
     def get_serializer_class(self):
         """Usa serializer de detalle para GET, de actualización para PUT."""
@@ -367,6 +720,8 @@ class PromocionDetailView(SoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView
             f'Promoción "{instance.nombre}" actualizada por usuario {request.user.email}'
         )
         
+        # Recargar: los items precargados por get_object() pueden haber cambiado
+        instance = Promocion.objects.prefetch_related('items__producto').get(pk=instance.pk)
         return Response(PromocionDetailSerializer(instance).data)
 
 
@@ -383,6 +738,7 @@ class PromocionActivasView(generics.ListAPIView):
     """
     serializer_class = PromocionListSerializer
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 5
     
     def get_queryset(self):
         """Retorna solo promociones activas y vigentes."""
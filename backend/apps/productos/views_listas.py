@@ -19,6 +19,7 @@ class ListaPrecioListCreateView(generics.ListCreateAPIView):
     queryset = ListaPrecio.objects.all()
     serializer_class = ListaPrecioSerializer
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 9
     filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
     filterset_fields = ['activo']
     search_fields = ['nombre', 'codigo']
@@ -60,6 +61,7 @@ class ListaPrecioDetailView(SoftDeleteMixin, generics.RetrieveUpdateDestroyAPIVi
     queryset = ListaPrecio.objects.all()
     serializer_class = ListaPrecioSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    presupuesto_consultas = 10
     
     def get_reference_checks(self, instance):
         """Define las relaciones a verificar para soft delete."""
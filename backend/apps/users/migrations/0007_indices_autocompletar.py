@@ -0,0 +1,41 @@
+# Índices de prefijo para el autocompletado de clientes (ver AutocompletarView)
+
+from django.db import migrations
+
+# Parciales sobre rol = 'cliente': el autocompletado solo busca clientes.
+# text_pattern_ops/varchar_pattern_ops permiten usar el índice en LIKE 'x%'
+# aunque la base no use intercalación C.
+INDICES = [
+    ('cliente_nombre_prefijo', 'UPPER(nombre::text) text_pattern_ops'),
+    ('cliente_apellido_prefijo', 'UPPER(apellido::text) text_pattern_ops'),
+    ('cliente_cuit_dni_prefijo', 'cuit_dni varchar_pattern_ops'),
+]
+
+
+def crear_indices(apps, schema_editor):
+    """Solo PostgreSQL (en SQLite LIKE con ESCAPE no usa índices)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    tabla = apps.get_model('users', 'CustomUser')._meta.db_table
+    for nombre, expresion in INDICES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({expresion}) WHERE rol = 'cliente'"
+        )
+
+
+def eliminar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nombre, _ in INDICES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {nombre}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_alter_customuser_rol'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
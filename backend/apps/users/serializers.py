@@ -90,6 +90,21 @@ class UserSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class ClienteAutocompletarSerializer(serializers.ModelSerializer):
+    """Serializer mínimo de cliente para el autocompletado."""
+    
+    full_name = serializers.ReadOnlyField()
+    zona_nombre = serializers.CharField(source='zona.nombre', read_only=True, allow_null=True)
+    
+    class Meta:
+        model = CustomUser
+        fields = [
+            'id', 'nombre', 'apellido', 'full_name', 'cuit_dni',
+            'zona', 'zona_nombre', 'lista_precio'
+        ]
+        read_only_fields = fields
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     """Serializer para crear usuarios (admin o vendedor para clientes)."""
     
@@ -243,8 +258,9 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         if horarios_data is not None and instance.rol == 'cliente':
             # Eliminar horarios existentes y crear nuevos
             instance.horarios.all().delete()
-            for horario_data in horarios_data:
-                HorarioCliente.objects.create(cliente=instance, **horario_data)
+            HorarioCliente.objects.bulk_create([
+                HorarioCliente(cliente=instance, **horario_data) for horario_data in horarios_data
+            ])
         
         return instance
 
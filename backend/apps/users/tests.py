@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+from rest_framework.test import APITestCase
+
+from apps.core.testing import PresupuestoConsultasMixin
+from apps.productos.models import ListaPrecio
+from .models import CustomUser, Zona
+
+
+class UsersPresupuestoTests(PresupuestoConsultasMixin, APITestCase):
+    """
+    Presupuesto de consultas de los listados y detalles de usuarios.
+
+    Los clientes tienen zona y lista de precios, y hay más usuarios y zonas
+    que el presupuesto de cada listado: una consulta por fila (N+1) lo excede.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user(
+            'admin@test.com', 'clave', nombre='Ana', apellido='Admin', rol='admin'
+        )
+        cls.vendedor = CustomUser.objects.create_user(
+            'vendedor@test.com', 'clave', nombre='Victor', apellido='Vendedor', rol='vendedor'
+        )
+        zonas = [Zona.objects.create(nombre=f'Zona {i}') for i in range(8)]
+        listas = [
+            ListaPrecio.objects.create(
+                nombre=f'Lista {i}', codigo=f'L{i}', descuento_porcentaje=Decimal(i)
+            )
+            for i in range(3)
+        ]
+        cls.clientes = [
+            CustomUser.objects.create_user(
+                f'cliente{i}@test.com', 'clave', nombre=f'Cliente {i}', apellido='Test',
+                rol='cliente', zona=zonas[i % len(zonas)], lista_precio=listas[i % len(listas)],
+                calle='San Martín', numero=str(100 + i), cuit_dni=f'2012345{i:03d}'
+            )
+            for i in range(15)
+        ]
+
+    def test_listado_usuarios(self):
+        for user in (self.admin, self.vendedor):
+            with self.subTest(rol=user.rol):
+                self.autenticar(user)
+                response = self.client.get('/api/auth/users/')
+                self.assertEqual(response.status_code, 200)
+                self.assertGreater(len(response.json()['results']), 10)
+                self.assertDentroDelPresupuesto(response)
+
+    def test_detalle_usuario(self):
+        self.autenticar(self.admin)
+        response = self.client.get(f'/api/auth/users/{self.clientes[0].id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertDentroDelPresupuesto(response)
+
+    def test_actualizar_usuario(self):
+        """PATCH de un cliente con horarios para toda la semana."""
+        horarios = [
+            {'dia_semana': dia, 'hora_desde': '08:00', 'hora_hasta': '12:00'}
+            for dia in range(7)
+        ]
+        self.autenticar(self.admin)
+        response = self.client.patch(
+            f'/api/auth/users/{self.clientes[0].id}/',
+            {'telefono': '1234', 'horarios': horarios},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['horarios']), 7)
+        self.assertDentroDelPresupuesto(response)
+
+    def test_eliminar_usuario(self):
+        self.autenticar(self.admin)
+        response = self.client.delete(f'/api/auth/users/{self.clientes[0].id}/')
+        self.assertIn(response.status_code, (200, 204))
+        self.assertDentroDelPresupuesto(response)
+
+    def test_me(self):
+        self.autenticar(self.clientes[0])
+        response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertDentroDelPresupuesto(response)
+
+    def test_listado_zonas(self):
+        self.autenticar(self.admin)
+        response = self.client.get('/api/auth/zonas/')
+        self.assertEqual(response.status_code, 200)
+        self.assertDentroDelPresupuesto(response)
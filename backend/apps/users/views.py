@@ -18,7 +18,9 @@ from .serializers import (
     HorarioClienteSerializer
 )
 from .permissions import IsAdmin
-from apps.core.mixins import SoftDeleteMixin
+from apps.core.mixins import SoftDeleteMixin, StreamingListMixin
+from apps.core.pagination import KeysetPagination
+from apps.core.middleware import presupuesto_consultas
 
 logger = logging.getLogger('eltetu')
 
@@ -33,6 +35,7 @@ class ZonaListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = ZonaSerializer
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 5
     
     def get_queryset(self):
         """Filtra zonas según el usuario."""
@@ -67,6 +70,7 @@ class ZonaDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Zona.objects.all()
     serializer_class = ZonaSerializer
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 6
     
     def get_permissions(self):
         """Solo admin puede modificar zonas."""
@@ -77,6 +81,7 @@ class ZonaDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # ========== Auth Views ==========
 
+@presupuesto_consultas(4)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login_view(request):
@@ -126,6 +131,7 @@ def login_view(request):
     })
 
 
+@presupuesto_consultas(4)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def me_view(request):
@@ -150,6 +156,7 @@ def me_view(request):
     return Response(serializer.data)
 
 
+@presupuesto_consultas(5)
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def update_profile_view(request):
@@ -175,6 +182,7 @@ def update_profile_view(request):
     return Response(serializer.data)
 
 
+@presupuesto_consultas(4)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def change_password_view(request):
@@ -209,14 +217,19 @@ def change_password_view(request):
     })
 
 
-class UserListCreateView(generics.ListCreateAPIView):
+class UserListCreateView(StreamingListMixin, generics.ListCreateAPIView):
     """
     Vista para listar y crear usuarios.
-    GET: Admin y vendedores pueden ver usuarios.
+    GET: Admin y vendedores pueden ver usuarios (`stream=true` para listado completo en streaming).
     POST: Admin puede crear cualquier usuario, vendedor solo puede crear clientes.
+    
+    Paginación por número de página o por cursor con `paginacion=cursor`.
     """
     queryset = CustomUser.objects.all()
     permission_classes = [IsAuthenticated]
+    presupuesto_consultas = 10
+    pagination_class = KeysetPagination
+    keyset_ordering = ['-is_active', 'fecha_eliminacion', 'nombre', 'apellido', 'id']
     
     def get_serializer_class(self):
         """Usa UserCreateSerializer para POST, UserSerializer para GET."""
@@ -255,7 +268,7 @@ class UserListCreateView(generics.ListCreateAPIView):
         - Vendedor: Solo puede ver clientes activos (filtro de rol aplicado automáticamente)
         """
         user = self.request.user
-        queryset = CustomUser.objects.all()
+        queryset = CustomUser.objects.select_related('zona', 'lista_precio').prefetch_related('horarios')
         
         # Si es vendedor, solo puede ver clientes activos
         if user.is_vendedor():
@@ -318,6 +331,10 @@ class UserDetailView(SoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     queryset = CustomUser.objects.all()
     permission_classes = [IsAuthenticated]
+    # El DELETE físico consulta cada tabla que referencia al usuario (horarios,
+    # claves de idempotencia, `eliminado_por` de cada modelo, etc.): su costo
+    # depende del esquema, no de la cantidad de filas
+    presupuesto_consultas = {'GET': 5, 'PUT': 8, 'PATCH': 8, 'DELETE': 20}
     
     def get_serializer_class(self):
         """Usa UserUpdateSerializer para PUT/PATCH, UserSerializer para GET."""
@@ -1,7 +1,10 @@
+from importlib.util import find_spec
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
 import dj_database_url
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -45,6 +48,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.middleware.PresupuestoConsultasMiddleware',  # X-DB-Queries / X-DB-Time
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Static files
     'corsheaders.middleware.CorsMiddleware',  # CORS
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -86,6 +90,38 @@ DATABASES = {
     'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600)
 }
 
+# Lookups de PostgreSQL (búsqueda por trigramas en productos)
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    INSTALLED_APPS.append('django.contrib.postgres')
+
+# Cache
+# Por defecto en memoria (por proceso). Con REDIS_URL se comparten entre workers
+# la caché y los eventos de pedidos (requiere el paquete `redis`).
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL and find_spec('redis') is None:
+    # Sin esto el error aparece recién en la primera consulta a la caché o al
+    # primer evento publicado, con el servidor ya atendiendo requests
+    raise ImproperlyConfigured(
+        'REDIS_URL está definida pero el paquete `redis` no está instalado '
+        '(pip install -r requirements.txt).'
+    )
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'eltetu',
+        }
+    }
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.CustomUser'
 
@@ -184,6 +220,17 @@ else:
         CORS_ALLOW_ALL_ORIGINS = False
 
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['X-DB-Queries', 'X-DB-Time']
+
+# Presupuesto de consultas por request (apps.core.middleware).
+# Cada vista define el suyo con `presupuesto_consultas`; este valor se usa
+# para las vistas que no lo definen.
+PRESUPUESTO_CONSULTAS_DEFECTO = config('PRESUPUESTO_CONSULTAS_DEFECTO', default=20, cast=int)
+
+# Segundos tras los cuales una Idempotency-Key que sigue "en proceso" se da por
+# abandonada (apps.pedidos.idempotencia): gunicorn ya mató al worker que la tomó.
+IDEMPOTENCIA_PENDIENTE_SEGUNDOS = config('GUNICORN_TIMEOUT', default=120, cast=int) + 30
 
 # Security settings for production
 if not DEBUG:
@@ -12,4 +12,9 @@ python init_users.py
 
 echo "=== Iniciando servidor ==="
 export PORT=${PORT:-8000}
+if [ "${SERVIDOR_ASGI:-false}" = "true" ]; then
+    # ASGI (uvicorn): habilita /api/pedidos/eventos/ (SSE).
+    # Con más de un worker, REDIS_URL es necesario para compartir los eventos.
+    exec gunicorn config.asgi:application -c gunicorn.conf.py -k uvicorn_worker.UvicornWorker
+fi
 exec gunicorn config.wsgi:application -c gunicorn.conf.py
@@ -15,6 +15,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
 from apps.productos.models import Marca, Categoria, Subcategoria, Producto
+from apps.productos.precios import recalcular_precios_listas
 
 
 def normalize_text(text):
@@ -329,6 +330,8 @@ def load_precios(excel_path):
         
         if cantidad_sin_precio > 0:
             productos_sin_precio.update(precio_base=Decimal('1'))
+            # update() no dispara señales: recalcular la tabla de precios por lista
+            recalcular_precios_listas()
             print(f"  [OK] {cantidad_sin_precio} productos recibieron precio_base = 1")
         else:
             print(f"  [OK] Todos los productos tienen precio asignado")
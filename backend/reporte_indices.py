@@ -0,0 +1,282 @@
+"""
+Reporte EXPLAIN de las consultas de listados antes y después de los índices
+de listados (pedidos 0011, 0012 y 0014, productos 0014).
+
+Para cada consulta muestra el plan:
+- Antes: la consulta como era (orden por la anotación Case/When de estado)
+  y sin los índices nuevos. Los índices se eliminan dentro de una transacción
+  que se revierte al terminar, así que la base queda como estaba.
+- Después: la consulta actual con los índices.
+
+NO EJECUTAR CONTRA PRODUCCIÓN. En PostgreSQL, DROP INDEX toma un lock ACCESS
+EXCLUSIVE sobre pedidos_pedido y productos_producto hasta el rollback: mientras
+se generan los planes (con --analyze, ejecutando cada consulta) se bloquean
+todas las lecturas y escrituras de esas tablas. Por eso el script solo corre con
+DEBUG=True o con --base-de-prueba.
+
+El repositorio no incluye un reporte generado: los planes sobre 1M de pedidos
+en PostgreSQL se obtienen corriendo el script en una base local o de staging.
+
+Uso:
+    python reporte_indices.py                      # reporte sobre los datos actuales
+    python reporte_indices.py --sembrar 1000000    # crea 1M pedidos de prueba antes
+    python reporte_indices.py --analyze --salida reporte.md
+    python reporte_indices.py --base-de-prueba     # con DEBUG=False (staging)
+
+--analyze ejecuta EXPLAIN ANALYZE (solo PostgreSQL). Sembrar pedidos es solo
+para bases de prueba: usa los clientes y transportadores existentes.
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import timedelta
+
+import django
+
+# Setup Django
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, When, IntegerField
+from django.utils import timezone
+
+from apps.core.fechas import rango_mes
+from apps.pedidos.models import Pedido
+from apps.productos.models import Producto
+from apps.users.models import CustomUser
+
+# Índices agregados para los listados
+INDICES_LISTADOS = [
+    'pedido_lista_idx',
+    'pedido_estado_lista_idx',
+    'pedido_cliente_lista_idx',
+    'pedido_transp_facturado_idx',
+    'pedido_fecha_creacion_idx',
+    'producto_lista_idx',
+    'producto_catalogo_idx',
+]
+
+PAGINA = 50
+
+
+class _Revertir(Exception):
+    """Fuerza el rollback de la transacción del plan "antes"."""
+
+
+def sembrar_pedidos(cantidad, lote=10000):
+    """Crea `cantidad` pedidos sin items, con estados y fechas al azar (últimos 2 años)."""
+    clientes = list(CustomUser.objects.filter(rol='cliente').values_list('id', flat=True))
+    transportadores = list(CustomUser.objects.filter(rol='transportador').values_list('id', flat=True))
+    if not clientes:
+        print("   ✗ No hay clientes: crear usuarios primero (python init_users.py)")
+        sys.exit(1)
+
+    estados = [estado for estado, _ in Pedido.ESTADO_CHOICES]
+    ahora = timezone.now()
+
+    # bulk_create respeta auto_now_add: se desactiva para guardar fechas al azar
+    campo_fecha = Pedido._meta.get_field('fecha_creacion')
+    campo_fecha.auto_now_add = False
+    try:
+        creados = 0
+        while creados < cantidad:
+            pedidos = []
+            for _ in range(min(lote, cantidad - creados)):
+                estado = random.choice(estados)
+                pedidos.append(Pedido(
+                    cliente_id=random.choice(clientes),
+                    transportador_id=(
+                        random.choice(transportadores)
+                        if transportadores and estado in ('FACTURADO', 'ENTREGADO') else None
+                    ),
+                    estado=estado,
+                    fecha_creacion=ahora - timedelta(seconds=random.randint(0, 2 * 365 * 24 * 3600)),
+                ))
+            Pedido.objects.bulk_create(pedidos)
+            creados += len(pedidos)
+            print(f"   → {creados} de {cantidad} pedidos creados")
+    finally:
+        campo_fecha.auto_now_add = True
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE pedidos_pedido')
+
+
+def _orden_estado_calculado():
+    """Anotación con la que se ordenaba el listado antes de persistir estado_orden."""
+    return Case(
+        *[When(estado=estado, then=orden) for estado, orden in Pedido.ORDEN_ESTADOS.items()],
+        default=len(Pedido.ORDEN_ESTADOS),
+        output_field=IntegerField()
+    )
+
+
+def get_consultas():
+    """Retorna [(título, queryset antes, queryset después)] de los listados más usados."""
+    cliente = CustomUser.objects.filter(rol='cliente').order_by('id').first()
+    transportador = CustomUser.objects.filter(rol='transportador').order_by('id').first()
+    pedidos_antes = Pedido.objects.annotate(orden_calculado=_orden_estado_calculado())
+    orden_antes = ('orden_calculado', '-fecha_creacion')
+    orden_despues = ('estado_orden', '-fecha_creacion', '-id')
+
+    consultas = [
+        (
+            'Listado de pedidos (admin/vendedor, primera página)',
+            pedidos_antes.order_by(*orden_antes)[:PAGINA],
+            Pedido.objects.order_by(*orden_despues)[:PAGINA],
+        ),
+        (
+            'Listado de pedidos filtrado por estado (ENTREGADO)',
+            pedidos_antes.filter(estado='ENTREGADO').order_by(*orden_antes)[:PAGINA],
+            Pedido.objects.filter(estado='ENTREGADO').order_by(*orden_despues)[:PAGINA],
+        ),
+    ]
+    inicio_mes, fin_mes = rango_mes()
+    consultas.append((
+        'Pedidos del mes (estadísticas del dashboard)',
+        Pedido.objects.filter(fecha_creacion__date__gte=timezone.localdate().replace(day=1)).order_by(),
+        Pedido.objects.filter(fecha_creacion__gte=inicio_mes, fecha_creacion__lt=fin_mes).order_by(),
+    ))
+    if cliente:
+        consultas.append((
+            f'Mis pedidos (cliente #{cliente.id})',
+            pedidos_antes.filter(cliente=cliente).order_by(*orden_antes)[:PAGINA],
+            Pedido.objects.filter(cliente=cliente).order_by(*orden_despues)[:PAGINA],
+        ))
+    if transportador:
+        entregas = Pedido.objects.filter(
+            transportador=transportador, estado='FACTURADO'
+        ).order_by('fecha_creacion')
+        consultas.append((f'Pedidos a entregar (transportador #{transportador.id})', entregas, entregas))
+
+    catalogo = Producto.objects.filter(activo=True, fecha_eliminacion__isnull=True)
+    consultas += [
+        (
+            'Catálogo de productos (cliente/vendedor)',
+            catalogo.order_by('-activo', 'fecha_eliminacion', 'nombre'),
+            catalogo.order_by('nombre', 'id'),
+        ),
+        (
+            'Listado de productos (admin)',
+            Producto.objects.order_by('-activo', 'fecha_eliminacion', 'nombre'),
+            Producto.objects.order_by('-activo', 'fecha_eliminacion', 'nombre'),
+        ),
+    ]
+    return consultas
+
+
+def _explain(queryset, analyze):
+    opciones = {'analyze': True, 'buffers': True} if analyze else {}
+    return queryset.explain(**opciones)
+
+
+def _planes_antes(consultas, analyze):
+    """
+    Planes sin los índices nuevos (se eliminan y se revierte la transacción).
+    Bloquea las tablas de pedidos y productos hasta el rollback.
+    """
+    planes = []
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for nombre in INDICES_LISTADOS:
+                    cursor.execute(f'DROP INDEX IF EXISTS "{nombre}"')
+            planes = [_explain(antes, analyze) for _, antes, _ in consultas]
+            raise _Revertir()
+    except _Revertir:
+        pass
+    return planes
+
+
+def generar_reporte(analyze=False):
+    """Genera el reporte en Markdown."""
+    if analyze and connection.vendor != 'postgresql':
+        print("   → EXPLAIN ANALYZE solo está disponible en PostgreSQL, se usa EXPLAIN")
+        analyze = False
+
+    consultas = get_consultas()
+    planes_antes = _planes_antes(consultas, analyze)
+    planes_despues = [_explain(despues, analyze) for _, _, despues in consultas]
+
+    lineas = [
+        '# Reporte de índices de listados',
+        '',
+        f'- Motor: {connection.vendor}',
+        f'- Pedidos: {Pedido.objects.count()}',
+        f'- Productos: {Producto.objects.count()}',
+        f'- EXPLAIN ANALYZE: {"sí" if analyze else "no"}',
+        '',
+    ]
+    for (titulo, antes, despues), plan_antes, plan_despues in zip(consultas, planes_antes, planes_despues):
+        lineas += [
+            f'## {titulo}',
+            '',
+            '### Antes',
+            '',
+            '```sql',
+            str(antes.query),
+            '```',
+            '',
+            '```',
+            plan_antes,
+            '```',
+            '',
+            '### Después',
+            '',
+            '```sql',
+            str(despues.query),
+            '```',
+            '',
+            '```',
+            plan_despues,
+            '```',
+            '',
+        ]
+    return '\n'.join(lineas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reporte EXPLAIN de los listados antes/después de los índices.')
+    parser.add_argument('--sembrar', type=int, default=0, help='Cantidad de pedidos de prueba a crear antes del reporte')
+    parser.add_argument('--analyze', action='store_true', help='Usar EXPLAIN ANALYZE (PostgreSQL)')
+    parser.add_argument('--salida', help='Archivo donde guardar el reporte (por defecto se imprime)')
+    parser.add_argument(
+        '--base-de-prueba', action='store_true',
+        help='Confirma que la base no es la de producción (necesario con DEBUG=False)'
+    )
+    args = parser.parse_args()
+
+    if not settings.DEBUG and not args.base_de_prueba:
+        print("   ✗ Con DEBUG=False el script no corre: elimina índices dentro de una transacción")
+        print("     y bloquea las tablas de pedidos y productos hasta terminar.")
+        print("     Nunca contra producción; en una base de prueba, agregar --base-de-prueba.")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("REPORTE DE ÍNDICES DE LISTADOS")
+    print("=" * 60)
+
+    if args.sembrar:
+        print(f"\n1. Sembrando {args.sembrar} pedidos...")
+        sembrar_pedidos(args.sembrar)
+
+    print("\n2. Generando planes...")
+    reporte = generar_reporte(analyze=args.analyze)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(reporte)
+        print(f"   ✓ Reporte guardado en {args.salida}")
+    else:
+        print()
+        print(reporte)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,12 @@
 import React from 'react';
 import { View, StyleSheet } from 'react-native';
 import { Card, Text, Chip, Divider } from 'react-native-paper';
-import { Pedido } from '@/types';
+import { PedidoResumen } from '@/types';
 import { colors, spacing, borderRadius, shadows } from '@/theme';
 import { formatPrice, formatDate } from '@/utils';
 
 interface PedidoCardProps {
-  pedido: Pedido;
+  pedido: PedidoResumen;
   onPress?: () => void;
 }
 
@@ -93,7 +93,7 @@ const PedidoCard: React.FC<PedidoCardProps> = ({ pedido, onPress }) => {
         <View style={styles.details}>
           <View style={styles.row}>
             <Text style={styles.label}>Items</Text>
-            <Text style={styles.value}>{pedido.items.length} producto{pedido.items.length !== 1 ? 's' : ''}</Text>
+            <Text style={styles.value}>{pedido.items_count} producto{pedido.items_count !== 1 ? 's' : ''}</Text>
           </View>
 
           <View style={styles.row}>
@@ -1,2 +1,3 @@
 export { useFetch } from './useFetch';
 export { usePaginatedFetch } from './usePaginatedFetch';
+export { usePedidoEventos } from './usePedidoEventos';
@@ -0,0 +1,47 @@
+import { useCallback, useRef } from 'react';
+import { useFocusEffect } from '@react-navigation/native';
+import { suscribirEventosPedidos } from '@/services/api';
+import { EventoPedido } from '@/types';
+
+/**
+ * Mientras la pantalla está enfocada escucha los eventos de pedidos
+ * (`/pedidos/eventos/`) y llama a `onCambio`, en lugar de volver a consultar
+ * el listado periódicamente.
+ *
+ * Los eventos que llegan juntos (ej: un cambio de estado en bloque) se agrupan
+ * en una sola llamada.
+ *
+ * @param onCambio - Se llama después de uno o más eventos (ej: refetch)
+ * @param filtro - Si se indica, solo cuentan los eventos para los que retorna true
+ *
+ * @example
+ * const { refetch } = useFetch(() => pedidosAPI.getEstadisticasVendedor());
+ * usePedidoEventos(refetch);
+ */
+export function usePedidoEventos(
+  onCambio: () => void,
+  filtro?: (evento: EventoPedido) => boolean,
+  esperaMs = 1000
+) {
+  const onCambioRef = useRef(onCambio);
+  const filtroRef = useRef(filtro);
+  onCambioRef.current = onCambio;
+  filtroRef.current = filtro;
+
+  useFocusEffect(
+    useCallback(() => {
+      let timer: ReturnType<typeof setTimeout> | null = null;
+
+      const cerrar = suscribirEventosPedidos((evento) => {
+        if (filtroRef.current && !filtroRef.current(evento)) return;
+        if (timer) clearTimeout(timer);
+        timer = setTimeout(() => onCambioRef.current(), esperaMs);
+      });
+
+      return () => {
+        if (timer) clearTimeout(timer);
+        cerrar();
+      };
+    }, [esperaMs])
+  );
+}
@@ -7,7 +7,7 @@ import { CompositeScreenProps } from '@react-navigation/native';
 import { NativeStackScreenProps } from '@react-navigation/native-stack';
 import { AdminDrawerParamList } from '@/navigation/AdminStack';
 import { AdminStackParamList } from '@/navigation/AdminStack';
-import { useFetch } from '@/hooks';
+import { useFetch, usePedidoEventos } from '@/hooks';
 import { pedidosAPI } from '@/services/api';
 import { LoadingOverlay, ScreenContainer } from '@/components';
 import { useAppSelector } from '@/store';
@@ -39,6 +39,9 @@ const AdminHomeScreen = ({ navigation }: Props) => {
     }, [])
   );
 
+  // Actualizar al crearse un pedido o cambiar su estado mientras la pantalla está abierta
+  usePedidoEventos(refetch);
+
   const stats = {
     totalUsuarios: estadisticas?.total_usuarios || 0,
     productosActivos: estadisticas?.productos_activos || 0,
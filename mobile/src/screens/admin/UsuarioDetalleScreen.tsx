@@ -7,7 +7,7 @@ import { useFetch } from '@/hooks';
 import { clientesAPI, pedidosAPI } from '@/services/api';
 import { LoadingOverlay, PedidoCard } from '@/components';
 import { colors, spacing, borderRadius } from '@/theme';
-import { Pedido } from '@/types';
+import { PedidoResumen } from '@/types';
 import Icon from 'react-native-vector-icons/MaterialCommunityIcons';
 
 type Props = NativeStackScreenProps<AdminStackParamList, 'UsuarioDetalle'>;
@@ -58,7 +58,7 @@ const UsuarioDetalleScreen = ({ route, navigation }: Props) => {
   );
 
   // Estado para pedidos (solo se cargan si es cliente)
-  const [pedidos, setPedidos] = useState<Pedido[]>([]);
+  const [pedidos, setPedidos] = useState<PedidoResumen[]>([]);
   const [loadingPedidos, setLoadingPedidos] = useState(false);
 
   // Cargar pedidos cuando el usuario esté cargado y sea cliente
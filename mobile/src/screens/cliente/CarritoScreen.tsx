@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { View, StyleSheet, FlatList, Alert } from 'react-native';
 import { Text, Button, Card, IconButton, Divider, Surface, Chip } from 'react-native-paper';
 import { NativeStackScreenProps } from '@react-navigation/native-stack';
@@ -12,7 +12,7 @@ import {
   clearCart
 } from '@/store/slices/cartSlice';
 import { pedidosAPI } from '@/services/api';
-import { CartItem, CreatePedidoItemData } from '@/types';
+import { CartItem, Cotizacion, CreatePedidoData, CreatePedidoItemData } from '@/types';
 import { LoadingOverlay, ScreenContainer, EmptyState } from '@/components';
 import { colors, spacing, borderRadius, shadows } from '@/theme';
 import { formatPrice } from '@/utils';
@@ -36,7 +36,61 @@ const CarritoScreen = ({ navigation }: Props) => {
 
   const [loading, setLoading] = useState(false);
 
-  const subtotal = items.reduce((acc, item) => {
+  // Clave de idempotencia del pedido en curso: se reutiliza si el usuario
+  // vuelve a confirmar tras un error de red, y se renueva si cambia el carrito
+  const idempotencyKeyRef = useRef<string | null>(null);
+  useEffect(() => {
+    idempotencyKeyRef.current = null;
+  }, [items]);
+
+  // Construir el pedido (productos y promociones) a partir del carrito
+  const buildPedidoData = (clienteId: number, listaPrecio?: number): CreatePedidoData => {
+    const pedidoItems: CreatePedidoItemData[] = items.map((item) => {
+      if (item.tipo === 'producto' && item.producto) {
+        return {
+          producto: item.producto.id,
+          cantidad: item.cantidad,
+        };
+      } else if (item.tipo === 'promocion' && item.promocion) {
+        return {
+          promocion: item.promocion.id,
+          cantidad: item.cantidad,
+        };
+      }
+      // Fallback (no debería ocurrir)
+      return { cantidad: item.cantidad };
+    });
+
+    return {
+      cliente: clienteId,
+      lista_precio: listaPrecio || 1,
+      items: pedidoItems,
+    };
+  };
+
+  // Cotización del servidor: precios vigentes de la lista del cliente.
+  // Mientras no llega (o si falla) se muestran los totales calculados localmente.
+  const [cotizacion, setCotizacion] = useState<Cotizacion | null>(null);
+  useEffect(() => {
+    setCotizacion(null);
+    if (!user || items.length === 0) return;
+
+    let cancelado = false;
+    const timeout = setTimeout(() => {
+      pedidosAPI
+        .cotizar(buildPedidoData(user.id, user.lista_precio))
+        .then((data) => {
+          if (!cancelado) setCotizacion(data);
+        })
+        .catch(() => {});
+    }, 400);
+    return () => {
+      cancelado = true;
+      clearTimeout(timeout);
+    };
+  }, [items, user]);
+
+  const subtotalLocal = items.reduce((acc, item) => {
     let precio = 0;
     if (item.tipo === 'producto' && item.producto) {
       precio = parseFloat(item.producto.precio);
@@ -47,7 +101,8 @@ const CarritoScreen = ({ navigation }: Props) => {
     return acc + (precio * item.cantidad);
   }, 0);
 
-  const total = subtotal;
+  const subtotal = cotizacion ? parseFloat(cotizacion.subtotal) : subtotalLocal;
+  const total = cotizacion ? parseFloat(cotizacion.total) : subtotalLocal;
 
   // Handlers para productos
   const handleIncrement = (productoId: number, currentQty: number) => {
@@ -119,30 +174,12 @@ const CarritoScreen = ({ navigation }: Props) => {
     try {
       setLoading(true);
 
-      // Construir items para el pedido (productos y promociones)
-      const pedidoItems: CreatePedidoItemData[] = items.map((item) => {
-        if (item.tipo === 'producto' && item.producto) {
-          return {
-            producto: item.producto.id,
-            cantidad: item.cantidad,
-          };
-        } else if (item.tipo === 'promocion' && item.promocion) {
-          return {
-            promocion: item.promocion.id,
-            cantidad: item.cantidad,
-          };
-        }
-        // Fallback (no debería ocurrir)
-        return { cantidad: item.cantidad };
-      });
-
-      const pedidoData = {
-        cliente: user.id,
-        lista_precio: user.lista_precio || 1,
-        items: pedidoItems,
-      };
-
-      const pedido = await pedidosAPI.create(pedidoData);
+      const pedidoData = buildPedidoData(user.id, user.lista_precio);
+
+      if (!idempotencyKeyRef.current) {
+        idempotencyKeyRef.current = `${user.id}-${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+      }
+      const pedido = await pedidosAPI.create(pedidoData, idempotencyKeyRef.current);
       dispatch(clearCart());
 
       Alert.alert(
@@ -5,7 +5,7 @@ import { useNavigation, useFocusEffect } from '@react-navigation/native';
 import { NativeStackNavigationProp } from '@react-navigation/native-stack';
 import { ClienteStackParamList } from '@/navigation/ClienteStack';
 import { pedidosAPI } from '@/services/api';
-import { Pedido } from '@/types';
+import { PedidoResumen } from '@/types';
 import { PedidoCard, LoadingOverlay, ScreenContainer, EmptyState } from '@/components';
 import { colors, spacing } from '@/theme';
 
@@ -18,7 +18,7 @@ type NavigationProp = NativeStackNavigationProp<ClienteStackParamList>;
  */
 const MisPedidosScreen = () => {
   const navigation = useNavigation<NavigationProp>();
-  const [pedidos, setPedidos] = useState<Pedido[]>([]);
+  const [pedidos, setPedidos] = useState<PedidoResumen[]>([]);
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
   const [error, setError] = useState<string | null>(null);
@@ -53,11 +53,11 @@ const MisPedidosScreen = () => {
     fetchPedidos();
   };
 
-  const handlePedidoPress = (pedido: Pedido) => {
+  const handlePedidoPress = (pedido: PedidoResumen) => {
     navigation.navigate('PedidoDetalle', { pedidoId: pedido.id });
   };
 
-  const renderPedido = ({ item }: { item: Pedido }) => (
+  const renderPedido = ({ item }: { item: PedidoResumen }) => (
     <PedidoCard pedido={item} onPress={() => handlePedidoPress(item)} />
   );
 
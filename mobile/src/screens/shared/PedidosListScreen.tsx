@@ -4,11 +4,11 @@ import { useSafeAreaInsets } from 'react-native-safe-area-context';
 import { Text, Chip, Searchbar, FAB } from 'react-native-paper';
 import { useFocusEffect } from '@react-navigation/native';
 import { useAppSelector } from '@/store';
-import { useFetch } from '@/hooks';
+import { useFetch, usePedidoEventos } from '@/hooks';
 import { pedidosAPI } from '@/services/api';
 import { PedidoCard, LoadingOverlay, ScreenContainer, EmptyState } from '@/components';
 import { colors, spacing, borderRadius } from '@/theme';
-import { Pedido } from '@/types';
+import { PedidoResumen } from '@/types';
 
 type EstadoFilter = 'TODOS' | 'PENDIENTE' | 'EN_PREPARACION' | 'FACTURADO' | 'ENTREGADO' | 'RECHAZADO';
 
@@ -54,6 +54,9 @@ const PedidosListScreen = ({ navigation }: PedidosListScreenProps) => {
     }, [])
   );
 
+  // Actualizar al crearse un pedido o cambiar su estado mientras la pantalla está abierta
+  usePedidoEventos(refetch);
+
   // Refetch cuando cambie el filtro de estado
   useEffect(() => {
     refetch();
@@ -63,7 +66,7 @@ const PedidosListScreen = ({ navigation }: PedidosListScreenProps) => {
 
   // Filtrado client-side para búsqueda de texto (más rápido que hacer múltiples requests)
   const pedidosFiltrados = searchQuery
-    ? pedidos.filter((p: Pedido) => {
+    ? pedidos.filter((p: PedidoResumen) => {
       const query = searchQuery.toLowerCase();
       return (
         p.id.toString().includes(query) ||
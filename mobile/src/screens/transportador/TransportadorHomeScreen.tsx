@@ -6,7 +6,7 @@ import { useFocusEffect } from '@react-navigation/native';
 import { TransportadorDrawerParamList, TransportadorStackParamList } from '@/navigation/TransportadorStack';
 import { CompositeScreenProps } from '@react-navigation/native';
 import { NativeStackScreenProps } from '@react-navigation/native-stack';
-import { useFetch } from '@/hooks';
+import { useFetch, usePedidoEventos } from '@/hooks';
 import { pedidosTransportadorAPI } from '@/services/api';
 import { LoadingOverlay, ScreenContainer, EmptyState, PedidoCard } from '@/components';
 import { useAppSelector } from '@/store';
@@ -40,6 +40,9 @@ const TransportadorHomeScreen = ({ navigation }: Props) => {
     }, [])
   );
 
+  // Actualizar al crearse un pedido o cambiar su estado mientras la pantalla está abierta
+  usePedidoEventos(refetch);
+
   const onRefresh = React.useCallback(async () => {
     setRefreshing(true);
     await refetch();
@@ -6,7 +6,7 @@ import { useFocusEffect } from '@react-navigation/native';
 import { VendedorDrawerParamList, VendedorStackParamList } from '@/navigation/VendedorStack';
 import { CompositeScreenProps } from '@react-navigation/native';
 import { NativeStackScreenProps } from '@react-navigation/native-stack';
-import { useFetch } from '@/hooks';
+import { useFetch, usePedidoEventos } from '@/hooks';
 import { pedidosAPI } from '@/services/api';
 import { LoadingOverlay, ScreenContainer } from '@/components';
 import { useAppSelector } from '@/store';
@@ -42,6 +42,9 @@ const VendedorHomeScreen = ({ navigation }: Props) => {
     }, [])
   );
 
+  // Actualizar al crearse un pedido o cambiar su estado mientras la pantalla está abierta
+  usePedidoEventos(refetch);
+
   const stats: DashboardStats = {
     totalPedidos: estadisticas?.pedidos_pendientes || 0,
     productosSinStock: estadisticas?.productos_sin_stock || 0,
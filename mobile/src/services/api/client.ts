@@ -3,7 +3,7 @@ import AsyncStorage from '@react-native-async-storage/async-storage';
 import Constants from 'expo-constants';
 
 // Obtener API URL de las variables de entorno (configuradas en app.config.js)
-let API_URL = 'http://localhost:8000/api';
+export let API_URL = 'http://localhost:8000/api';
 
 try {
   if (Constants.expoConfig?.extra?.apiUrl) {
@@ -0,0 +1,98 @@
+import AsyncStorage from '@react-native-async-storage/async-storage';
+import { API_URL } from './client';
+import { EventoPedido } from '@/types';
+
+const REINTENTO_MS = 5000;
+
+/**
+ * Se suscribe a `GET /pedidos/eventos/` (Server-Sent Events).
+ *
+ * Usa XMLHttpRequest: en React Native no hay EventSource y fetch no expone el
+ * cuerpo de la respuesta a medida que llega.
+ *
+ * - Cuando el servidor cierra la conexión (cada 5 minutos) se reconecta con
+ *   Last-Event-ID y recibe los eventos que se perdió.
+ * - Si el servidor no tiene eventos (501 con WSGI, o una versión anterior) o
+ *   el token no es válido, llama a `onNoDisponible` y no reintenta: la
+ *   pantalla sigue actualizándose al enfocarse, como antes.
+ *
+ * @returns Función para cerrar la suscripción
+ */
+export function suscribirEventosPedidos(
+  onEvento: (evento: EventoPedido) => void,
+  onNoDisponible?: () => void
+): () => void {
+  let cerrado = false;
+  let xhr: XMLHttpRequest | null = null;
+  let timer: ReturnType<typeof setTimeout> | null = null;
+  let ultimoId: string | null = null;
+  let reintentoMs = REINTENTO_MS;
+
+  const procesarBloque = (bloque: string) => {
+    let data = '';
+    bloque.split('\n').forEach((linea) => {
+      if (linea.startsWith('id:')) {
+        ultimoId = linea.slice(3).trim();
+      } else if (linea.startsWith('data:')) {
+        data += linea.slice(5).trim();
+      } else if (linea.startsWith('retry:')) {
+        reintentoMs = parseInt(linea.slice(6), 10) || reintentoMs;
+      }
+    });
+    if (!data) return;
+    try {
+      onEvento(JSON.parse(data));
+    } catch {
+      // Evento con formato inesperado: se ignora
+    }
+  };
+
+  const conectar = async () => {
+    const token = await AsyncStorage.getItem('access_token');
+    if (cerrado) return;
+    if (!token) {
+      onNoDisponible?.();
+      return;
+    }
+
+    const request = new XMLHttpRequest();
+    xhr = request;
+    let leidos = 0;
+    let pendiente = '';
+
+    request.open('GET', `${API_URL}/pedidos/eventos/`);
+    request.setRequestHeader('Accept', 'text/event-stream');
+    request.setRequestHeader('Authorization', `Bearer ${token}`);
+    if (ultimoId) {
+      request.setRequestHeader('Last-Event-ID', ultimoId);
+    }
+
+    // responseText crece a medida que llegan datos; se procesan los bloques completos
+    request.onprogress = () => {
+      pendiente += request.responseText.slice(leidos);
+      leidos = request.responseText.length;
+      const bloques = pendiente.split('\n\n');
+      pendiente = bloques.pop() ?? '';
+      bloques.forEach(procesarBloque);
+    };
+
+    request.onreadystatechange = () => {
+      if (request.readyState !== XMLHttpRequest.DONE || cerrado) return;
+      if ([401, 404, 501].includes(request.status)) {
+        onNoDisponible?.();
+        return;
+      }
+      timer = setTimeout(conectar, reintentoMs);
+    };
+
+    request.send();
+  };
+
+  conectar();
+
+  return () => {
+    cerrado = true;
+    if (timer) clearTimeout(timer);
+    xhr?.abort();
+  };
+}
@@ -10,8 +10,11 @@ import {
   Categoria,
   Subcategoria,
   Pedido,
+  PedidoResumen,
   PedidoTransportador,
+  PedidoSyncResponse,
   CreatePedidoData,
+  Cotizacion,
   ListaPrecio,
   Marca,
   Promocion,
@@ -84,6 +87,9 @@ export const zonasAPI = {
 
 // ========== Productos API ==========
 
+// Última respuesta del catálogo por combinación de filtros, para revalidar con ETag
+const catalogoCache = new Map<string, { etag: string; data: Producto[] | PaginatedResponse<Producto> }>();
+
 export const productosAPI = {
   getAll: async (params?: {
     marca?: number;
@@ -95,8 +101,21 @@ export const productosAPI = {
     activo?: boolean;
     page?: number;
   }): Promise<PaginatedResponse<Producto>> => {
-    const response = await api.get('/productos/', { params });
-    const data = response.data;
+    // Si ya tenemos el catálogo, el servidor responde 304 cuando no cambió
+    const cacheKey = JSON.stringify(params || {});
+    const cached = catalogoCache.get(cacheKey);
+    const response = await api.get('/productos/', {
+      params,
+      headers: cached ? { 'If-None-Match': cached.etag } : undefined,
+      validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+    });
+
+    let data = response.data;
+    if (response.status === 304 && cached) {
+      data = cached.data;
+    } else if (response.headers.etag) {
+      catalogoCache.set(cacheKey, { etag: response.headers.etag, data });
+    }
 
     // Si la respuesta es un array (sin paginación), convertir a formato paginado
     if (Array.isArray(data)) {
@@ -117,6 +136,30 @@ export const productosAPI = {
     return response.data;
   },
 
+  getByBarcode: async (codigo: string): Promise<Producto> => {
+    const response = await api.get(`/productos/barcode/${encodeURIComponent(codigo)}/`);
+    return response.data;
+  },
+
+  getByBarcodes: async (
+    codigos: string[]
+  ): Promise<{ productos: Producto[]; no_encontrados: string[] }> => {
+    const response = await api.post('/productos/barcode/batch/', { codigos });
+    return response.data;
+  },
+
+  autocompletar: async (params: {
+    q: string;
+    tipo?: 'productos' | 'clientes';
+    limite?: number;
+  }): Promise<{
+    productos: Producto[];
+    clientes: Pick<User, 'id' | 'nombre' | 'apellido' | 'full_name' | 'cuit_dni' | 'zona' | 'zona_nombre' | 'lista_precio'>[];
+  }> => {
+    const response = await api.get('/productos/autocompletar/', { params });
+    return response.data;
+  },
+
   create: async (data: Partial<Producto>): Promise<Producto> => {
     const response = await api.post('/productos/', data);
     return response.data;
@@ -272,19 +315,68 @@ export const pedidosAPI = {
     estado?: string;
     cliente?: number;
     fecha_creacion?: string; // Formato: YYYY-MM-DD
+    desde?: string; // Formato: YYYY-MM-DD (inclusive)
+    hasta?: string; // Formato: YYYY-MM-DD (inclusive)
     page?: number;
-  }): Promise<PaginatedResponse<Pedido>> => {
+  }): Promise<PaginatedResponse<PedidoResumen>> => {
     const response = await api.get('/pedidos/', { params });
     return response.data;
   },
 
+  /**
+   * Sincronización incremental: sin `since` trae todos los pedidos del usuario;
+   * con el cursor de la respuesta anterior, solo los cambios y las bajas.
+   * El transportador recibe `PedidoTransportador` (`sync<PedidoTransportador>()`).
+   */
+  sync: async <T = PedidoResumen>(since?: string): Promise<PedidoSyncResponse<T>> => {
+    const response = await api.get('/pedidos/sync/', { params: since ? { since } : undefined });
+    return response.data;
+  },
+
   getById: async (id: number): Promise<Pedido> => {
     const response = await api.get(`/pedidos/${id}/`);
     return response.data;
   },
 
-  create: async (data: CreatePedidoData): Promise<Pedido> => {
-    const response = await api.post('/pedidos/', data);
+  /**
+   * Crea un pedido. Reutilizar la misma `idempotencyKey` al reintentar
+   * (ej: después de un timeout) evita crear el pedido dos veces.
+   */
+  create: async (data: CreatePedidoData, idempotencyKey?: string): Promise<Pedido> => {
+    const response = await api.post('/pedidos/', data, {
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
+    });
+    return response.data;
+  },
+
+  /**
+   * Cotiza un pedido con los precios vigentes sin crearlo.
+   */
+  cotizar: async (data: CreatePedidoData): Promise<Cotizacion> => {
+    const response = await api.post('/pedidos/cotizar/', data);
+    return response.data;
+  },
+
+  /**
+   * Envía varios pedidos (ej: tomados sin conexión) en un solo request.
+   * Cada pedido se crea o falla por separado; ver `resultados`.
+   */
+  createBulk: async (
+    pedidos: CreatePedidoData[],
+    idempotencyKey?: string
+  ): Promise<{
+    creados: number;
+    con_errores: number;
+    resultados: Array<{
+      indice: number;
+      creado: boolean;
+      pedido?: { id: number; estado: string; total: string };
+      errores?: Record<string, unknown>;
+    }>;
+  }> => {
+    const response = await api.post('/pedidos/bulk/', { pedidos }, {
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
+    });
     return response.data;
   },
 
@@ -319,16 +411,17 @@ export const pedidosAPI = {
 
   /**
    * Obtiene estadísticas del dashboard de admin.
-   * Retorna KPIs calculados en el servidor.
+   * Retorna KPIs calculados en el servidor. Ventas y pedidos son del mes
+   * en curso, o del período `desde`/`hasta` (YYYY-MM-DD, inclusive).
    */
-  getEstadisticasAdmin: async (): Promise<{
+  getEstadisticasAdmin: async (params?: { desde?: string; hasta?: string }): Promise<{
     ventas_mes: number;
     pedidos_mes: number;
     productos_activos: number;
     productos_sin_stock: number;
     total_usuarios: number;
   }> => {
-    const response = await api.get('/pedidos/estadisticas/admin/');
+    const response = await api.get('/pedidos/estadisticas/admin/', { params });
     return response.data;
   },
 
@@ -449,6 +542,8 @@ export const listasAPI = {
   },
 };
 
+export { suscribirEventosPedidos } from './eventos';
+
 // Export todo junto
 export default {
   auth: authAPI,
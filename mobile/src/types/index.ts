@@ -262,6 +262,38 @@ export interface Pedido {
   fecha_entrega?: string;
 }
 
+/**
+ * Pedido en listados (`GET /pedidos/`, vista summary): sin el detalle de
+ * items, con la cantidad de items. El detalle se obtiene con getById.
+ */
+export interface PedidoResumen extends Omit<Pedido, 'items'> {
+  items_count: number;
+}
+
+/**
+ * Respuesta de `GET /pedidos/sync/`. Aplicar `eliminados` y luego `pedidos`
+ * (upsert por id); si `hay_mas`, volver a pedir con `cursor`.
+ */
+export interface PedidoSyncResponse<T = PedidoResumen> {
+  cursor: string;
+  completo: boolean;
+  hay_mas: boolean;
+  pedidos: T[];
+  eliminados: number[];
+}
+
+/**
+ * Evento de `GET /pedidos/eventos/` (Server-Sent Events) al crear un pedido
+ * o cambiar su estado.
+ */
+export interface EventoPedido {
+  tipo: 'creado' | 'estado' | 'actualizado';
+  id: number;
+  estado: PedidoEstado;
+  transportador: number | null;
+  total: string;
+}
+
 // ========== Pedido Transportador Types ==========
 
 export interface ClienteInfoTransportador {
@@ -299,6 +331,29 @@ export interface CreatePedidoData {
   notas?: string;
 }
 
+export interface CotizacionItem {
+  producto: number | null;
+  promocion: number | null;
+  producto_nombre: string;
+  producto_codigo: string | null;
+  es_promocion: boolean;
+  cantidad: number;
+  precio_unitario: string;
+  subtotal: string;
+  descuento: string;
+}
+
+export interface Cotizacion {
+  cliente: number;
+  lista_precio: number | null;
+  lista_precio_nombre: string;
+  lista_precio_descuento: number | string;
+  items: CotizacionItem[];
+  subtotal: string;
+  descuento_total: string;
+  total: string;
+}
+
 // ========== API Response Types ==========
 
 export interface PaginatedResponse<T> {